@@ -31,6 +31,9 @@ setup(name='web_backend',
           'Flask-Cors==3.0.7',
           'nltk==3.3',
           'PyYAML==5.1',
+          'numpy==1.16.2',
+          'wordcloud==1.5.0',
+          'Pillow==6.0.0',
       ],
       packages=find_packages(),
       include_package_data=True,
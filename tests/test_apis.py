@@ -0,0 +1,203 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from web_backend.utils import get_abspath_from_project_source_root, join_paths
+from web_backend.wrapper.mallet_inference_pool import MalletInferenceTimeoutError
+
+# App created with create_app(), and the folder with the files it writes. They are created only once for all the
+# tests, because the blueprints use module-level objects (the ModelsRegistry and the CommandsBroadcaster)
+_app = None
+_dir_path = None
+
+
+class FakeModelsWrapper:
+    """
+    Fake of the ModelsWrapper, created by the ModelsRegistry of the user_api blueprint instead of loading the models.
+    """
+
+    def __init__(self, topics_model_name, progress_callback=None):
+        self.topics_model_name = topics_model_name
+        self.topics_model_fingerprint = 'fingerprint'
+        self.calls = []
+
+    def get_topics_text_json(self, num_keywords=None):
+        self.calls.append('get_topics_text_json')
+        return json.dumps([{'topic': 0, 'keywords': [{'name': 'god', 'probability': 0.5}]}])
+
+    def get_text_related_topics(self, text, max_num_topics=None):
+        raise MalletInferenceTimeoutError('Mallet didn\'t infer the topics of the text in 5 seconds', retry_after=5)
+
+    def clear_summaries_cache(self):
+        self.calls.append('clear_summaries_cache')
+
+    def close(self):
+        pass
+
+
+def setUpModule():
+    global _app, _dir_path
+
+    _dir_path = tempfile.mkdtemp()
+    if 'CONF_INI_FILE_PATH' not in os.environ:
+        os.environ['CONF_INI_FILE_PATH'] = get_abspath_from_project_source_root('../development-conf.ini')
+    # The file of the commands is read when the admin_api blueprint is imported
+    os.environ['WEB_BACKEND_ADMIN_COMMANDS_FILE_PATH'] = join_paths(_dir_path, 'admin-commands.json')
+
+    from web_backend.apis.user import models_registry
+    from web_backend.app import create_app
+    models_registry._models_wrapper_factory = FakeModelsWrapper
+    _app = create_app()
+    models_registry.wait(5)
+
+
+def tearDownModule():
+    shutil.rmtree(_dir_path)
+    os.environ.pop('WEB_BACKEND_ADMIN_COMMANDS_FILE_PATH', None)
+
+
+def _get_models_wrapper() -> FakeModelsWrapper:
+    from web_backend.apis.user import models_registry
+    return models_registry.get()
+
+
+class TestUserApi(unittest.TestCase):
+
+    def setUp(self):
+        self.client = _app.test_client()
+        _get_models_wrapper().calls.clear()
+
+    def tearDown(self):
+        _get_models_wrapper().topics_model_fingerprint = 'fingerprint'
+
+    def test_etag(self):
+        """
+        Checks that the requests with the ETag of the response receive HTTP 304 without calling the ModelsWrapper,
+        and that the ETag changes when the topics model changes.
+        """
+        res = self.client.get('/user/api/topics/text')
+        self.assertEqual(200, res.status_code)
+        self.assertEqual('god', res.get_json()[0]['keywords'][0]['name'])
+        etag = res.headers['ETag']
+        self.assertIn('max-age', res.headers['Cache-Control'])
+
+        res = self.client.get('/user/api/topics/text', headers={'If-None-Match': etag})
+        self.assertEqual(304, res.status_code)
+        self.assertEqual(b'', res.get_data())
+        self.assertEqual(['get_topics_text_json'], _get_models_wrapper().calls)
+
+        # Other request URL has other ETag
+        res = self.client.get('/user/api/topics/text?num_keywords=3', headers={'If-None-Match': etag})
+        self.assertEqual(200, res.status_code)
+
+        # A topics model with the same name, trained again, has other ETag
+        _get_models_wrapper().topics_model_fingerprint = 'other fingerprint'
+        res = self.client.get('/user/api/topics/text', headers={'If-None-Match': etag})
+        self.assertEqual(200, res.status_code)
+        self.assertNotEqual(etag, res.headers['ETag'])
+
+    def test_mallet_inference_timeout(self):
+        """
+        Checks that the texts whose topics mallet doesn't infer in time receive HTTP 503 with a Retry-After header.
+        """
+        res = self.client.post('/user/api/text/related/topics', data={'text': 'God and the church'})
+        self.assertEqual(503, res.status_code)
+        self.assertEqual('5', res.headers['Retry-After'])
+        self.assertEqual(503, res.get_json()['status_code'])
+
+
+class TestAdminApi(unittest.TestCase):
+    _HEADERS = {'Authorization': 'Bearer admin-token'}
+
+    def setUp(self):
+        self.client = _app.test_client()
+        _get_models_wrapper().calls.clear()
+        os.environ['WEB_BACKEND_ADMIN_API_TOKEN'] = 'admin-token'
+
+        # The params are updated in a copy of the params file
+        self.params_file_path = join_paths(_dir_path, 'params-file.yaml')
+        shutil.copyfile(get_abspath_from_project_source_root('params-file.yaml'), self.params_file_path)
+        self.params_file_patch = mock.patch('web_backend.params._PARAMS_FILE_PATH', self.params_file_path)
+        self.params_file_patch.start()
+
+    def tearDown(self):
+        self.params_file_patch.stop()
+        os.environ.pop('WEB_BACKEND_ADMIN_API_TOKEN', None)
+
+    def test_token(self):
+        """
+        Checks that the requests without the token receive HTTP 401, and that the API is disabled (HTTP 403)
+        if the token isn't set. The endpoint that returns if the API is running doesn't need the token.
+        """
+        self.assertEqual(200, self.client.get('/admin/api/').status_code)
+        self.assertEqual(200, self.client.get('/admin/api/params', headers=self._HEADERS).status_code)
+
+        res = self.client.get('/admin/api/params')
+        self.assertEqual(401, res.status_code)
+        self.assertEqual('Bearer', res.headers['WWW-Authenticate'])
+        res = self.client.get('/admin/api/params', headers={'Authorization': 'Bearer other-token'})
+        self.assertEqual(401, res.status_code)
+
+        os.environ['WEB_BACKEND_ADMIN_API_TOKEN'] = ''
+        self.assertEqual(403, self.client.get('/admin/api/params', headers=self._HEADERS).status_code)
+
+    def test_update_param(self):
+        """
+        Checks that a param is updated with a valid value, and that the invalid values and params are rejected.
+        """
+        url = '/admin/api/params/topics.text.num_keywords.default'
+        res = self.client.put(url, json={'value': 10}, headers=self._HEADERS)
+        self.assertEqual(200, res.status_code)
+        self.assertEqual({'name': 'topics.text.num_keywords.default', 'value': 10}, res.get_json())
+        self.assertEqual(10, self.client.get(url, headers=self._HEADERS).get_json()['value'])
+        # The value is also sent in a form body
+        self.assertEqual(200, self.client.put(url, data={'value': '7'}, headers=self._HEADERS).status_code)
+        self.assertEqual(7, self.client.get(url, headers=self._HEADERS).get_json()['value'])
+
+        # Values that aren't int, or that break the order of the min, default and max values
+        self.assertEqual(422, self.client.put(url, json={'value': 'ten'}, headers=self._HEADERS).status_code)
+        self.assertEqual(422, self.client.put(url, json={'value': True}, headers=self._HEADERS).status_code)
+        self.assertEqual(422, self.client.put(url, json={}, headers=self._HEADERS).status_code)
+        self.assertEqual(422, self.client.put(url, json={'value': 31}, headers=self._HEADERS).status_code)
+
+        # Params that don't exist, or with nested params
+        self.assertEqual(404, self.client.put('/admin/api/params/topics.text.other', json={'value': 1},
+                                              headers=self._HEADERS).status_code)
+        self.assertEqual(404, self.client.put('/admin/api/params/topics.text', json={'value': 1},
+                                              headers=self._HEADERS).status_code)
+
+        self.assertEqual(7, self.client.get(url, headers=self._HEADERS).get_json()['value'])
+        # The comments of the params file are kept
+        with open(self.params_file_path) as params_file:
+            self.assertIn('# MAX_NUM_KEYWORDS_TOPIC_NUBE', params_file.read())
+
+    def test_commands_broadcast(self):
+        """
+        Checks that the command published by the endpoint is run by the current process, and that the commands
+        published by other processes are run before answering the next request.
+        """
+        from web_backend.apis.admin import commands_broadcaster
+        from web_backend.commands import CommandsBroadcaster
+
+        res = self.client.delete('/admin/api/caches/summaries', headers=self._HEADERS)
+        self.assertEqual(200, res.status_code)
+        self.assertEqual(['clear_summaries_cache'], _get_models_wrapper().calls)
+
+        # Broadcaster of other process, that shares the file of the commands
+        other_process_broadcaster = CommandsBroadcaster(commands_broadcaster.file_path)
+        other_process_broadcaster.register('clear_cache', lambda cache, model=None: None)
+        other_process_broadcaster.publish('clear_cache', cache='summaries', model=None)
+
+        self.assertEqual(200, self.client.get('/admin/api/').status_code)
+        self.assertEqual(['clear_summaries_cache', 'clear_summaries_cache'], _get_models_wrapper().calls)
+
+        # The command isn't run again in the next request
+        self.assertEqual(200, self.client.get('/admin/api/').status_code)
+        self.assertEqual(2, len(_get_models_wrapper().calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import time
+import unittest
+from shutil import rmtree
+
+from web_backend.cache import ResponseCache
+from web_backend.utils import Config, join_paths
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_get_key(self):
+        """
+        Checks that the keys only depend on the values, and not on the order of the named values.
+        """
+        self.assertEqual(ResponseCache.get_key('text', num=1, model='m'),
+                         ResponseCache.get_key('text', model='m', num=1))
+        self.assertNotEqual(ResponseCache.get_key('text', num=1), ResponseCache.get_key('text', num=2))
+        self.assertNotEqual(ResponseCache.get_key('ab', 'c'), ResponseCache.get_key('a', 'bc'))
+
+    def test_lru_eviction(self):
+        """
+        Checks that the least recently used entries are evicted when the max size in bytes is exceeded.
+        """
+        cache = ResponseCache(max_size_bytes=10)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+        # Use 'a', so 'b' is the least recently used entry
+        self.assertEqual(b'aaaa', cache.get('a'))
+
+        cache.put('c', b'cccc')
+
+        self.assertEqual(b'aaaa', cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(b'cccc', cache.get('c'))
+
+        # Bodies greater than the max size aren't stored
+        cache.put('d', b'd' * 11)
+        self.assertIsNone(cache.get('d'))
+
+        stats = cache.get_stats()
+        self.assertEqual(3, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(8, stats['size_bytes'])
+
+    def test_ttl(self):
+        """
+        Checks that entries expire after ttl_seconds.
+        """
+        cache = ResponseCache(max_size_bytes=10, ttl_seconds=0.05)
+        cache.put('a', b'aaaa')
+        self.assertEqual(b'aaaa', cache.get('a'))
+
+        time.sleep(0.1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_disk_tier(self):
+        """
+        Checks that entries evicted from memory are obtained from disk, also from a new cache with the same folder.
+        """
+        cache = ResponseCache(max_size_bytes=4, disk_dir_path=self.dir_path, disk_max_size_bytes=100)
+        cache.put('a', b'aaaa')
+        cache.put('b', b'bbbb')
+
+        self.assertEqual(b'aaaa', cache.get('a'))
+        self.assertEqual(1, cache.get_stats()['disk_hits'])
+
+        # The entry obtained from disk is moved back to memory, and 'b' is evicted to disk
+        self.assertEqual(b'aaaa', cache.get('a'))
+        self.assertEqual(1, cache.get_stats()['hits'])
+        self.assertEqual(b'bbbb', cache.get('b'))
+        self.assertEqual(2, cache.get_stats()['disk_hits'])
+
+        new_cache = ResponseCache(max_size_bytes=4, disk_dir_path=self.dir_path, disk_max_size_bytes=100)
+        self.assertEqual(b'aaaa', new_cache.get('a'))
+
+        # The entries stored on disk by other cache (for example, of other process) are also found
+        cache.put('c', b'cccc')
+        cache.put('d', b'dddd')
+        self.assertEqual(b'cccc', new_cache.get('c'))
+
+        new_cache.clear()
+        self.assertIsNone(new_cache.get('a'))
+
+    def test_from_config(self):
+        """
+        Checks that the cache is created with the params of the given Config object, and that it's disabled
+        if MAX_SIZE_BYTES is 0.
+        """
+        conf_ini_file_path = join_paths(self.dir_path, 'test-conf.ini')
+        with open(conf_ini_file_path, 'w') as conf_ini_file:
+            conf_ini_file.write('[CACHE]\nMAX_SIZE_BYTES = 1024\nTTL_SECONDS = 60\n'
+                                '[DISABLED_CACHE]\nMAX_SIZE_BYTES = 0\n')
+        config = Config(conf_ini_file_path)
+
+        cache = ResponseCache.from_config('CACHE', config)
+        self.assertEqual((1024, 60, None), (cache.max_size_bytes, cache.ttl_seconds, cache.disk_dir_path))
+        self.assertEqual(ResponseCache.get_config_params('CACHE', config),
+                         ResponseCache.get_config_params('CACHE', Config(conf_ini_file_path)))
+        self.assertIsNone(ResponseCache.from_config('DISABLED_CACHE', config))
+
+    def test_clear_shared_disk_tier(self):
+        """
+        Checks that clear() removes the entries stored on disk by other caches with the same folder (for example,
+        of other processes), and that clear_memory() keeps the entries stored on disk after the clear.
+        """
+        cache = ResponseCache(max_size_bytes=4, disk_dir_path=self.dir_path, disk_max_size_bytes=100)
+        other_cache = ResponseCache(max_size_bytes=4, disk_dir_path=self.dir_path, disk_max_size_bytes=100)
+        other_cache.put('a', b'aaaa')
+        other_cache.put('b', b'bbbb')
+        cache.put('c', b'cccc')
+
+        cache.clear()
+        self.assertEqual([], os.listdir(self.dir_path))
+
+        # The entries stored again after the clear are kept by the caches that clear their memory later
+        cache.put('d', b'dddd')
+        cache.put('e', b'eeee')
+        other_cache.clear_memory()
+        self.assertEqual(['d'], os.listdir(self.dir_path))
+        self.assertIsNone(other_cache.get('b'))
+        self.assertEqual(b'dddd', other_cache.get('d'))
+        self.assertEqual(1, other_cache.get_stats()['disk_hits'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+from web_backend.commands import CommandsBroadcaster
+from web_backend.utils import join_paths
+
+
+class TestCommandsBroadcaster(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.file_path = join_paths(self.dir_path, 'commands.json')
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def _get_broadcaster(self, calls):
+        broadcaster = CommandsBroadcaster(self.file_path)
+        broadcaster.register('clear_cache', lambda cache: calls.append(cache))
+        return broadcaster
+
+    def test_publish_and_run_pending(self):
+        """
+        Checks that a published command is run by the process that publishes it and, only once,
+        by the other broadcasters that share the file.
+        """
+        publisher_calls, receiver_calls = [], []
+        publisher = self._get_broadcaster(publisher_calls)
+        receiver = self._get_broadcaster(receiver_calls)
+
+        publisher.publish('clear_cache', cache='responses')
+        self.assertEqual(['responses'], publisher_calls)
+        self.assertEqual([], receiver_calls)
+
+        receiver.run_pending()
+        receiver.run_pending()
+        self.assertEqual(['responses'], receiver_calls)
+
+        # A command published several times before it's run is only run once
+        publisher.publish('clear_cache', cache='summaries')
+        publisher.publish('clear_cache', cache='summaries')
+        receiver.run_pending()
+        self.assertEqual(['responses', 'summaries'], receiver_calls)
+        self.assertEqual(['responses', 'summaries', 'summaries'], publisher_calls)
+
+        # The temporary file used to replace the commands file is removed
+        self.assertEqual(['commands.json', 'commands.json.lock'], sorted(os.listdir(self.dir_path)))
+
+    def test_commands_published_before_creation(self):
+        """
+        Checks that the commands published before a broadcaster is created aren't run by it.
+        """
+        self._get_broadcaster([]).publish('clear_cache', cache='responses')
+
+        calls = []
+        broadcaster = self._get_broadcaster(calls)
+        broadcaster.run_pending()
+        self.assertEqual([], calls)
+
+        with self.assertRaises(KeyError):
+            broadcaster.publish('not_registered')
+
+
+if __name__ == '__main__':
+    unittest.main()
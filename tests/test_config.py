@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import Config, check_paths_exist, join_paths
+
+
+class TestConfig(unittest.TestCase):
+    _CONF_INI_FILE_CONTENT = '[MALLET]\n' \
+                             'SOURCE_CODE_PATH = /path/to/mallet\n' \
+                             '[CACHE]\n' \
+                             'MAX_SIZE_BYTES = 1024\n' \
+                             'ENABLED = yes\n'
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.conf_ini_file_path = join_paths(self.dir_path, 'test-conf.ini')
+        with open(self.conf_ini_file_path, 'w') as conf_ini_file:
+            conf_ini_file.write(self._CONF_INI_FILE_CONTENT)
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+        os.environ.pop('WEB_BACKEND_MALLET_SOURCE_CODE_PATH', None)
+
+    def test_get(self):
+        """
+        Loads param values from the x-conf.ini test file and checks if the values are the expected.
+        """
+        config = Config(self.conf_ini_file_path)
+
+        self.assertEqual(config.mallet_source_code_path, '/path/to/mallet')
+        self.assertEqual(config.get_int('CACHE', 'MAX_SIZE_BYTES'), 1024)
+        self.assertEqual(config.get_bool('CACHE', 'ENABLED'), True)
+
+        # Params not specified in the file
+        self.assertEqual(config.get_int('CACHE', 'TTL_SECONDS', fallback=0), 0)
+        with self.assertRaises(KeyError):
+            config.get('CACHE', 'TTL_SECONDS')
+
+    def test_get_with_env_var_override(self):
+        """
+        Checks that the WEB_BACKEND_<SECTION>_<PARAM> environment variables override the values of the file.
+        """
+        os.environ['WEB_BACKEND_MALLET_SOURCE_CODE_PATH'] = '/other/path/to/mallet'
+        config = Config(self.conf_ini_file_path)
+
+        self.assertEqual(config.mallet_source_code_path, '/other/path/to/mallet')
+
+    def test_file_not_found(self):
+        """
+        Checks that an error is raised if the x-conf.ini file doesn't exist.
+        """
+        with self.assertRaises(EnvironmentError):
+            Config(join_paths(self.dir_path, 'not-found-conf.ini'))
+
+    def test_check_paths_exist(self):
+        """
+        Checks that check_paths_exist() only raises an error if some path doesn't exist.
+        """
+        check_paths_exist({'conf': self.conf_ini_file_path, 'dir': self.dir_path})
+
+        with self.assertRaises(EnvironmentError):
+            check_paths_exist({'conf': self.conf_ini_file_path, 'not found': join_paths(self.dir_path, 'not-found')})
+
+
+if __name__ == '__main__':
+    unittest.main()
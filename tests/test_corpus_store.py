@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.corpus_store import CorpusStore
+
+
+class TestCorpusStore(unittest.TestCase):
+    _DOCS_CONTENTS = ['First document. It has 2 sentences.', '', 'Ñandú with non-ASCII chars. Second sentence.']
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_build_and_load(self):
+        """
+        Builds the store, loads it from disk and checks that the documents are the same as the original ones.
+        """
+        CorpusStore.build(self.dir_path, self._DOCS_CONTENTS)
+        self.assertIsNone(CorpusStore.load(join_paths(self.dir_path, 'not-exists')))
+
+        corpus_store = CorpusStore.load(self.dir_path)
+        self.assertEqual(3, len(corpus_store))
+        self.assertEqual(self._DOCS_CONTENTS, list(corpus_store))
+        self.assertEqual(self._DOCS_CONTENTS[2], corpus_store[-1])
+        self.assertEqual(self._DOCS_CONTENTS[1:], corpus_store[1:])
+        self.assertEqual(self._DOCS_CONTENTS[2].encode('utf-8'), corpus_store.get_doc_bytes(2).tobytes())
+        with self.assertRaises(IndexError):
+            corpus_store[3]
+
+        self.assertFalse(corpus_store.has_sentences())
+        self.assertIsNone(corpus_store.get_doc_sentences(0))
+
+    def test_sentences(self):
+        """
+        Checks that the sentences of the documents are obtained from the stored positions, and that the documents
+        whose sentences can't be located don't have sentences.
+        """
+        def tokenize_func(text):
+            sentences = [sentence.rstrip('.') + '.' for sentence in text.split('. ') if sentence != '']
+            # The sentences returned for the first document aren't inside it
+            return [sentence.upper() for sentence in sentences] if text.startswith('First') else sentences
+
+        corpus_store = CorpusStore.build(self.dir_path, self._DOCS_CONTENTS, tokenize_func)
+
+        self.assertTrue(corpus_store.has_sentences())
+        self.assertIsNone(corpus_store.get_doc_sentences(0))
+        self.assertIsNone(corpus_store.get_doc_sentences(1))
+        self.assertEqual(['Ñandú with non-ASCII chars.', 'Second sentence.'], corpus_store.get_doc_sentences(2))
+
+    def test_rebuild_over_loaded_store(self):
+        """
+        Checks that building the store again in the same folder doesn't modify the files of the loaded store,
+        which keeps returning the old documents, and that the new store has the new documents.
+        """
+        def tokenize_func(text):
+            return [sentence.rstrip('.') + '.' for sentence in text.split('. ') if sentence != '']
+
+        old_corpus_store = CorpusStore.build(self.dir_path, self._DOCS_CONTENTS, tokenize_func)
+        new_docs_contents = ['New document. Much longer than the old ones, ' * 100, 'Other']
+
+        new_corpus_store = CorpusStore.build(self.dir_path, new_docs_contents)
+
+        self.assertEqual(self._DOCS_CONTENTS, list(old_corpus_store))
+        self.assertEqual(['Ñandú with non-ASCII chars.', 'Second sentence.'], old_corpus_store.get_doc_sentences(2))
+        self.assertEqual(new_docs_contents, list(new_corpus_store))
+        self.assertEqual(new_docs_contents, list(CorpusStore.load(self.dir_path)))
+        self.assertFalse(CorpusStore.load(self.dir_path).has_sentences())
+        self.assertEqual(['docs-offsets.npy', 'docs.bin'], sorted(os.listdir(self.dir_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
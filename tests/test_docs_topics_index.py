@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from shutil import rmtree
+
+import numpy as np
+
+from web_backend.wrapper.docs_topics_index import DocsTopicsIndex
+
+
+class TestDocsTopicsIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+        # Random topics distributions of 200 documents and 5 topics
+        random_state = np.random.RandomState(0)
+        self.docs_topics = random_state.dirichlet(np.full(5, 0.3), size=200).astype(np.float32)
+        self.text_topics = random_state.dirichlet(np.full(5, 0.5)).astype(np.float32)
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_build_and_load(self):
+        """
+        Builds the index, loads it from disk and checks that it contains the same topics distributions.
+        """
+        self.assertIsNone(DocsTopicsIndex.load(self.dir_path))
+
+        DocsTopicsIndex.build(self.dir_path, self.docs_topics)
+        index = DocsTopicsIndex.load(self.dir_path)
+
+        np.testing.assert_array_equal(self.docs_topics, index.docs_topics)
+
+    def test_load_with_other_model_fingerprint(self):
+        """
+        Checks that an index built with other topics model isn't loaded.
+        """
+        DocsTopicsIndex.build(self.dir_path, self.docs_topics, model_fingerprint='model1')
+
+        self.assertIsNotNone(DocsTopicsIndex.load(self.dir_path, model_fingerprint='model1'))
+        self.assertIsNone(DocsTopicsIndex.load(self.dir_path, model_fingerprint='model2'))
+        self.assertTrue(DocsTopicsIndex.exists(self.dir_path))
+
+    def test_get_related_docs(self):
+        """
+        Checks that the related documents are the same as the ones obtained computing the score of all the documents.
+        """
+        index = DocsTopicsIndex(self.docs_topics)
+        docs_ids, docs_probs, docs_topics = index.get_related_docs(self.text_topics, 10)
+
+        # Compute the score of all the documents
+        dominant_topics = self.docs_topics.argmax(axis=1)
+        all_docs_probs = self.text_topics[dominant_topics] * self.docs_topics.max(axis=1)
+        expected_docs_ids = np.argsort(-all_docs_probs, kind='stable')[:10]
+
+        np.testing.assert_array_equal(expected_docs_ids, docs_ids)
+        np.testing.assert_allclose(all_docs_probs[expected_docs_ids], docs_probs)
+        np.testing.assert_array_equal(dominant_topics[expected_docs_ids], docs_topics)
+
+    def test_get_related_docs_more_than_num_docs(self):
+        """
+        Checks that all the documents are returned if num_docs is greater than the number of documents.
+        """
+        index = DocsTopicsIndex(self.docs_topics[:3])
+        docs_ids, _, _ = index.get_related_docs(self.text_topics, 10)
+
+        self.assertEqual([0, 1, 2], sorted(docs_ids.tolist()))
+
+    def test_get_most_repr_docs_of_topic(self):
+        """
+        Checks that the most representative documents of a topic are the ones with the highest probability
+        of the topic, both inside and outside the precomputed ranking.
+        """
+        index = DocsTopicsIndex(self.docs_topics)
+        index.precompute_most_repr_docs(5)
+
+        for num_docs in (3, 5, 20):
+            docs_ids, docs_topic_probs = index.get_most_repr_docs_of_topic(2, num_docs)
+
+            expected_docs_ids = np.argsort(-self.docs_topics[:, 2], kind='stable')[:num_docs]
+            np.testing.assert_array_equal(expected_docs_ids, docs_ids)
+            np.testing.assert_array_equal(self.docs_topics[expected_docs_ids, 2], docs_topic_probs)
+
+    def test_rebuild_over_loaded_index(self):
+        """
+        Checks that building the index again in the same folder doesn't modify the file of the loaded index,
+        which keeps returning the old topics distributions.
+        """
+        old_index = DocsTopicsIndex.build(self.dir_path, self.docs_topics, 'old-model')
+
+        new_index = DocsTopicsIndex.build(self.dir_path, self.docs_topics[:10] * 0.5, 'new-model')
+
+        np.testing.assert_array_equal(self.docs_topics, old_index.docs_topics)
+        np.testing.assert_array_equal(self.docs_topics[:10] * 0.5, new_index.docs_topics)
+        self.assertIsNone(DocsTopicsIndex.load(self.dir_path, 'old-model'))
+        self.assertEqual(10, DocsTopicsIndex.load(self.dir_path, 'new-model').num_docs)
+
+
+if __name__ == '__main__':
+    unittest.main()
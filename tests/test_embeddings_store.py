@@ -0,0 +1,100 @@
+import gzip
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+import numpy as np
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.embeddings_store import EmbeddingsStore, iter_glove_embeddings, iter_word2vec_embeddings
+
+
+class TestEmbeddingsStore(unittest.TestCase):
+    _WORDS_VECTORS = [
+        ('god', np.array([1.0, 0.5, -0.25], dtype=np.float32)),
+        ('car', np.array([0.0, 2.0, 1.5], dtype=np.float32)),
+        ('ñandú', np.array([-1.0, 0.0, 0.75], dtype=np.float32)),
+        ('space', np.array([0.25, 0.25, 0.25], dtype=np.float32))
+    ]
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_build_and_load(self):
+        """
+        Builds a store, loads it from disk and checks the vectors of the stored words and the missing words.
+        """
+        store_dir_path = join_paths(self.dir_path, 'embeddings')
+
+        # The store doesn't exist yet
+        self.assertIsNone(EmbeddingsStore.load(store_dir_path))
+
+        EmbeddingsStore.build(store_dir_path, self._WORDS_VECTORS, dtype=np.float16)
+        store = EmbeddingsStore.load(store_dir_path)
+
+        self.assertEqual(len(self._WORDS_VECTORS), store.num_words)
+        self.assertEqual(3, store.vectors_size)
+        self.assertEqual(np.float16, store.vectors.dtype)
+        # The vectors are memory-mapped
+        self.assertIsInstance(store.vectors, np.memmap)
+
+        words = [word for word, _ in self._WORDS_VECTORS] + ['missing', 'a' * 100]
+        expected_vectors = np.array([vector for _, vector in self._WORDS_VECTORS] + [np.zeros(3), np.zeros(3)])
+        np.testing.assert_allclose(expected_vectors, store.get_words_vectors(words), atol=1e-3)
+        np.testing.assert_allclose(self._WORDS_VECTORS[1][1], store.get_word_vector('car'))
+
+    def test_build_pruned_to_vocabulary(self):
+        """
+        Checks that only the words of the given vocabulary are stored.
+        """
+        store = EmbeddingsStore.build(self.dir_path, self._WORDS_VECTORS, dtype=np.float32,
+                                      vocabulary={'car', 'space', 'word not in the embeddings'})
+
+        self.assertEqual(2, store.num_words)
+        np.testing.assert_array_equal(self._WORDS_VECTORS[3][1], store.get_word_vector('space'))
+        np.testing.assert_array_equal(np.zeros(3), store.get_word_vector('god'))
+
+    def test_rebuild_over_loaded_store(self):
+        """
+        Checks that building the store again in the same folder doesn't modify the files of the loaded store,
+        which keeps returning the old vectors, and that no temporary file is left in the folder.
+        """
+        old_store = EmbeddingsStore.build(self.dir_path, self._WORDS_VECTORS, dtype=np.float32)
+
+        new_store = EmbeddingsStore.build(self.dir_path, [('car', np.array([9.0, 9.0, 9.0], dtype=np.float32))],
+                                          dtype=np.float32)
+
+        np.testing.assert_array_equal(self._WORDS_VECTORS[1][1], old_store.get_word_vector('car'))
+        np.testing.assert_array_equal(self._WORDS_VECTORS[3][1], old_store.get_word_vector('space'))
+        self.assertEqual(1, new_store.num_words)
+        np.testing.assert_array_equal([9.0, 9.0, 9.0], new_store.get_word_vector('car'))
+        self.assertEqual({'vocabulary.npy', 'vectors.npy'}, set(os.listdir(self.dir_path)))
+
+    def test_read_embeddings_files(self):
+        """
+        Checks that the Glove text files and the word2vec binary files are read correctly.
+        """
+        glove_file_path = join_paths(self.dir_path, 'glove.test.3d.txt')
+        with open(glove_file_path, 'w', encoding='utf-8') as glove_file:
+            for word, vector in self._WORDS_VECTORS:
+                glove_file.write(word + ' ' + ' '.join(str(value) for value in vector) + '\n')
+
+        word2vec_file_path = join_paths(self.dir_path, 'word2vec.bin.gz')
+        with gzip.open(word2vec_file_path, 'wb') as word2vec_file:
+            word2vec_file.write('{} 3\n'.format(len(self._WORDS_VECTORS)).encode('ascii'))
+            for word, vector in self._WORDS_VECTORS:
+                word2vec_file.write(word.encode('utf-8') + b' ' + vector.astype('<f4').tobytes() + b'\n')
+
+        for words_vectors in [iter_glove_embeddings(glove_file_path), iter_word2vec_embeddings(word2vec_file_path)]:
+            words_vectors = list(words_vectors)
+            self.assertEqual([word for word, _ in self._WORDS_VECTORS], [word for word, _ in words_vectors])
+            for (_, expected_vector), (_, vector) in zip(self._WORDS_VECTORS, words_vectors):
+                np.testing.assert_array_equal(expected_vector, vector)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.images_manifest import ImagesManifest, get_images_manifest
+
+
+class TestImagesManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        for file_name, content in (('topic0.png', b'first image'), ('topic1.png', b'second image')):
+            with open(join_paths(self.dir_path, file_name), 'wb') as file:
+                file.write(content)
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_build_and_load(self):
+        """
+        Builds the manifest of a folder, loads it from disk and checks the digests and the version.
+        """
+        manifest = ImagesManifest.build(self.dir_path)
+
+        self.assertEqual(['manifest.json', 'topic0.png', 'topic1.png'], sorted(os.listdir(self.dir_path)))
+        self.assertEqual(['topic0.png', 'topic1.png'], sorted(manifest.files_digests))
+        self.assertNotEqual(manifest.get_file_digest('topic0.png'), manifest.get_file_digest('topic1.png'))
+        self.assertIsNone(manifest.get_file_digest(ImagesManifest.FILE_NAME))
+
+        loaded_manifest = ImagesManifest.load(self.dir_path)
+        self.assertEqual(manifest.files_digests, loaded_manifest.files_digests)
+        self.assertEqual(manifest.version, loaded_manifest.version)
+
+    def test_version_changes_with_content(self):
+        """
+        Checks that the version of the manifest changes if the content of an image changes.
+        """
+        version = ImagesManifest.build(self.dir_path).version
+
+        with open(join_paths(self.dir_path, 'topic1.png'), 'wb') as file:
+            file.write(b'other image')
+
+        self.assertNotEqual(version, ImagesManifest.build(self.dir_path).version)
+
+    def test_load_without_manifest(self):
+        """
+        Checks that the manifest of a folder without manifest is built when it's loaded,
+        and that the manifest of a folder that doesn't exist is None.
+        """
+        self.assertIsNone(ImagesManifest.load(join_paths(self.dir_path, 'not-exists')))
+        self.assertIsNone(get_images_manifest(join_paths(self.dir_path, 'not-exists')))
+
+        manifest = get_images_manifest(self.dir_path)
+        self.assertEqual(2, len(manifest.files_digests))
+        self.assertTrue(os.path.exists(join_paths(self.dir_path, ImagesManifest.FILE_NAME)))
+        self.assertIs(manifest, get_images_manifest(self.dir_path))
+
+    def test_get_images_manifest_after_rendering_again(self):
+        """
+        Checks that the loaded manifest of a folder is replaced when the folder is removed and the images
+        are rendered again.
+        """
+        manifest = get_images_manifest(self.dir_path)
+
+        rmtree(self.dir_path)
+        self.assertIsNone(get_images_manifest(self.dir_path))
+
+        os.mkdir(self.dir_path)
+        with open(join_paths(self.dir_path, 'topic0.svg'), 'wb') as file:
+            file.write(b'new image')
+        ImagesManifest.build(self.dir_path)
+
+        new_manifest = get_images_manifest(self.dir_path)
+        self.assertEqual(['topic0.svg'], list(new_manifest.files_digests))
+        self.assertNotEqual(manifest.version, new_manifest.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,289 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.mallet_inference_pool import MalletInferencePool, MalletInferencePoolFullError, \
+    MalletInferenceTimeoutError, ThreadSafeLdaMalletInference
+
+
+class FakeLdaMallet:
+    """
+    Fake of the gensim LdaMallet model, that writes the documents in a file with a fixed name (like mallet does)
+    and returns the first word id of each document (read from the file) as it's topic.
+    """
+
+    def __init__(self, prefix, infer_started=None, continue_infer=None):
+        self.prefix = prefix
+        self.infer_started = infer_started
+        self.continue_infer = continue_infer
+
+    def fcorpusmallet(self):
+        return self.prefix + 'corpus.mallet'
+
+    def finferencer(self):
+        return self.prefix + 'inferencer.mallet'
+
+    def __getitem__(self, bows):
+        with open(self.prefix + 'corpus.txt', 'w') as corpus_file:
+            corpus_file.write('\n'.join(str(bow[0][0]) for bow in bows))
+        # The documents of the first word are blocked between writing them and reading the results
+        if bows[0][0][0] == 0:
+            self.infer_started.set()
+            self.continue_infer.wait()
+        with open(self.prefix + 'corpus.txt', 'r') as corpus_file:
+            return [[(int(word_id), 1.0)] for word_id in corpus_file.read().split('\n')]
+
+
+class TestMalletInferencePool(unittest.TestCase):
+
+    def test_infer_in_batches(self):
+        """
+        Sends some documents at the same time and checks that each one receives it's own result,
+        and that the documents waiting in the queue are sent together to the infer function.
+        """
+        infer_started = threading.Event()
+        continue_infer = threading.Event()
+        batches = []
+
+        # Fake infer function that returns the first word id of each document as the topic.
+        # The first call blocks until continue_infer is set, so the other documents wait in the queue.
+        def infer_func(bows):
+            batches.append(len(bows))
+            infer_started.set()
+            continue_infer.wait()
+            return [[(bow[0][0], 1.0)] for bow in bows]
+
+        pool = MalletInferencePool(infer_func, num_workers=1, max_queue_size=10, max_batch_size=10)
+
+        results = {}
+
+        def infer(word_id):
+            results[word_id] = pool.infer([(word_id, 1)])
+
+        # The first document blocks the worker
+        threads = [threading.Thread(target=infer, args=(0,))]
+        threads[0].start()
+        infer_started.wait()
+
+        # The rest of the documents wait in the queue
+        for word_id in range(1, 5):
+            threads.append(threading.Thread(target=infer, args=(word_id,)))
+            threads[-1].start()
+        while pool.get_stats()['queue_size'] < 4:
+            pass
+
+        continue_infer.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({word_id: [(word_id, 1.0)] for word_id in range(5)}, results)
+        self.assertEqual([1, 4], batches)
+        self.assertEqual(5, pool.get_stats()['num_documents'])
+
+    def test_infer_batch(self):
+        """
+        Checks that the documents of infer_batch() are sent together to the infer function,
+        and that the results are returned in the same order.
+        """
+        batches = []
+
+        def infer_func(bows):
+            batches.append(len(bows))
+            return [[(bow[0][0], 1.0)] for bow in bows]
+
+        pool = MalletInferencePool(infer_func, num_workers=1, max_batch_size=2)
+
+        self.assertEqual([[(word_id, 1.0)] for word_id in range(5)],
+                         pool.infer_batch([[(word_id, 1)] for word_id in range(5)]))
+        self.assertEqual([], pool.infer_batch([]))
+        self.assertEqual([5], batches)
+
+    def test_infer_error(self):
+        """
+        Checks that the errors of the infer function are raised in infer().
+        """
+        def infer_func(_):
+            raise ValueError('mallet error')
+
+        pool = MalletInferencePool(infer_func, num_workers=1)
+
+        with self.assertRaises(ValueError):
+            pool.infer([(0, 1)])
+        self.assertTrue(pool.is_healthy())
+
+    def test_queue_full(self):
+        """
+        Checks that a MalletInferencePoolFullError is raised if the queue is full.
+        """
+        continue_infer = threading.Event()
+        pool = MalletInferencePool(lambda bows: continue_infer.wait() and [[]] * len(bows),
+                                   num_workers=1, max_queue_size=1, max_batch_size=1)
+
+        # The first document blocks the worker, and the second one fills the queue
+        threads = [threading.Thread(target=pool.infer, args=([(0, 1)],)) for _ in range(2)]
+        threads[0].start()
+        while pool.get_stats()['queue_size'] > 0:
+            pass
+        threads[1].start()
+        while pool.get_stats()['queue_size'] < 1:
+            pass
+
+        with self.assertRaises(MalletInferencePoolFullError):
+            pool.infer([(0, 1)])
+
+        continue_infer.set()
+        for thread in threads:
+            thread.join()
+
+    def test_hung_worker_is_replaced(self):
+        """
+        Checks that a worker whose batch takes more than the timeout is replaced by a new worker,
+        and that it exits when it's batch finishes.
+        """
+        continue_infer = threading.Event()
+        hung_workers = []
+
+        def infer_func(bows):
+            if bows[0][0][0] == 0:
+                hung_workers.append(threading.current_thread())
+                continue_infer.wait()
+            return [[(bow[0][0], 1.0)] for bow in bows]
+
+        pool = MalletInferencePool(infer_func, num_workers=1, timeout=0.2)
+
+        with self.assertRaises(MalletInferenceTimeoutError) as context:
+            pool.infer([(0, 1)])
+        self.assertEqual(1, context.exception.retry_after)
+        self.assertFalse(pool.is_healthy())
+
+        # The new worker infers the topics while the hung one is still blocked
+        self.assertEqual([(1, 1.0)], pool.infer([(1, 1)]))
+        self.assertTrue(pool.is_healthy())
+        self.assertEqual(1, pool.get_stats()['num_worker_restarts'])
+
+        continue_infer.set()
+        hung_workers[0].join(5)
+        self.assertFalse(hung_workers[0].is_alive())
+        self.assertEqual([(2, 1.0)], pool.infer([(2, 1)]))
+
+    def test_replaced_workers_are_limited(self):
+        """
+        Checks that the hung workers aren't replaced while there are max_num_replaced_workers replaced workers
+        running, and that they are replaced again when the replaced workers exit.
+        """
+        continue_infer = {0: threading.Event(), 1: threading.Event()}
+
+        def infer_func(bows):
+            if bows[0][0][0] in continue_infer:
+                continue_infer[bows[0][0][0]].wait()
+            return [[(bow[0][0], 1.0)] for bow in bows]
+
+        pool = MalletInferencePool(infer_func, num_workers=1, timeout=0.2, max_num_replaced_workers=1)
+
+        # The first hung worker is replaced, and the new worker also hangs
+        with self.assertRaises(MalletInferenceTimeoutError):
+            pool.infer([(0, 1)])
+        with self.assertRaises(MalletInferenceTimeoutError):
+            pool.infer([(1, 1)])
+        self.assertEqual(1, pool.get_stats()['num_worker_restarts'])
+
+        # The second hung worker isn't replaced, because the first one is still running
+        with self.assertRaises(MalletInferenceTimeoutError):
+            pool.infer([(2, 1)])
+        self.assertEqual(1, pool.get_stats()['num_worker_restarts'])
+        self.assertEqual(1, pool.get_stats()['num_replaced_workers_running'])
+
+        # When the first hung worker exits, the second one is replaced
+        continue_infer[0].set()
+        for _ in range(50):
+            if pool.get_stats()['num_replaced_workers_running'] == 0:
+                break
+            time.sleep(0.1)
+        self.assertEqual([(3, 1.0)], pool.infer([(3, 1)]))
+        self.assertEqual(2, pool.get_stats()['num_worker_restarts'])
+
+        continue_infer[1].set()
+        pool.close()
+
+
+class TestThreadSafeLdaMalletInference(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        for file_name in ['model_corpus.mallet', 'model_inferencer.mallet']:
+            with open(join_paths(self.dir_path, file_name), 'w') as file:
+                file.write(file_name)
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_concurrent_calls_use_different_files(self):
+        """
+        Calls the model from two threads at the same time, and checks that each one receives the topics
+        of it's own documents, and that the files of the model are available in the folder of each thread.
+        """
+        infer_started = threading.Event()
+        continue_infer = threading.Event()
+        lda_mallet = FakeLdaMallet(join_paths(self.dir_path, 'model_'), infer_started, continue_infer)
+        inference = ThreadSafeLdaMalletInference(lda_mallet)
+
+        results = {}
+
+        def infer(word_id):
+            results[word_id] = inference([[(word_id, 1)]])
+
+        thread = threading.Thread(target=infer, args=(0,))
+        thread.start()
+        infer_started.wait()
+        # The second call writes and reads it's documents while the first one is blocked
+        infer(1)
+        continue_infer.set()
+        thread.join()
+
+        self.assertEqual({0: [[(0, 1.0)]], 1: [[(1, 1.0)]]}, results)
+        # The original model isn't modified
+        self.assertFalse(os.path.exists(join_paths(self.dir_path, 'model_corpus.txt')))
+
+        thread_model = inference._get_thread_model()
+        with open(thread_model.finferencer(), 'r') as inferencer_file:
+            self.assertEqual('model_inferencer.mallet', inferencer_file.read())
+
+        inference.remove_temp_files()
+        self.assertFalse(os.path.exists(thread_model.prefix))
+
+    def test_close(self):
+        """
+        Checks that close() stops the idle workers, and that the worker with a batch in progress exits
+        when it finishes.
+        """
+        infer_started = threading.Event()
+        continue_infer = threading.Event()
+
+        def infer_func(bows):
+            if bows[0][0][0] == 0:
+                infer_started.set()
+                continue_infer.wait()
+            return [[(bow[0][0], 1.0)] for bow in bows]
+
+        pool = MalletInferencePool(infer_func, num_workers=3)
+        workers = list(pool._workers)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(pool.infer([(0, 1)])))
+        thread.start()
+        self.assertTrue(infer_started.wait(5))
+
+        pool.close()
+        continue_infer.set()
+        thread.join(5)
+        self.assertEqual([[(0, 1.0)]], results)
+        for worker in workers:
+            worker.join(5)
+            self.assertFalse(worker.is_alive())
+        self.assertFalse(pool.is_healthy())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import UserResourceWithParamValueNotFoundError, join_paths
+from web_backend.wrapper.models_registry import ModelsRegistry
+from web_backend.wrapper.models_wrapper_loader import ModelsWrapperNotReadyError
+
+
+class FakeModelsWrapper:
+
+    def __init__(self, topics_model_name, progress_callback=None):
+        self.topics_model_name = topics_model_name
+        self.closed = False
+        progress_callback('Loading the Topics Model')
+
+    def close(self):
+        self.closed = True
+
+
+def _get_blocking_factory(blocked_model_name, continue_loading):
+    """
+    Returns a factory of FakeModelsWrappers that waits for the continue_loading event to load the given model.
+    """
+    def factory(topics_model_name, progress_callback):
+        if topics_model_name == blocked_model_name:
+            continue_loading.wait()
+        return FakeModelsWrapper(topics_model_name, progress_callback)
+
+    return factory
+
+
+class TestModelsRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        for model_name, size in [('model_a', 100), ('model_b', 200), ('model_c', 300)]:
+            os.makedirs(join_paths(self.dir_path, model_name))
+            with open(join_paths(self.dir_path, model_name, 'model.bin'), 'wb') as file:
+                file.write(b'0' * size)
+        os.makedirs(join_paths(self.dir_path, '.hidden'))
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def _get_loaded_models_names(self, registry):
+        return [models_wrapper.topics_model_name for models_wrapper in registry.get_loaded_models_wrappers()]
+
+    def test_lazy_load_and_lru_eviction(self):
+        """
+        Checks that the models are loaded when they are requested, and that the least recently used model
+        is evicted, but never the default model.
+        """
+        continue_loading = threading.Event()
+        registry = ModelsRegistry(_get_blocking_factory('model_b', continue_loading), 'model_a', self.dir_path,
+                                  max_loaded_models=2)
+        self.assertEqual(['model_a', 'model_b', 'model_c'], registry.get_models_names())
+
+        registry.start()
+        self.assertTrue(registry.wait(timeout=5))
+        self.assertEqual('model_a', registry.get().topics_model_name)
+
+        with self.assertRaises(ModelsWrapperNotReadyError):
+            registry.get('model_b')
+        continue_loading.set()
+        self.assertTrue(registry.wait(timeout=5))
+        self.assertEqual('model_b', registry.get('model_b').topics_model_name)
+
+        registry.get('model_a')
+        registry.get_loader('model_c')
+        self.assertTrue(registry.wait(timeout=5))
+        # model_b is the least recently used model that isn't the default one
+        self.assertEqual(['model_a', 'model_c'], self._get_loaded_models_names(registry))
+
+        status = registry.get_status()
+        self.assertEqual('model_a', status['default_model'])
+        self.assertEqual(1, status['num_evictions'])
+        self.assertEqual(['ready', 'not_loaded', 'ready'], [model['state'] for model in status['models']])
+        self.assertEqual([100, 200, 300], [model['size_bytes'] for model in status['models']])
+
+        for model_name in ['not_exists', '.hidden', '../' + os.path.basename(self.dir_path)]:
+            with self.assertRaises(UserResourceWithParamValueNotFoundError):
+                registry.get(model_name)
+
+    def test_memory_budget(self):
+        """
+        Checks that the models are evicted when the size of the loaded models exceeds the memory budget.
+        """
+        registry = ModelsRegistry(FakeModelsWrapper, 'model_a', self.dir_path, max_loaded_models=3,
+                                  memory_budget_bytes=450)
+        registry.start()
+        registry.get_loader('model_b')
+        self.assertTrue(registry.wait(timeout=5))
+        registry.get_loader('model_c')
+        self.assertTrue(registry.wait(timeout=5))
+        self.assertEqual(['model_a', 'model_c'], self._get_loaded_models_names(registry))
+
+    def test_hot_swap(self):
+        """
+        Checks that the default model is only changed when the new one has been loaded, and that a reloaded model
+        keeps answering until the new ModelsWrapper is loaded.
+        """
+        continue_loading = threading.Event()
+        registry = ModelsRegistry(_get_blocking_factory('model_b', continue_loading), 'model_a', self.dir_path)
+        registry.start()
+        self.assertTrue(registry.wait(timeout=5))
+        models_wrapper_a = registry.get()
+
+        registry.set_default_model('model_b')
+        self.assertIs(models_wrapper_a, registry.get())
+        self.assertEqual('model_b', registry.get_status()['next_default_model'])
+
+        continue_loading.set()
+        self.assertTrue(registry.wait(timeout=5))
+        self.assertEqual('model_b', registry.get().topics_model_name)
+        self.assertEqual('model_b', registry.get_status()['default_model'])
+
+        self.assertTrue(registry.reload('model_a'))
+        self.assertTrue(registry.wait(timeout=5))
+        self.assertIsNot(models_wrapper_a, registry.get('model_a'))
+        self.assertFalse(registry.reload('model_c'))
+
+    def test_evicted_model_is_closed_after_use(self):
+        """
+        Checks that an evicted model isn't closed while it's being used, and that it's closed when it's released.
+        """
+        registry = ModelsRegistry(FakeModelsWrapper, 'model_a', self.dir_path, max_loaded_models=2)
+        registry.start()
+        registry.get_loader('model_b')
+        self.assertTrue(registry.wait(timeout=5))
+
+        with registry.use('model_b') as models_wrapper_b:
+            registry.get_loader('model_c')
+            self.assertTrue(registry.wait(timeout=5))
+            self.assertEqual(['model_a', 'model_c'], self._get_loaded_models_names(registry))
+            self.assertFalse(models_wrapper_b.closed)
+        self.assertTrue(models_wrapper_b.closed)
+
+        # The models that aren't used are closed when they are evicted
+        models_wrapper_c = registry.get('model_c')
+        registry.get_loader('model_b')
+        self.assertTrue(models_wrapper_c.closed)
+        self.assertFalse(registry.get().closed)
+
+    def test_failed_load_is_retried(self):
+        """
+        Checks that a model whose load has failed is loaded again when it's requested after retry_after seconds.
+        """
+        num_loads = []
+
+        def factory(topics_model_name, progress_callback):
+            num_loads.append(topics_model_name)
+            if len(num_loads) == 1:
+                raise EnvironmentError('Path not found')
+            return FakeModelsWrapper(topics_model_name, progress_callback)
+
+        registry = ModelsRegistry(factory, 'model_a', self.dir_path, retry_after=0.2)
+        registry.start()
+        self.assertFalse(registry.wait(timeout=5))
+        with self.assertRaises(ModelsWrapperNotReadyError):
+            registry.get()
+
+        time.sleep(0.2)
+        registry.get_loader()
+        self.assertTrue(registry.wait(timeout=5))
+        self.assertEqual('model_a', registry.get().topics_model_name)
+        self.assertEqual(2, len(num_loads))
+
+if __name__ == '__main__':
+    unittest.main()
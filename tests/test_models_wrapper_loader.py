@@ -0,0 +1,140 @@
+import threading
+import unittest
+
+from web_backend.wrapper.models_wrapper_loader import ModelsWrapperLoader, ModelsWrapperNotReadyError
+
+
+class FakeModelsWrapper:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestModelsWrapperLoader(unittest.TestCase):
+
+    def test_load_in_background(self):
+        """
+        Checks that the loader isn't ready until the factory returns, and that the loading progress is reported.
+        """
+        continue_loading = threading.Event()
+        fake_models_wrapper = object()
+
+        def factory(progress_callback):
+            progress_callback('Loading the Topics Model')
+            progress_callback('Creating the TextRank model')
+            continue_loading.wait()
+            return fake_models_wrapper
+
+        loader = ModelsWrapperLoader(factory, retry_after=5)
+        self.assertEqual(ModelsWrapperLoader.NOT_STARTED, loader.get_status()['state'])
+
+        loader.start()
+        self.assertFalse(loader.is_ready())
+        with self.assertRaises(ModelsWrapperNotReadyError) as context:
+            loader.get()
+        self.assertEqual(5, context.exception.retry_after)
+
+        continue_loading.set()
+        loader._thread.join(timeout=5)
+
+        self.assertTrue(loader.is_ready())
+        self.assertIs(fake_models_wrapper, loader.get())
+        status = loader.get_status()
+        self.assertEqual(ModelsWrapperLoader.READY, status['state'])
+        self.assertEqual(['Loading the Topics Model', 'Creating the TextRank model'], status['completed_stages'])
+        self.assertIsNone(status['current_stage'])
+
+    def test_load_fails(self):
+        """
+        Checks that if the factory raises an exception, the loader is in the failed state and get() raises an error.
+        """
+
+        def factory(progress_callback):
+            raise EnvironmentError('Path not found')
+
+        loader = ModelsWrapperLoader(factory)
+        loader.start()
+        loader._thread.join(timeout=5)
+
+        self.assertFalse(loader.is_ready())
+        self.assertEqual(ModelsWrapperLoader.FAILED, loader.get_status()['state'])
+        self.assertIn('Path not found', loader.get_status()['error'])
+        with self.assertRaises(ModelsWrapperNotReadyError):
+            loader.get()
+
+    def test_reload(self):
+        """
+        Checks that the current ModelsWrapper is returned while a new one is loaded, and that it's kept
+        if the new one fails to load.
+        """
+        continue_loading = threading.Event()
+        models_wrappers = []
+
+        def factory(progress_callback):
+            if len(models_wrappers) == 1:
+                continue_loading.wait()
+            if len(models_wrappers) == 2:
+                raise EnvironmentError('Path not found')
+            models_wrappers.append(FakeModelsWrapper())
+            return models_wrappers[-1]
+
+        loader = ModelsWrapperLoader(factory)
+        loader.start()
+        self.assertTrue(loader.wait(5))
+
+        self.assertTrue(loader.reload())
+        self.assertFalse(loader.reload())
+        self.assertTrue(loader.get_status()['reloading'])
+        self.assertIs(models_wrappers[0], loader.get())
+
+        continue_loading.set()
+        self.assertTrue(loader.wait(5))
+        self.assertIs(models_wrappers[1], loader.get())
+        self.assertEqual(1, loader.get_status()['num_reloads'])
+
+        self.assertTrue(loader.reload())
+        self.assertTrue(loader.wait(5))
+        self.assertIs(models_wrappers[1], loader.get())
+        self.assertEqual(ModelsWrapperLoader.READY, loader.get_status()['state'])
+        self.assertIn('Path not found', loader.get_status()['error'])
+
+    def test_close_when_released(self):
+        """
+        Checks that the ModelsWrapper replaced by a reload, and the current one after close(), are only closed
+        when the last user releases them.
+        """
+        models_wrappers = []
+
+        def factory(progress_callback):
+            models_wrappers.append(FakeModelsWrapper())
+            return models_wrappers[-1]
+
+        loader = ModelsWrapperLoader(factory)
+        loader.start()
+        self.assertTrue(loader.wait(5))
+        models_wrapper = loader.acquire()
+        self.assertIs(models_wrapper, loader.acquire())
+
+        self.assertTrue(loader.reload())
+        self.assertTrue(loader.wait(5))
+        self.assertIs(models_wrappers[1], loader.get())
+        loader.release(models_wrapper)
+        self.assertFalse(models_wrappers[0].closed)
+        loader.release(models_wrapper)
+        self.assertTrue(models_wrappers[0].closed)
+
+        # The current ModelsWrapper isn't closed when it's released, until the loader is closed
+        loader.release(loader.acquire())
+        self.assertFalse(models_wrappers[1].closed)
+        models_wrapper = loader.acquire()
+        loader.close()
+        self.assertFalse(models_wrappers[1].closed)
+        loader.release(models_wrapper)
+        self.assertTrue(models_wrappers[1].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
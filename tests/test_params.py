@@ -3,12 +3,14 @@ from os import remove
 from shutil import copyfile
 
 from tests.utils import get_abspath_from_tests_root
-from web_backend.params import get_param, update_param
+from web_backend.params import get_param, get_params, update_param
+from web_backend.utils import get_abspath_from_project_source_root
 
 
 class TestParams(unittest.TestCase):
     _PARAMS_TEST_FILE_PATH = get_abspath_from_tests_root('params-test-file.yaml')
     _PARAMS_TEST_UPDATE_FILE_PATH = get_abspath_from_tests_root('params-test-update-file.yaml')
+    _PARAMS_TEST_UPDATE_LOCK_FILE_PATH = get_abspath_from_tests_root('.params-test-update-file.yaml.lock')
 
     def test_get_param(self):
         """
@@ -22,6 +24,15 @@ class TestParams(unittest.TestCase):
         self.assertEqual(get_param('text.num_related_documents.min', self._PARAMS_TEST_FILE_PATH), 1)
         self.assertEqual(get_param('text.num_related_documents.max', self._PARAMS_TEST_FILE_PATH), 20)
 
+    def test_get_params(self):
+        """
+        Checks that all the params are returned with the same structure as the yaml test file.
+        """
+        params = get_params(self._PARAMS_TEST_FILE_PATH)
+        self.assertEqual(params['topics']['text']['num_keywords']['default'], 5)
+        self.assertEqual(params['text']['num_related_documents']['max'], 20)
+        self.assertNotIn('topics.text.num_keywords.default', params)
+
     def test_update_param(self):
         """
         Updates some param values of a copy of the yaml test file and checks if they have been correctly modified, \
@@ -53,6 +64,63 @@ class TestParams(unittest.TestCase):
         self.assertEqual(get_param('topics.wordcloud.num_keywords.min', self._PARAMS_TEST_UPDATE_FILE_PATH), 1)
         self.assertEqual(get_param('topics.wordcloud.num_keywords.max', self._PARAMS_TEST_UPDATE_FILE_PATH), 100)
 
+        # Remove the yaml copy file, and the file used to lock it
+        remove(self._PARAMS_TEST_UPDATE_FILE_PATH)
+        remove(self._PARAMS_TEST_UPDATE_LOCK_FILE_PATH)
+
+    def test_update_param_keeps_file_layout(self):
+        """
+        Updates a param of a copy of the params file of the app, that has comments, and checks that only the line \
+        of the param has been modified. Also checks that the params that don't exist or have nested params \
+        can't be updated.
+        """
+        copyfile(get_abspath_from_project_source_root('params-file.yaml'), self._PARAMS_TEST_UPDATE_FILE_PATH)
+        with open(self._PARAMS_TEST_UPDATE_FILE_PATH) as yaml_file:
+            yaml_lines = yaml_file.readlines()
+
+        update_param('topics.wordcloud.num_keywords.max', 50, self._PARAMS_TEST_UPDATE_FILE_PATH)
+        update_param('text.num_summary_sentences.default', 3, self._PARAMS_TEST_UPDATE_FILE_PATH)
+
+        with open(self._PARAMS_TEST_UPDATE_FILE_PATH) as yaml_file:
+            new_yaml_lines = yaml_file.readlines()
+        changed_lines = [(line, new_line) for line, new_line in zip(yaml_lines, new_yaml_lines) if line != new_line]
+        self.assertEqual(len(yaml_lines), len(new_yaml_lines))
+        self.assertEqual([('            max: 100  # MAX_NUM_KEYWORDS_TOPIC_NUBE\n',
+                           '            max: 50  # MAX_NUM_KEYWORDS_TOPIC_NUBE\n'),
+                          ('        default: 4\n', '        default: 3\n')], changed_lines)
+        self.assertEqual(get_param('topics.wordcloud.num_keywords.max', self._PARAMS_TEST_UPDATE_FILE_PATH), 50)
+        # Other param with the same keys in other parent param isn't modified
+        self.assertEqual(get_param('topics.documents.num_summary_sentences.default',
+                                   self._PARAMS_TEST_UPDATE_FILE_PATH), 2)
+
+        with self.assertRaises(KeyError):
+            update_param('topics.wordcloud.num_keywords.other', 1, self._PARAMS_TEST_UPDATE_FILE_PATH)
+        with self.assertRaises(KeyError):
+            update_param('topics.wordcloud.num_keywords', 1, self._PARAMS_TEST_UPDATE_FILE_PATH)
+        with open(self._PARAMS_TEST_UPDATE_FILE_PATH) as yaml_file:
+            self.assertEqual(new_yaml_lines, yaml_file.readlines())
+
+        remove(self._PARAMS_TEST_UPDATE_FILE_PATH)
+        remove(self._PARAMS_TEST_UPDATE_LOCK_FILE_PATH)
+
+    def test_get_param_reloads_modified_file(self):
+        """
+        Modifies a copy of the yaml test file without using update_param() and checks that get_param() returns \
+        the new values, instead of the ones parsed before the modification.
+        """
+        # Create a copy of the params-file.yaml and load a param from it
+        copyfile(self._PARAMS_TEST_FILE_PATH, self._PARAMS_TEST_UPDATE_FILE_PATH)
+        self.assertEqual(get_param('topics.text.num_keywords.default', self._PARAMS_TEST_UPDATE_FILE_PATH), 5)
+
+        # Modify the file copied directly
+        with open(self._PARAMS_TEST_UPDATE_FILE_PATH) as yaml_file:
+            yaml_file_content = yaml_file.read()
+        with open(self._PARAMS_TEST_UPDATE_FILE_PATH, 'w') as yaml_file:
+            yaml_file.write(yaml_file_content.replace('default: 5', 'default: 50'))
+
+        # Check that the value of the param has been reloaded
+        self.assertEqual(get_param('topics.text.num_keywords.default', self._PARAMS_TEST_UPDATE_FILE_PATH), 50)
+
         # Remove the yaml copy file
         remove(self._PARAMS_TEST_UPDATE_FILE_PATH)
 
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+import numpy as np
+
+from web_backend.wrapper.embeddings_store import EmbeddingsStore
+from web_backend.wrapper.sentence_vectors_cache import SentenceVectorsCache, SentenceVectorsStore, \
+    get_sentence_digest
+from web_backend.wrapper.summarization import TextRankSummarizer
+
+
+def _get_sentences_vectors(sentences):
+    """
+    Returns a vector with the length and the number of words of each sentence.
+    """
+    return np.array([[len(sentence), len(sentence.split())] for sentence in sentences], dtype=np.float32)
+
+
+class TestSentenceVectorsCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_lru_eviction(self):
+        """
+        Checks that the vectors are only computed once, and that the least recently used vector is evicted.
+        """
+        computed_sentences = []
+
+        def get_sentences_vectors_func(sentences):
+            computed_sentences.extend(sentences)
+            return _get_sentences_vectors(sentences)
+
+        cache = SentenceVectorsCache(2, max_num_sentences=2)
+
+        vectors = cache.get_sentences_vectors(['a b', 'c', 'a b'], get_sentences_vectors_func)
+        np.testing.assert_array_equal(_get_sentences_vectors(['a b', 'c', 'a b']), vectors)
+        # The repeated sentence is only computed once
+        self.assertEqual(['a b', 'c'], computed_sentences)
+
+        # 'a b' is used again, so 'c' is the least recently used
+        cache.get_sentences_vectors(['a b'], get_sentences_vectors_func)
+        vectors = cache.get_sentences_vectors(['d e f'], get_sentences_vectors_func)
+        np.testing.assert_array_equal(_get_sentences_vectors(['d e f']), vectors)
+        self.assertEqual(['a b', 'c', 'd e f'], computed_sentences)
+
+        vectors = cache.get_sentences_vectors(['c', 'a b', 'd e f'], get_sentences_vectors_func)
+        np.testing.assert_array_equal(_get_sentences_vectors(['c', 'a b', 'd e f']), vectors)
+        self.assertEqual(['a b', 'c', 'd e f', 'c'], computed_sentences)
+        self.assertEqual(2, cache.get_stats()['cache_num_sentences'])
+
+        cache.clear()
+        self.assertEqual(0, cache.get_stats()['cache_num_sentences'])
+        cache.get_sentences_vectors(['c'], get_sentences_vectors_func)
+        self.assertEqual(['a b', 'c', 'd e f', 'c', 'c'], computed_sentences)
+
+    def test_texts_sentences(self):
+        """
+        Checks that the sentences of a text are only obtained once.
+        """
+        tokenized_texts = []
+
+        def tokenize_func(text):
+            tokenized_texts.append(text)
+            return text.split('. ')
+
+        cache = SentenceVectorsCache(2, max_num_texts=1)
+        self.assertEqual([['A', 'B'], ['C']], cache.get_texts_sentences(['A. B', 'C'], tokenize_func))
+        self.assertEqual([['C']], cache.get_texts_sentences(['C'], tokenize_func))
+        self.assertEqual(['A. B', 'C'], tokenized_texts)
+        self.assertEqual(1, cache.get_stats()['num_cached_texts'])
+
+    def test_store(self):
+        """
+        Builds a store, and checks that the cache obtains the vectors of the stored sentences from it.
+        """
+        store = SentenceVectorsStore.build(self.dir_path, [['a b', 'c'], ['c', 'd e f']], _get_sentences_vectors, 2)
+        self.assertEqual(3, store.num_sentences)
+        self.assertIsNone(SentenceVectorsStore.load(tempfile.gettempdir() + '/not-exists'))
+
+        vectors, found = SentenceVectorsStore.load(self.dir_path).get_vectors(
+            [get_sentence_digest(sentence) for sentence in ['d e f', 'x', 'a b']]
+        )
+        np.testing.assert_array_equal([True, False, True], found)
+        np.testing.assert_array_equal(_get_sentences_vectors(['d e f', 'x', 'a b'])[found], vectors[found])
+
+        cache = SentenceVectorsCache(2, max_num_sentences=0, sentence_vectors_store=store)
+        vectors = cache.get_sentences_vectors(['c', 'x y'], _get_sentences_vectors)
+        np.testing.assert_array_equal(_get_sentences_vectors(['c', 'x y']), vectors)
+        self.assertEqual(1, cache.get_stats()['num_stored_sentences'])
+
+    def test_rebuild_over_loaded_store(self):
+        """
+        Checks that building the store again in the same folder doesn't modify the files of the loaded store,
+        which keeps returning the old vectors, and that no temporary file is left in the folder.
+        """
+        old_store = SentenceVectorsStore.build(self.dir_path, [['a b', 'c'], ['d e f']], _get_sentences_vectors, 2)
+
+        new_store = SentenceVectorsStore.build(self.dir_path, [['x']], _get_sentences_vectors, 2)
+
+        vectors, found = old_store.get_vectors([get_sentence_digest(sentence) for sentence in ['a b', 'd e f']])
+        np.testing.assert_array_equal([True, True], found)
+        np.testing.assert_array_equal(_get_sentences_vectors(['a b', 'd e f']), vectors)
+        self.assertEqual(1, new_store.num_sentences)
+        self.assertEqual({'digests.npy', 'vectors.npy'}, set(os.listdir(self.dir_path)))
+
+    def test_summarizer_with_cache(self):
+        """
+        Checks that a TextRankSummarizer with a cache returns the same summaries as one without it.
+        """
+        embeddings_store = EmbeddingsStore.build(self.dir_path, [
+            ('car', np.array([1.0, 0.0])),
+            ('engine', np.array([0.8, 0.2])),
+            ('god', np.array([0.1, 0.9]))
+        ])
+        texts = ['Car engine. God car. Engine. God.', 'Engine car. God car. Engine. Car.']
+
+        summarizer = TextRankSummarizer(embeddings_store, sentence_cache_max_num_sentences=10,
+                                        sentence_cache_max_num_texts=10)
+        expected_summaries = TextRankSummarizer(embeddings_store).get_k_best_sentences_of_texts(texts, 2)
+        self.assertEqual(expected_summaries, summarizer.get_k_best_sentences_of_texts(texts, 2))
+        self.assertEqual(expected_summaries, summarizer.get_k_best_sentences_of_texts(texts, 2))
+
+        stats = summarizer.get_stats()
+        self.assertEqual(16, stats['num_sentences'])
+        # 'God car.' and 'Engine.' are repeated in both texts, and the second call uses only cached vectors
+        self.assertEqual(6, stats['num_computed_sentences'])
+        self.assertEqual(1 - 6 / 16, stats['sentence_cache_hit_rate'])
+
+
+if __name__ == '__main__':
+    unittest.main()
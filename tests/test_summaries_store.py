@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.summaries_store import SummariesStore
+
+
+class TestSummariesStore(unittest.TestCase):
+    _DOCS_CONTENTS = ['First doc. It has two sentences.', 'Segundo documento: ñandú.', '']
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_build_and_load(self):
+        """
+        Builds a store with a fake summarization function, loads it from disk and checks the stored summaries.
+        """
+        store_dir_path = join_paths(self.dir_path, 'summaries')
+
+        # The store doesn't exist yet
+        self.assertIsNone(SummariesStore.load(store_dir_path))
+
+        # The fake summarization function returns the first num_summary_sentences words of the text
+        def summarize_func(text, num_summary_sentences):
+            return ' '.join(text.split()[:num_summary_sentences]), num_summary_sentences == 1
+
+        SummariesStore.build(store_dir_path, self._DOCS_CONTENTS, [1, 2], summarize_func)
+        store = SummariesStore.load(store_dir_path)
+
+        for doc_id, doc_content in enumerate(self._DOCS_CONTENTS):
+            self.assertEqual(doc_id, store.get_doc_id(doc_content))
+            self.assertEqual(summarize_func(doc_content, 1), store.get_summary(doc_id, 1))
+            self.assertEqual(summarize_func(doc_content, 2), store.get_summary(doc_id, 2))
+
+        # Summaries not stored return None
+        self.assertIsNone(store.get_doc_id('Doc not present in the store'))
+        self.assertIsNone(store.get_summary(None, 1))
+        self.assertIsNone(store.get_summary(len(self._DOCS_CONTENTS), 1))
+        self.assertIsNone(store.get_summary(0, 3))
+
+    def test_rebuild_over_loaded_store(self):
+        """
+        Checks that building the store again in the same folder doesn't modify the files of the loaded store,
+        which keeps returning the old summaries, and that the new store has the new summaries.
+        """
+        docs_contents = ['Document number {}'.format(doc_id) for doc_id in range(3000)]
+        old_store = SummariesStore.build(self.dir_path, docs_contents, [1], lambda text, num: (text, True))
+
+        new_store = SummariesStore.build(self.dir_path, ['New document'], [1], lambda text, num: (text, False))
+
+        self.assertEqual(('Document number 2999', True), old_store.get_summary(2999, 1))
+        self.assertEqual(('New document', False), new_store.get_summary(0, 1))
+        self.assertEqual(1, SummariesStore.load(self.dir_path).num_docs)
+        self.assertFalse(any(file_name.endswith('.tmp') for file_name in os.listdir(self.dir_path)))
+
+
+if __name__ == '__main__':
+    unittest.main()
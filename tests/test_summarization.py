@@ -0,0 +1,134 @@
+import tempfile
+import unittest
+from shutil import rmtree
+
+import numpy as np
+
+from web_backend.wrapper.embeddings_store import EmbeddingsStore
+from web_backend.wrapper.summarization import PageRankConvergenceError, TextRankSummarizer, batch_pagerank
+
+
+def _pagerank(adjacency_matrix, alpha=0.85, max_iter=100, tol=1e-06):
+    """
+    Reference implementation of the PageRank of a single graph, with the same steps as the networkx.pagerank()
+    function. Returns None if it doesn't converge.
+    """
+    num_nodes = len(adjacency_matrix)
+    out_weights = adjacency_matrix.sum(axis=1)
+    scores = np.full(num_nodes, 1.0 / num_nodes)
+    for _ in range(max_iter):
+        last_scores = scores
+        scores = np.zeros(num_nodes)
+        dangling_sum = alpha * sum(last_scores[n] for n in range(num_nodes) if out_weights[n] == 0)
+        for n in range(num_nodes):
+            for neighbor in range(num_nodes):
+                if adjacency_matrix[n, neighbor] != 0 and out_weights[n] != 0:
+                    scores[neighbor] += alpha * last_scores[n] * adjacency_matrix[n, neighbor] / out_weights[n]
+            scores[n] += dangling_sum / num_nodes + (1.0 - alpha) / num_nodes
+        if np.abs(scores - last_scores).sum() < num_nodes * tol:
+            return scores
+    return None
+
+
+class TestBatchPagerank(unittest.TestCase):
+
+    def test_same_scores_as_single_graphs(self):
+        """
+        Computes the PageRank of graphs of different sizes at the same time, and checks that the scores are
+        the same as the ones obtained computing the PageRank of each graph separately.
+        """
+        random = np.random.RandomState(0)
+        num_nodes = [5, 1, 8, 0, 3]
+        adjacency_matrices = np.zeros((len(num_nodes), max(num_nodes), max(num_nodes)))
+        for i, n in enumerate(num_nodes):
+            vectors = np.abs(random.normal(size=(n, 4)))
+            matrix = vectors @ vectors.T
+            np.fill_diagonal(matrix, 0)
+            adjacency_matrices[i, :n, :n] = matrix
+        # The first node of the third graph is a dangling node
+        adjacency_matrices[2, 0, :] = 0
+        adjacency_matrices[2, :, 0] = 0
+
+        scores, converged, num_iterations = batch_pagerank(adjacency_matrices, num_nodes)
+
+        self.assertTrue(np.all(converged))
+        # Empty graphs don't iterate
+        np.testing.assert_array_equal([False, False, False, True, False], num_iterations == 0)
+        for i, n in enumerate(num_nodes):
+            if n > 0:
+                np.testing.assert_allclose(_pagerank(adjacency_matrices[i, :n, :n]), scores[i, :n], atol=1e-12)
+            # Padding positions have score 0
+            np.testing.assert_array_equal(np.zeros(max(num_nodes) - n), scores[i, n:])
+
+    def test_doesnt_converge(self):
+        """
+        Checks that the graphs that don't converge (because of negative weights) are marked as not converged,
+        without affecting the other graphs.
+        """
+        adjacency_matrices = np.array([
+            [[0, 1, -0.5], [1, 0, -0.9], [-0.5, -0.9, 0]],
+            [[0, 1, 1], [1, 0, 1], [1, 1, 0]]
+        ], dtype=np.float64)
+
+        scores, converged, num_iterations = batch_pagerank(adjacency_matrices, [3, 3], max_iter=50)
+
+        self.assertIsNone(_pagerank(adjacency_matrices[0], max_iter=50))
+        np.testing.assert_array_equal([False, True], converged)
+        # The graph that doesn't converge stops at the max number of iterations
+        self.assertEqual(50, num_iterations[0])
+        self.assertLess(num_iterations[1], 50)
+        np.testing.assert_allclose(np.full(3, 1 / 3), scores[1])
+
+
+class TestTextRankSummarizer(unittest.TestCase):
+    # Text where the PageRank algorithm doesn't converge, because the similarities between it's sentences are negative
+    _TEXT_DOESNT_CONVERGE = 'Car. Engine. God.'
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+        self.embeddings_store = EmbeddingsStore.build(self.dir_path, [
+            ('car', np.array([1.0, 0.0])),
+            ('engine', np.array([0.8, -1.0])),
+            ('god', np.array([-0.5, -0.9]))
+        ])
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_doesnt_converge(self):
+        """
+        Checks that a text that doesn't converge isn't summarized, and that it's counted in the stats.
+        """
+        summarizer = TextRankSummarizer(self.embeddings_store, max_iter=20)
+
+        self.assertEqual([None, ['Car.', 'Car car.']],
+                         summarizer.get_k_best_sentences_of_texts([self._TEXT_DOESNT_CONVERGE, 'Car car. Car.'], 2))
+        with self.assertRaises(PageRankConvergenceError):
+            summarizer.get_k_best_sentences_of_text(self._TEXT_DOESNT_CONVERGE, 2)
+
+        stats = summarizer.get_stats()
+        self.assertEqual(3, stats['num_texts'])
+        self.assertEqual(2, stats['num_not_converged'])
+        self.assertEqual(2 / 3, stats['fallback_rate'])
+        # The texts that don't converge stop at the max number of iterations
+        self.assertEqual(20 * 2 + 1, stats['num_iterations'])
+
+    def test_partial_ranking(self):
+        """
+        Checks that with partial_ranking, a text that doesn't converge is summarized with the last scores.
+        """
+        summarizer = TextRankSummarizer(self.embeddings_store, max_iter=20, partial_ranking=True)
+
+        self.assertEqual(2, len(summarizer.get_k_best_sentences_of_text(self._TEXT_DOESNT_CONVERGE, 2)))
+        self.assertEqual(1, summarizer.get_stats()['num_partial_rankings'])
+        self.assertEqual(0, summarizer.get_stats()['fallback_rate'])
+
+        # The stats can be moved to other summarizer
+        other_summarizer = TextRankSummarizer(self.embeddings_store)
+        other_summarizer.add_stats(summarizer.pop_stats())
+        self.assertEqual(0, summarizer.get_stats()['num_texts'])
+        self.assertEqual(1, other_summarizer.get_stats()['num_partial_rankings'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import tempfile
+import time
+import unittest
+from shutil import rmtree
+
+import numpy as np
+
+from web_backend.wrapper.embeddings_store import EmbeddingsStore
+from web_backend.wrapper.summarization import TextRankSummarizer
+from web_backend.wrapper.summarization_pool import SummarizationPool
+
+
+class TestSummarizationPool(unittest.TestCase):
+    _WORDS = ['god', 'car', 'space', 'engine', 'church', 'orbit', 'bible', 'wheel', 'nasa', 'drive']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir_path = tempfile.mkdtemp()
+        random = np.random.RandomState(0)
+        cls.embeddings_store = EmbeddingsStore.build(cls.dir_path, [(word, np.abs(random.normal(size=8)))
+                                                                    for word in cls._WORDS])
+        # Texts with a random number of sentences made of random words
+        cls.texts = [' '.join(' '.join(random.choice(cls._WORDS, size=random.randint(1, 6))).capitalize() + '.'
+                              for _ in range(random.randint(1, 10)))
+                     for _ in range(7)]
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.dir_path)
+
+    def test_same_summaries_as_summarizer(self):
+        """
+        Checks that the pool returns the same summaries as the TextRankSummarizer, in the same order as the texts.
+        """
+        pool = SummarizationPool(self.dir_path, num_workers=2, timeout=60)
+        try:
+            expected_summaries = TextRankSummarizer(self.embeddings_store).get_k_best_sentences_of_texts(self.texts, 2)
+            self.assertEqual(expected_summaries, pool.get_k_best_sentences_of_texts(self.texts, 2))
+            self.assertEqual(0, pool.get_stats()['num_timeouts'])
+        finally:
+            pool.shutdown()
+
+    def test_timeout(self):
+        """
+        Checks that the texts that aren't summarized in time have None as result.
+        """
+        pool = SummarizationPool(self.dir_path, num_workers=2, timeout=0)
+        try:
+            self.assertEqual([None] * len(self.texts), pool.get_k_best_sentences_of_texts(self.texts, 2))
+            self.assertEqual(2, pool.get_stats()['num_timeouts'])
+        finally:
+            pool.shutdown()
+
+    def test_pending_tasks_are_limited(self):
+        """
+        Checks that the texts aren't sent to the workers while there are max_num_pending_tasks chunks pending,
+        and that they are sent again when the pending chunks finish.
+        """
+        pool = SummarizationPool(self.dir_path, num_workers=2, timeout=0, max_num_pending_tasks=2)
+        try:
+            # The chunks time out, but they are still pending in the workers
+            self.assertEqual([None] * len(self.texts), pool.get_k_best_sentences_of_texts(self.texts, 2))
+            self.assertEqual([None] * len(self.texts), pool.get_k_best_sentences_of_texts(self.texts, 2))
+            self.assertEqual(2, pool.get_stats()['num_tasks'])
+            self.assertEqual(1, pool.get_stats()['num_rejected'])
+
+            for _ in range(600):
+                if pool.get_stats()['num_pending_tasks'] == 0:
+                    break
+                time.sleep(0.1)
+            pool.timeout = 60
+            expected_summaries = TextRankSummarizer(self.embeddings_store).get_k_best_sentences_of_texts(self.texts, 2)
+            self.assertEqual(expected_summaries, pool.get_k_best_sentences_of_texts(self.texts, 2))
+            self.assertEqual(4, pool.get_stats()['num_tasks'])
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
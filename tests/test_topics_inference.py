@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+
+from web_backend.wrapper.topics_inference import TopicsInferencer
+
+
+class TestTopicsInferencer(unittest.TestCase):
+    # 3 topics and 6 words. Words 0 and 1 belong to topic 0, words 2 and 3 to topic 1 and words 4 and 5 to topic 2.
+    _TOPIC_WORD_COUNTS = np.array([
+        [100, 80, 1, 0, 0, 2],
+        [0, 3, 120, 90, 1, 0],
+        [1, 0, 0, 2, 70, 110]
+    ])
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.inferencer = TopicsInferencer(cls._TOPIC_WORD_COUNTS, alpha=3)
+
+    def test_infer(self):
+        """
+        Checks that the inferred topics distribution sums 1 and gives more probability to the topic of the words.
+        """
+        topics_probs = self.inferencer.infer([(2, 3), (3, 2), (4, 1)])
+
+        self.assertEqual((3,), topics_probs.shape)
+        self.assertAlmostEqual(1, topics_probs.sum())
+        self.assertEqual(1, np.argmax(topics_probs))
+        self.assertGreater(topics_probs[2], topics_probs[0])
+
+    def test_infer_unknown_words(self):
+        """
+        Checks that a document without known words has the topics distribution given by alpha.
+        """
+        topics_probs = self.inferencer.infer([(100, 3)])
+        np.testing.assert_allclose(topics_probs, [1 / 3, 1 / 3, 1 / 3])
+
+    def test_predict_topic_prob(self):
+        """
+        Checks that the topics are returned sorted by probability in descending order.
+        """
+        topic_prob_list = self.inferencer.predict_topic_prob([(5, 4), (0, 2)], num_best_topics=2)
+
+        self.assertEqual(2, len(topic_prob_list))
+        self.assertEqual([2, 0], [topic for topic, _ in topic_prob_list])
+        self.assertGreater(topic_prob_list[0][1], topic_prob_list[1][1])
+
+    def test_infer_batch(self):
+        """
+        Checks that inferring the topics of several documents at once gives the same result as inferring them
+        one by one, including documents without known words.
+        """
+        bows = [[(2, 3), (3, 2), (4, 1)], [], [(5, 4), (0, 2)], [(100, 3)], [(1, 1)], [(0, 5), (2, 5), (4, 5)]]
+
+        docs_topics_probs = self.inferencer.infer_batch(bows)
+
+        self.assertEqual((len(bows), 3), docs_topics_probs.shape)
+        for bow, topics_probs in zip(bows, docs_topics_probs):
+            np.testing.assert_allclose(self.inferencer.infer(bow), topics_probs)
+
+        for bow, topic_prob_list in zip(bows, self.inferencer.predict_topic_prob_batch(bows, num_best_topics=2)):
+            expected_topic_prob_list = self.inferencer.predict_topic_prob(bow, num_best_topics=2)
+            self.assertEqual([topic for topic, _ in expected_topic_prob_list], [topic for topic, _ in topic_prob_list])
+            np.testing.assert_allclose([prob for _, prob in expected_topic_prob_list],
+                                       [prob for _, prob in topic_prob_list])
+
+
+if __name__ == '__main__':
+    unittest.main()
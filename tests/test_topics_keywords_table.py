@@ -0,0 +1,44 @@
+import json
+import unittest
+from collections import namedtuple
+
+from web_backend.wrapper.topics_keywords_table import TopicsKeywordsTable
+
+# Fake Topic and Keyword classes, with the same attributes as the ones of the topics_and_summary library
+Topic = namedtuple('Topic', ['id', 'keywords'])
+Keyword = namedtuple('Keyword', ['name', 'probability'])
+
+
+class TestTopicsKeywordsTable(unittest.TestCase):
+    _TOPICS = [
+        Topic(1, [Keyword('space', 0.25), Keyword('nasa', 0.2), Keyword('launch', 0.1)]),
+        Topic(0, [Keyword('god', 0.3), Keyword('jesus', 0.2), Keyword('ñandú', 0.05)])
+    ]
+
+    def test_get_topics(self):
+        """
+        Checks that the topics of the table are sorted by id and have the given number of keywords.
+        """
+        table = TopicsKeywordsTable.from_topics(self._TOPICS)
+        self.assertEqual(3, table.max_num_keywords)
+
+        self.assertEqual([{'topic': 0, 'keywords': [{'name': 'god', 'probability': 0.3},
+                                                     {'name': 'jesus', 'probability': 0.2}]},
+                          {'topic': 1, 'keywords': [{'name': 'space', 'probability': 0.25},
+                                                     {'name': 'nasa', 'probability': 0.2}]}],
+                         table.get_topics(2))
+        self.assertEqual(3, len(table.get_topics(10)[0]['keywords']))
+
+    def test_get_topics_json(self):
+        """
+        Checks that the JSON contains the topics returned by get_topics(), and that it's serialized only once.
+        """
+        table = TopicsKeywordsTable.from_topics(self._TOPICS)
+
+        topics_json = table.get_topics_json(3)
+        self.assertEqual(table.get_topics(3), json.loads(topics_json.decode('utf-8')))
+        self.assertIs(topics_json, table.get_topics_json(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import os
+import tempfile
+import threading
+import unittest
+from shutil import rmtree
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.word_cloud_jobs import WordCloudJob, WordCloudJobQueue
+
+
+class TestWordCloudJobQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_submit_deduplicates_and_publishes_atomically(self):
+        """
+        Submits the same num_keywords several times while it's being rendered, and checks that the images
+        are rendered once, inside a temporary folder that is renamed to the final folder.
+        """
+        continue_render = threading.Event()
+        render_dir_paths = []
+
+        def render_func(num_keywords, dir_path):
+            render_dir_paths.append(dir_path)
+            continue_render.wait()
+            with open(join_paths(dir_path, 'topic0.png'), 'w') as image_file:
+                image_file.write(str(num_keywords))
+
+        job_queue = WordCloudJobQueue(self.dir_path, render_func)
+        final_dir_path = job_queue.get_images_dir_path(10)
+
+        self.assertIsNone(job_queue.get_job(10))
+        job = job_queue.submit(10)
+        self.assertIs(job, job_queue.submit(10))
+        self.assertIs(job, job_queue.get_job(10))
+
+        # The final folder doesn't exist until all the images have been rendered
+        self.assertFalse(job.wait(0.05))
+        self.assertFalse(os.path.exists(final_dir_path))
+
+        continue_render.set()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(WordCloudJob.DONE, job.state)
+        self.assertEqual(['manifest.json', 'topic0.png'], sorted(os.listdir(final_dir_path)))
+        self.assertEqual(['10keywords'], os.listdir(self.dir_path))
+        self.assertEqual(1, len(render_dir_paths))
+        self.assertNotEqual(final_dir_path, render_dir_paths[0])
+
+        # The images aren't rendered again
+        self.assertTrue(job_queue.submit(10).is_done())
+        self.assertEqual(1, len(render_dir_paths))
+        self.assertEqual(1, job_queue.get_stats()['num_jobs'])
+        self.assertEqual(1, job_queue.get_stats()['num_deduplicated'])
+
+    def test_images_rendered_before(self):
+        """
+        Checks that the images rendered before the queue was created (or by other process) aren't rendered again.
+        """
+        os.mkdir(join_paths(self.dir_path, '5keywords'))
+        job_queue = WordCloudJobQueue(self.dir_path, lambda num_keywords, dir_path: self.fail('Rendered again'))
+
+        self.assertTrue(job_queue.get_job(5).is_done())
+        self.assertTrue(job_queue.submit(5).is_done())
+
+    def test_images_rendered_with_other_version(self):
+        """
+        Checks that the images rendered by a queue with other version (for example, with other topics model
+        with the same name) aren't used, and that the images of each version are stored in a different folder.
+        """
+        num_calls = []
+        old_job_queue = WordCloudJobQueue(self.dir_path, lambda num_keywords, dir_path: None, version='old')
+        self.assertTrue(old_job_queue.submit(5).wait(5))
+
+        job_queue = WordCloudJobQueue(self.dir_path, lambda num_keywords, dir_path: num_calls.append(num_keywords),
+                                      version='new')
+        self.assertIsNone(job_queue.get_job(5))
+        self.assertTrue(job_queue.submit(5).wait(5))
+
+        self.assertEqual([5], num_calls)
+        self.assertEqual(join_paths(self.dir_path, '5keywords-new'), job_queue.get_images_dir_path(5))
+        self.assertEqual(['5keywords-new', '5keywords-old'], sorted(os.listdir(self.dir_path)))
+
+    def test_render_error(self):
+        """
+        Checks that a job fails if the images can't be rendered, that the temporary folder is removed,
+        and that the images are rendered again in the next submit.
+        """
+        num_calls = []
+
+        def render_func(num_keywords, dir_path):
+            num_calls.append(num_keywords)
+            if len(num_calls) == 1:
+                raise ValueError('render error')
+
+        job_queue = WordCloudJobQueue(self.dir_path, render_func)
+
+        job = job_queue.submit(3)
+        self.assertTrue(job.wait(5))
+        self.assertEqual(WordCloudJob.FAILED, job.state)
+        self.assertIn('render error', job.error)
+        self.assertEqual([], os.listdir(self.dir_path))
+
+        job = job_queue.submit(3)
+        self.assertTrue(job.wait(5))
+        self.assertTrue(job.is_done())
+        self.assertEqual(2, len(num_calls))
+
+    def test_clear(self):
+        """
+        Checks that clear() removes the rendered images, so they are rendered again in the next submit.
+        """
+        num_calls = []
+        job_queue = WordCloudJobQueue(self.dir_path, lambda num_keywords, dir_path: num_calls.append(num_keywords))
+        self.assertTrue(job_queue.submit(7).wait(5))
+        self.assertEqual(['7keywords'], os.listdir(self.dir_path))
+
+        job_queue.clear()
+        self.assertEqual([], os.listdir(self.dir_path))
+        self.assertIsNone(job_queue.get_job(7))
+
+        self.assertTrue(job_queue.submit(7).wait(5))
+        self.assertEqual([7, 7], num_calls)
+
+    def test_close(self):
+        """
+        Checks that close() stops the worker thread after the job that is being rendered, and that the pending jobs
+        and the jobs submitted after it fail.
+        """
+        render_started = threading.Event()
+        continue_render = threading.Event()
+
+        def render_func(num_keywords, dir_path):
+            render_started.set()
+            continue_render.wait()
+
+        job_queue = WordCloudJobQueue(self.dir_path, render_func)
+        rendering_job = job_queue.submit(1)
+        self.assertTrue(render_started.wait(5))
+        pending_job = job_queue.submit(2)
+
+        job_queue.close()
+        self.assertTrue(pending_job.wait(5))
+        self.assertEqual(WordCloudJob.FAILED, pending_job.state)
+        self.assertEqual(WordCloudJob.FAILED, job_queue.submit(3).state)
+
+        continue_render.set()
+        self.assertTrue(rendering_job.wait(5))
+        self.assertTrue(rendering_job.is_done())
+        job_queue._thread.join(5)
+        self.assertFalse(job_queue._thread.is_alive())
+
+    def test_clear_shared_folder(self):
+        """
+        Checks that clear_finished_jobs() doesn't remove the images, and that the images removed by other queue
+        with the same folder (for example, of other process) are rendered again after it.
+        """
+        num_calls = []
+        job_queue = WordCloudJobQueue(self.dir_path, lambda num_keywords, dir_path: num_calls.append(num_keywords))
+        other_job_queue = WordCloudJobQueue(self.dir_path, lambda num_keywords, dir_path: None)
+        self.assertTrue(job_queue.submit(7).wait(5))
+
+        other_job_queue.clear()
+        self.assertEqual([], os.listdir(self.dir_path))
+        self.assertTrue(job_queue.get_job(7).is_done())
+
+        job_queue.clear_finished_jobs()
+        self.assertIsNone(job_queue.get_job(7))
+        self.assertTrue(job_queue.submit(7).wait(5))
+        self.assertEqual([7, 7], num_calls)
+
+        other_job_queue.clear_finished_jobs()
+        self.assertEqual(['7keywords'], os.listdir(self.dir_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from shutil import rmtree
+
+from PIL import Image
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.word_cloud_rendering import WordCloudRenderer
+
+
+class TestWordCloudRenderer(unittest.TestCase):
+    _TOPICS_FREQUENCIES = [
+        {'god': 0.3, 'jesus': 0.2, 'church': 0.1},
+        {'space': 0.25, 'nasa': 0.2, 'launch': 0.15, 'orbit': 0.1}
+    ]
+
+    def setUp(self):
+        self.dir_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.dir_path)
+
+    def test_render_with_variants(self):
+        """
+        Renders the images of some topics in the current process and checks their files, formats and sizes.
+        """
+        renderer = WordCloudRenderer(width=200, height=100, image_format='webp', variant_widths=[100, 300, 50],
+                                     num_workers=0)
+
+        # The widths greater or equal than the width are ignored, and the main image is the last one
+        self.assertEqual([(50, 'topic1-50w.webp'), (100, 'topic1-100w.webp'), (200, 'topic1.webp')],
+                         renderer.get_images_file_names(1))
+
+        renderer.render(self._TOPICS_FREQUENCIES, self.dir_path)
+
+        self.assertEqual(6, len(os.listdir(self.dir_path)))
+        for topic in range(len(self._TOPICS_FREQUENCIES)):
+            for width, file_name in renderer.get_images_file_names(topic):
+                with Image.open(join_paths(self.dir_path, file_name)) as image:
+                    self.assertEqual('WEBP', image.format)
+                    self.assertEqual((width, width // 2), image.size)
+
+    def test_render_in_parallel(self):
+        """
+        Renders the images of some topics in worker processes and checks that all of them are stored as PNG.
+        """
+        renderer = WordCloudRenderer(width=200, height=100, image_format='png', num_workers=2)
+        renderer.render(self._TOPICS_FREQUENCIES, self.dir_path)
+
+        self.assertEqual(['topic0.png', 'topic1.png'], sorted(os.listdir(self.dir_path)))
+        with Image.open(join_paths(self.dir_path, 'topic0.png')) as image:
+            self.assertEqual('PNG', image.format)
+
+    def test_wrong_image_format(self):
+        with self.assertRaises(Exception):
+            WordCloudRenderer(image_format='jpg')
+
+
+if __name__ == '__main__':
+    unittest.main()
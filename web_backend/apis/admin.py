@@ -1,7 +1,200 @@
-from flask import Blueprint, jsonify
+import hmac
+import os
+import signal
+import threading
+from typing import TYPE_CHECKING, List
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.exceptions import abort
+
+from web_backend.apis.user import get_response_cache, models_registry, models_wrapper_not_ready
+from web_backend.commands import CommandsBroadcaster
+from web_backend.params import get_param, get_params, update_param
+from web_backend.utils import WORDCLOUD_IMAGES_DIR_PATH, UserError, UserResourceWithParamValueNotFoundError, \
+    get_abspath_from_project_source_root, get_config, join_paths, reload_config
+from web_backend.wrapper.models_wrapper_loader import ModelsWrapperNotReadyError
+from web_backend.wrapper.word_cloud_jobs import WordCloudJobQueue
+
+if TYPE_CHECKING:
+    from web_backend.wrapper.models_wrapper import ModelsWrapper
 
 admin_api = Blueprint('admin_api', __name__, url_prefix='/admin/api')
 
+# The endpoints that need a model that isn't loaded return the same error as the User API endpoints
+admin_api.register_error_handler(ModelsWrapperNotReadyError, models_wrapper_not_ready)
+
+
+def _get_admin_api_token() -> str:
+    """
+    Returns the token that the requests to the Admin API must send in the Authorization header
+    (Authorization: Bearer <token>): the ADMIN.API_TOKEN param of the *-conf.ini file (or the
+    WEB_BACKEND_ADMIN_API_TOKEN environment variable), that is read at request time, so the token can be changed
+    by reading the file again. If is empty, the API is disabled.
+    """
+    return get_config().get('ADMIN', 'API_TOKEN', fallback='')
+
+
+# Broadcaster of the commands that must be run by all the processes of the server (in-memory caches, models reload)
+commands_broadcaster = CommandsBroadcaster(
+    get_config().get('ADMIN', 'COMMANDS_FILE_PATH', fallback='') or
+    get_abspath_from_project_source_root('saved-elements/admin-commands.json')
+)
+
+CACHES_NAMES = ['responses', 'summaries', 'wordclouds']
+
+MAX_NUM_WARM_REQUESTS = 100
+""" Max number of requests of the responses cache that can be sent in a call to the warm_cache() endpoint. """
+
+
+@admin_api.record_once
+def _run_pending_commands_before_each_request(state):
+    """
+    Registers a function in the app that runs the commands published by the Admin API of other processes
+    before answering each request (of any blueprint), when the blueprint is registered in the app for the first time.
+    """
+    state.app.before_request(commands_broadcaster.run_pending)
+
+
+@admin_api.before_request
+def _check_admin_api_token():
+    """
+    Checks that the request has the Admin API token in the Authorization header. The endpoint that returns if the API
+    is running doesn't need it.
+
+    If the token isn't configured, an error (in JSON format) with HTTP 403 status code is returned.
+    If the request doesn't have the token, an error (in JSON format) with HTTP 401 status code is returned.
+    """
+    if request.endpoint == 'admin_api.admin_api_running_message':
+        return None
+
+    admin_api_token = _get_admin_api_token()
+    if admin_api_token == '':
+        abort(403, description='The Admin API is disabled. The ADMIN.API_TOKEN param of the *-conf.ini file '
+                               '(or the WEB_BACKEND_ADMIN_API_TOKEN environment variable) must be set.')
+
+    # The token is compared in constant time, so it can't be guessed measuring the response time
+    authorization = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(authorization.encode('utf-8'), 'Bearer {0}'.format(admin_api_token).encode('utf-8')):
+        res = jsonify(status_code=401, status_name='Unauthorized',
+                      description='The Authorization header must have the Admin API token: Bearer <token>')
+        res.status_code = 401
+        res.headers['WWW-Authenticate'] = 'Bearer'
+        return res
+
+    return None
+
+
+def _get_loaded_models_wrappers(model_name: str = None) -> List['ModelsWrapper']:
+    """
+    Returns the ModelsWrappers of the models loaded by the current process. If model_name isn't None,
+    only the ModelsWrapper of that model is returned (if it's loaded).
+    """
+    return [models_wrapper for models_wrapper in models_registry.get_loaded_models_wrappers()
+            if model_name is None or models_wrapper.topics_model_name == model_name]
+
+
+def _clear_cache(cache: str, model: str = None):
+    """
+    Command that removes the content of the given cache from the memory of the current process. The summaries and
+    wordclouds caches are only removed for the given model (or for all the loaded models, if it's None).
+
+    The content of the caches stored on disk, that is shared by all the processes, isn't removed here, but only once
+    by the process that publishes the command (see _clear_shared_cache()). Otherwise, a process that runs the command
+    later would remove the content generated again by other processes after the clear.
+    """
+    if cache == 'responses':
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            response_cache.clear_memory()
+    elif cache == 'summaries':
+        for models_wrapper in _get_loaded_models_wrappers(model):
+            models_wrapper.clear_summaries_cache()
+    elif cache == 'wordclouds':
+        for models_wrapper in _get_loaded_models_wrappers(model):
+            models_wrapper.clear_word_cloud_jobs()
+
+
+def _clear_shared_cache(cache: str, model: str = None):
+    """
+    Removes the content of the given cache stored on disk, that is shared by all the processes: the disk tier of the
+    responses cache, or the wordcloud images of the given model (or of all the models, if it's None).
+    The summaries cache is only stored in memory.
+    """
+    if cache == 'responses':
+        response_cache = get_response_cache()
+        if response_cache is not None:
+            response_cache.clear()
+    elif cache == 'wordclouds':
+        if model is not None:
+            models_names = [model]
+        elif os.path.isdir(WORDCLOUD_IMAGES_DIR_PATH):
+            models_names = [name for name in os.listdir(WORDCLOUD_IMAGES_DIR_PATH) if not name.startswith('.')]
+        else:
+            models_names = []
+        for model_name in models_names:
+            WordCloudJobQueue.remove_images(join_paths(WORDCLOUD_IMAGES_DIR_PATH, model_name))
+
+
+def _warm_summaries_cache(model: str = None, num_documents: int = None):
+    """
+    Command that summarizes the most representative documents of each topic of the given model (or of all
+    the loaded models, if it's None) in a background thread of the current process.
+    """
+    def warm():
+        for models_wrapper in _get_loaded_models_wrappers(model):
+            models_wrapper.warm_summaries_cache(num_documents)
+
+    threading.Thread(target=warm, name='SummariesCacheWarmer', daemon=True).start()
+
+
+def _reload_models(model: str = None):
+    """
+    Command that reads the *-conf.ini file again and loads again the given model (or all the loaded models
+    and the default model of the *-conf.ini file, if it's None) in the current process, in the background.
+    """
+    reload_config()
+    if model is None:
+        try:
+            models_registry.set_default_model(get_config().best_topics_model_name)
+        except UserResourceWithParamValueNotFoundError:
+            pass
+    models_registry.reload(model)
+
+
+commands_broadcaster.register('clear_cache', _clear_cache)
+commands_broadcaster.register('warm_summaries_cache', _warm_summaries_cache)
+commands_broadcaster.register('reload_models', _reload_models)
+
+
+def _get_model_param() -> str:
+    """
+    Returns the model param of the request URL, or None if it isn't present.
+
+    If the model doesn't exist, an error (in JSON format) with HTTP 404 status code is returned.
+    """
+    model = request.args.get('model')
+    if model is not None and model != models_registry.default_model_name and not models_registry.has_model(model):
+        abort(404, description='Model "{0}" not found'.format(model))
+    return model
+
+
+def _check_param_value(name: str, value: int):
+    """
+    Checks that the given value of the param with the given name keeps the min, default and max values
+    of it's parent param (if they exist) in order.
+
+    :raises UserError: If the value isn't valid.
+    """
+    if '.' not in name or name.rsplit('.', 1)[1] not in ('min', 'default', 'max'):
+        return
+
+    parent_name, key = name.rsplit('.', 1)
+    parent_param = dict(get_param(parent_name))
+    parent_param[key] = value
+    values = [parent_param[parent_key] for parent_key in ('min', 'default', 'max') if parent_key in parent_param]
+    if values != sorted(values):
+        raise UserError('The min, default and max values of {0} must be in ascending order'.format(parent_name))
+
 
 @admin_api.route('/')
 def admin_api_running_message():
@@ -9,3 +202,183 @@ def admin_api_running_message():
     If the Admin API is running, returns a JSON response.
     """
     return jsonify(admin_api_running=True)  # 200 OK
+
+
+@admin_api.route('/params')
+def get_params_values():
+    """
+    REST API endpoint that returns all the params of the params file, with the same structure as the file.
+    """
+    return jsonify(get_params())  # 200 OK
+
+
+@admin_api.route('/params/<string:name>', methods=['GET', 'PUT'])
+def get_or_update_param_value(name: str):
+    """
+    REST API endpoint that returns (GET method) or updates (PUT method) the value of the param with the given name
+    (with '.' to separate keys, for example: topics.text.num_keywords.default).
+
+    The new value is an int param, in a JSON body ({"value": 10}) or in a form body (value=10). The params file
+    is replaced atomically, so the new value is used by all the threads and processes from their next request.
+
+    If the param doesn't exist, an error (in JSON format) with HTTP 404 status code is returned.
+    If the value isn't an int, or the min, default and max values of the parent param aren't in ascending order
+    with the new value, an error (in JSON format) with HTTP 422 status code is returned.
+    """
+    try:
+        value = get_param(name)
+    except KeyError:
+        abort(404, description='Param "{0}" not found'.format(name))
+    if isinstance(value, dict):
+        abort(404, description='Param "{0}" has nested params. Only the values of the nested params can be used.'
+              .format(name))
+
+    if request.method == 'PUT':
+        json_body = request.get_json(silent=True)
+        value = json_body.get('value') if isinstance(json_body, dict) else request.form.get('value', type=int)
+        if not isinstance(value, int) or isinstance(value, bool):
+            abort(422, description='value must be an int')
+        try:
+            _check_param_value(name, value)
+        except UserError as err:
+            abort(422, description=err.message)
+        update_param(name, value)
+
+    return jsonify(name=name, value=value)  # 200 OK
+
+
+@admin_api.route('/caches/<string:cache>', methods=['DELETE'])
+def clear_cache(cache: str):
+    """
+    REST API endpoint that removes the content of the given cache in all the processes of the server:
+
+    * **responses**: The responses of the endpoints that receive a text, in memory and on disk.
+    * **summaries**: The sentences and sentences vectors cached by the summarization model. The summaries \
+    generated in batch aren't removed.
+    * **wordclouds**: The wordcloud images. They are generated again the next time they are requested.
+
+    The endpoint can only be called with a HTTP DELETE method. Admits a param in the URL called model: str,
+    with the name of the topics model whose summaries or wordclouds are removed. If it isn't present,
+    they are removed for all the models.
+
+    The content stored on disk (the disk tier of the responses cache and the wordcloud images) is removed by the
+    process that answers the request, and the rest of processes only remove the content stored in their memory.
+
+    If the cache or the model don't exist, an error (in JSON format) with HTTP 404 status code is returned.
+    """
+    if cache not in CACHES_NAMES:
+        abort(404, description='Cache "{0}" not found. Possible values: {1}'.format(cache, ', '.join(CACHES_NAMES)))
+
+    model = _get_model_param()
+    _clear_shared_cache(cache, model)
+    commands_broadcaster.publish('clear_cache', cache=cache, model=model)
+    return jsonify(cache=cache, model=model, cleared=True)  # 200 OK
+
+
+@admin_api.route('/caches/<string:cache>/warm', methods=['POST'])
+def warm_cache(cache: str):
+    """
+    REST API endpoint that fills the given cache:
+
+    * **responses**: The body must be a JSON with a requests field, with a list of at most MAX_NUM_WARM_REQUESTS \
+    requests to the User API endpoints that receive a text. Each request is a dict with the path of the endpoint, \
+    the text and, optionally, the URL params: {"requests": [{"path": "/user/api/text/summary", "text": "...", \
+    "params": {"num_summary_sentences": 3}}]}. The requests are answered by the current process before returning \
+    the response, so the responses are cached in it's memory, and in the disk tier of the cache, that is shared by \
+    all the processes. It returns the status code of each request.
+    * **summaries**: The most representative documents of each topic are summarized by all the processes \
+    of the server, in the background. Admits a num_documents: int param in the URL.
+    * **wordclouds**: The wordcloud images are generated in the background with each number of keywords of the \
+    num_keywords field of the JSON body (by default, all the valid values). The images are stored on disk, so they \
+    are shared by all the processes. It returns the jobs that generate them.
+
+    The endpoint can only be called with a HTTP POST method. Admits a param in the URL called model: str,
+    with the name of the topics model whose cache is filled. If it isn't present, the default model is used
+    for the wordclouds, and all the loaded models for the summaries.
+
+    If the cache or the model don't exist, an error (in JSON format) with HTTP 404 status code is returned.
+    If the body isn't valid, an error (in JSON format) with HTTP 422 status code is returned.
+    """
+    if cache not in CACHES_NAMES:
+        abort(404, description='Cache "{0}" not found. Possible values: {1}'.format(cache, ', '.join(CACHES_NAMES)))
+
+    model = _get_model_param()
+    json_body = request.get_json(silent=True) or {}
+
+    if cache == 'summaries':
+        commands_broadcaster.publish('warm_summaries_cache', model=model,
+                                     num_documents=request.args.get('num_documents', type=int))
+        return jsonify(cache=cache, model=model, warming=True), 202  # 202 Accepted
+
+    if cache == 'wordclouds':
+        num_keywords_values = json_body.get('num_keywords')
+        if num_keywords_values is not None and (not isinstance(num_keywords_values, list) or
+                                                not all(isinstance(value, int) for value in num_keywords_values)):
+            abort(422, description='num_keywords must be a list of ints')
+        with models_registry.use(model) as models_wrapper:
+            jobs = models_wrapper.submit_word_cloud_images_jobs(num_keywords_values)
+        return jsonify(cache=cache, model=model, jobs=[job.as_dict() for job in jobs]), 202  # 202 Accepted
+
+    requests_list = json_body.get('requests')
+    if not isinstance(requests_list, list) or \
+            not all(isinstance(req, dict) and str(req.get('path', '')).startswith('/user/api/text/') and
+                    isinstance(req.get('text'), str) for req in requests_list):
+        abort(422, description='requests must be a list of requests to the /user/api/text/ endpoints, '
+                               'each one with a path and a text')
+    if len(requests_list) > MAX_NUM_WARM_REQUESTS:
+        abort(422, description='The number of requests must be less than or equal to {0}'
+              .format(MAX_NUM_WARM_REQUESTS))
+
+    # The requests are sent to the app, without using the network, with the same code as the real requests
+    client = current_app.test_client()
+    status_codes = []
+    for req in requests_list:
+        query_string = dict(req.get('params') or {})
+        if model is not None:
+            query_string['model'] = model
+        status_codes.append(client.post(req['path'], query_string=query_string,
+                                        data={'text': req['text']}).status_code)
+    return jsonify(cache=cache, model=model, status_codes=status_codes)  # 200 OK
+
+
+@admin_api.route('/models/reload', methods=['POST'])
+def reload_models():
+    """
+    REST API endpoint that reads the *-conf.ini file again and loads again the given model (or all the loaded models,
+    and the default model of the *-conf.ini file, if it has changed) in all the processes of the server,
+    in the background. The current models keep answering the requests until the new ones are loaded.
+
+    If the server is a PreforkServer, the master process is asked to reload (the same as the SIGHUP signal),
+    so all the models are loaded again and the memory of the models is shared again by the new workers.
+
+    The endpoint can only be called with a HTTP POST method. Admits a param in the URL called model: str,
+    with the name of the model. If the model doesn't exist, an error (in JSON format) with HTTP 404 status code
+    is returned. The state of the models is returned by the /user/api/models endpoint.
+    """
+    model = _get_model_param()
+
+    master_pid = current_app.config.get('PREFORK_MASTER_PID')
+    if master_pid is not None:
+        os.kill(master_pid, signal.SIGHUP)
+    else:
+        commands_broadcaster.publish('reload_models', model=model)
+
+    return jsonify(model=model, reloading=True), 202  # 202 Accepted
+
+
+@admin_api.route('/stats')
+def get_stats():
+    """
+    REST API endpoint that returns the statistics of the caches and pools of the process that answers the request
+    (with several worker processes, each request can be answered by a different one): the response cache,
+    the models registry and, for each loaded model, the summarization model, the SummarizationPool,
+    the WordCloudJobQueue and the MalletInferencePool.
+    """
+    response_cache = get_response_cache()
+    return jsonify(
+        pid=os.getpid(),
+        response_cache=response_cache.get_stats() if response_cache is not None else None,
+        models_registry=models_registry.get_status(),
+        models={models_wrapper.topics_model_name: models_wrapper.get_stats()
+                for models_wrapper in models_registry.get_loaded_models_wrappers()}
+    )  # 200 OK
@@ -0,0 +1,42 @@
+from flask import Blueprint, request, send_from_directory
+from werkzeug.exceptions import abort
+from werkzeug.utils import secure_filename
+
+from web_backend.utils import WORDCLOUD_IMAGES_DIR_PATH, join_paths
+from web_backend.wrapper.images_manifest import get_images_manifest
+
+static_files = Blueprint('static_files', __name__, url_prefix='/static')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+""" Cache-Control header of the files with a version in their URL. They are cached for 1 year. """
+
+
+@static_files.route('/wordcloud-images/<topics_model_name>/<dir_name>/<version>/<file_name>')
+def get_word_cloud_image(topics_model_name: str, dir_name: str, version: str, file_name: str):
+    """
+    Returns a wordcloud image, with the URLs returned by the /user/api/topics/wordcloud endpoint.
+
+    The URL contains the version of the ImagesManifest of the folder of the image, so the content of a URL never
+    changes, and the image is returned with a Cache-Control header that allows the clients to cache it forever.
+    The digest of the image is returned as it's ETag, and the requests with that ETag in the If-None-Match header
+    receive a response with HTTP 304 status code, without the image.
+
+    If the image doesn't exist, or the version of the URL isn't the current version of the folder,
+    an error (in JSON format) with HTTP 404 status code is returned.
+    """
+
+    # The names can't contain path separators or '..', to avoid reading files outside the images folder
+    if any(secure_filename(name) != name for name in (topics_model_name, dir_name, file_name)):
+        abort(404)
+
+    dir_path = join_paths(WORDCLOUD_IMAGES_DIR_PATH, topics_model_name, dir_name)
+    images_manifest = get_images_manifest(dir_path)
+    if images_manifest is None or images_manifest.version != version or \
+            images_manifest.get_file_digest(file_name) is None:
+        abort(404, description='The image doesn\'t exist. Request the wordcloud images URLs again.')
+
+    res = send_from_directory(dir_path, file_name)
+    res.set_etag(images_manifest.get_file_digest(file_name))
+    res.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    # If the client has the same image (same ETag), the body is removed and the status code is 304 Not Modified
+    return res.make_conditional(request)
@@ -1,14 +1,220 @@
-from typing import Any, Dict, List
+import functools
+import json
+import threading
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, g, jsonify, request, stream_with_context, url_for
 from werkzeug.exceptions import abort
 
-from web_backend.utils import UserInvalidParamError, UserResourceWithParamValueNotFoundError
-from web_backend.wrapper.twenty_news_groups_dataset_models_wrapper import TwentyNewsGroupsDatasetModelsWrapper
+from web_backend.cache import ResponseCache, normalize_text
+from web_backend.params import get_params_version
+from web_backend.utils import TOPICS_MODELS_DIR_PATH, Config, UserInvalidParamError, \
+    UserResourceWithParamValueNotFoundError, get_config
+from web_backend.wrapper.mallet_inference_pool import MalletInferencePoolFullError, MalletInferenceTimeoutError
+from web_backend.wrapper.models_registry import ModelsRegistry
+from web_backend.wrapper.models_wrapper_loader import ModelsWrapperNotReadyError
+from web_backend.wrapper.word_cloud_jobs import WordCloudJob, WordCloudJobNotDoneError
+
+if TYPE_CHECKING:
+    from web_backend.wrapper.models_wrapper import ModelsWrapper
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
 
 user_api = Blueprint('user_api', __name__, url_prefix='/user/api', static_url_path='/static')
 
-models_wrapper = TwentyNewsGroupsDatasetModelsWrapper()
+
+def _create_models_wrapper(topics_model_name: str, progress_callback: Callable[[str], None] = None) \
+        -> 'ModelsWrapper':
+    """
+    Creates the ModelsWrapper of the given topics model. The ModelsWrapper module is imported here, in the thread
+    that loads the models, because it imports the (heavy) models libraries, so importing the blueprint is fast.
+    """
+    from web_backend.wrapper.twenty_news_groups_dataset_models_wrapper import TwentyNewsGroupsDatasetModelsWrapper
+    return TwentyNewsGroupsDatasetModelsWrapper(topics_model_name, progress_callback=progress_callback)
+
+
+# The ModelsWrapper of the default model (and the preloaded ones) is loaded in a background thread when the blueprint
+# is registered in the app, and the other models are loaded the first time they are requested (model URL param).
+# Until a model is loaded, the endpoints that need it return an error with HTTP 503 status code.
+models_registry = ModelsRegistry.from_config(_create_models_wrapper, TOPICS_MODELS_DIR_PATH)
+
+
+@user_api.record_once
+def _start_loading_models_wrapper(_):
+    """
+    Starts loading the default ModelsWrapper when the blueprint is registered in the app for the first time.
+    """
+    models_registry.start()
+
+
+def _get_models_wrapper() -> 'ModelsWrapper':
+    """
+    Returns the ModelsWrapper of the topics model specified in the model param of the request URL
+    (endpoint?model=lda_mallet_17topics_model, for example), or the default one if the param isn't present.
+
+    The ModelsWrapper is obtained only once per request, and it isn't closed (if the model is evicted or reloaded)
+    until the request finishes (see _release_models_wrapper()), or until the streamed responses have been sent
+    (see _stream_dtos_as_ndjson()).
+
+    If the model doesn't exist, an error (in JSON format) with HTTP 404 status code is returned.
+    """
+    if 'models_wrapper' not in g:
+        exit_stack = ExitStack()
+        try:
+            g.models_wrapper = exit_stack.enter_context(models_registry.use(request.args.get('model')))
+        except UserResourceWithParamValueNotFoundError as err:
+            abort(404, description=err.message)
+        g.models_wrapper_exit_stack = exit_stack
+    return g.models_wrapper
+
+
+@user_api.teardown_request
+def _release_models_wrapper(_):
+    """
+    Releases the ModelsWrapper obtained by the request with _get_models_wrapper(), when the request finishes.
+    """
+    g.pop('models_wrapper', None)
+    exit_stack = g.pop('models_wrapper_exit_stack', None)
+    if exit_stack is not None:
+        exit_stack.close()
+
+
+@user_api.errorhandler(ModelsWrapperNotReadyError)
+def models_wrapper_not_ready(error: ModelsWrapperNotReadyError):
+    """
+    Error handler for the requests received while the ModelsWrapper is loading. Returns an error (in JSON format)
+    with HTTP 503 status code and a Retry-After header.
+    """
+    res = jsonify(status_code=503, status_name='Service Unavailable', description=error.message)
+    res.status_code = 503
+    res.headers['Retry-After'] = str(error.retry_after)
+    return res
+
+
+def _mallet_inference_timeout(error: MalletInferenceTimeoutError):
+    """
+    Returns the response of the requests whose text mallet didn't process in time: an error (in JSON format)
+    with HTTP 503 status code and a Retry-After header.
+    """
+    res = jsonify(status_code=503, status_name='Service Unavailable', description=error.message)
+    res.status_code = 503
+    res.headers['Retry-After'] = str(error.retry_after)
+    return res
+
+
+# Cache of the responses of the endpoints that receive a text, and the Config object it was created from
+_response_cache: Optional[ResponseCache] = None
+_response_cache_config: Optional[Config] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the cache of the responses of the endpoints that receive a text, created with the params of the
+    RESPONSE_CACHE section of the *-conf.ini file, or None if it's disabled.
+    If the file has been read again (with reload_config()) and those params have changed, the cache is created again.
+    """
+    global _response_cache, _response_cache_config
+
+    config = get_config()
+    if config is _response_cache_config:
+        return _response_cache
+
+    with _response_cache_lock:
+        if config is not _response_cache_config:
+            if _response_cache_config is None or ResponseCache.get_config_params('RESPONSE_CACHE', config) != \
+                    ResponseCache.get_config_params('RESPONSE_CACHE', _response_cache_config):
+                _response_cache = ResponseCache.from_config('RESPONSE_CACHE', config)
+            _response_cache_config = config
+        return _response_cache
+
+
+def _cache_text_response(view_func):
+    """
+    Decorator for the endpoints that receive a text in the request body.
+
+    The response of those endpoints only depends on the text, the URL params, the topics model (it's name and it's
+    fingerprint, which changes if it's trained again) and the params file, so successful responses are stored
+    in the response_cache, and returned directly if the same request is received.
+    """
+
+    @functools.wraps(view_func)
+    def cached_view_func(*args, **kwargs):
+        text = request.form.get('text')
+        response_cache = get_response_cache()
+        # Streamed responses aren't cached, because their body isn't available until they are sent
+        if response_cache is None or text is None or _is_ndjson_response_requested():
+            return view_func(*args, **kwargs)
+
+        models_wrapper = _get_models_wrapper()
+        key = ResponseCache.get_key(request.path, normalize_text(text), sorted(request.args.items(multi=True)),
+                                    models_wrapper.topics_model_name, models_wrapper.topics_model_fingerprint,
+                                    get_params_version())
+
+        body = response_cache.get(key)
+        if body is not None:
+            return current_app.response_class(body, mimetype='application/json')  # 200 OK
+
+        response = view_func(*args, **kwargs)
+        # The responses marked with no-store (see _jsonify_docs_dtos()) can be different in the next request
+        if response.status_code == 200 and not response.is_streamed and not response.cache_control.no_store:
+            response_cache.put(key, response.get_data())
+        return response
+
+    return cached_view_func
+
+
+def _http_cache_get_response(view_func=None, etag_from_body: bool = False):
+    """
+    Decorator for the GET endpoints whose response only depends on the URL (path and params), the topics model
+    (it's name and it's fingerprint, which changes if it's trained again) and the params file.
+
+    The ETag of the response is computed from those values (and the requested format), without calling the endpoint,
+    so the requests with that ETag in the If-None-Match header receive a response with HTTP 304 status code
+    and without body. Successful responses have that ETag and a Cache-Control header with the max-age specified
+    in the HTTP_CACHE.MAX_AGE_SECONDS param of the *-conf.ini file.
+
+    If etag_from_body is True (@_http_cache_get_response(etag_from_body=True)), the body of the response is also
+    used to compute the ETag, so the endpoint is always called. It's used when the body depends on other values
+    (for example, the version of the wordcloud images). The responses marked with no-store by the endpoint
+    (see _jsonify_docs_dtos()) don't have ETag.
+    """
+    if view_func is None:
+        return functools.partial(_http_cache_get_response, etag_from_body=etag_from_body)
+
+    @functools.wraps(view_func)
+    def http_cached_view_func(*args, **kwargs):
+        models_wrapper = _get_models_wrapper()
+        etag = ResponseCache.get_key(request.path, sorted(request.args.items(multi=True)),
+                                     request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE]),
+                                     models_wrapper.topics_model_name, models_wrapper.topics_model_fingerprint,
+                                     get_params_version())[:32]
+
+        if not etag_from_body and request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)  # 304 Not Modified
+        else:
+            response = view_func(*args, **kwargs)
+            if response.status_code != 200 or response.cache_control.no_store:
+                return response
+            if etag_from_body:
+                etag = ResponseCache.get_key(etag, response.get_data())[:32]
+                if request.if_none_match.contains(etag):
+                    response = current_app.response_class(status=304)  # 304 Not Modified
+
+        response.set_etag(etag)
+        # Max number of seconds that the clients (and CDNs) can cache the responses
+        max_age_seconds = get_config().get_int('HTTP_CACHE', 'MAX_AGE_SECONDS', fallback=300)
+        if max_age_seconds > 0:
+            response.headers['Cache-Control'] = 'public, max-age={0}'.format(max_age_seconds)
+        else:
+            # The clients can store the response, but they must revalidate it (with the ETag) each time
+            response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept')
+        return response
+
+    return http_cached_view_func
 
 
 @user_api.route('/')
@@ -19,7 +225,41 @@ def user_api_running_message():
     return jsonify(user_api_running=True)  # 200 OK
 
 
+@user_api.route('/ready')
+def user_api_ready():
+    """
+    REST API endpoint that returns if the models have been loaded, and the loading progress.
+
+    Admits a param in the URL called model: str, with the name of the topics model (endpoint?model=name, for example).
+    If it isn't present, the state of the default model is returned. If the model isn't loaded, it starts loading it.
+
+    If the models haven't been loaded yet, the response has HTTP 503 status code and a Retry-After header.
+    If the model doesn't exist, an error (in JSON format) with HTTP 404 status code is returned.
+    """
+    try:
+        loader = models_registry.get_loader(request.args.get('model'))
+    except UserResourceWithParamValueNotFoundError as err:
+        abort(404, description=err.message)
+
+    res = jsonify(loader.get_status())
+    if not loader.is_ready():
+        res.status_code = 503
+        res.headers['Retry-After'] = str(loader.retry_after)
+    return res  # 200 OK if the models are ready
+
+
+@user_api.route('/models')
+def get_models():
+    """
+    REST API endpoint that returns the name of the default topics model, and the name, state and size
+    of each topics model that can be selected with the model param of the other endpoints.
+    The state of the models that haven't been requested yet is not_loaded.
+    """
+    return jsonify(models_registry.get_status())  # 200 OK
+
+
 @user_api.route('/topics/text')
+@_http_cache_get_response
 def get_topics_text():
     """
     REST API endpoint that returns the most important keywords of each topic, and their probabilities.
@@ -36,14 +276,17 @@ def get_topics_text():
     num_keywords = request.args.get('num_keywords', type=int)
 
     try:
-        # Try to obtain the topics in text format.
-        return jsonify(models_wrapper.get_topics_text(num_keywords))  # 200 OK
+        # Try to obtain the topics in text format, already serialized in JSON format
+        return current_app.response_class(_get_models_wrapper().get_topics_text_json(num_keywords),
+                                          mimetype=JSON_MIMETYPE)  # 200 OK
     except UserInvalidParamError as err:
         # If num_keywords doesn't have a valid value, send a 422 error message to the user
         abort(422, description=err.message)
 
 
 @user_api.route('/topics/wordcloud')
+# The URLs of the images contain the version of the images, that changes when they are generated again
+@_http_cache_get_response(etag_from_body=True)
 def get_topics_word_cloud_images_urls():
     """
     REST API endpoint that, for each topic, returns a url that points to a wordcloud image of that topic.
@@ -53,6 +296,12 @@ def get_topics_word_cloud_images_urls():
     Admits a param in the URL called num_keywords: int (endpoint?num_keywords=10, for example).
 
     If the num_keywords param is not valid, an error (in JSON format) with HTTP 422 status code is returned.
+
+    If the wordcloud images with the num_keywords param haven't been generated yet, they are generated
+    in background. If they aren't generated in the number of seconds specified in the WORDCLOUD.WAIT_TIMEOUT_SECONDS
+    param of the *-conf.ini file, a response with HTTP 202 status code is returned, with the state of the job
+    that generates them and the URL of the endpoint that returns that state (also in the Location header).
+    If they couldn't be generated, an error (in JSON format) with HTTP 500 status code is returned.
     """
 
     # Get the num_keywords param from the request URL
@@ -61,16 +310,55 @@ def get_topics_word_cloud_images_urls():
 
     try:
         # Call the ModelsWrapper get_topics_word_cloud_images_urls(), passing it the num_keywords
-        topic_image_url_dto_list = models_wrapper.get_topics_word_cloud_images_urls(num_keywords)
+        # Max number of seconds to wait for the images that are being generated
+        wait_timeout_seconds = get_config().get_float('WORDCLOUD', 'WAIT_TIMEOUT_SECONDS', fallback=10)
+        topic_image_url_dto_list = _get_models_wrapper().get_topics_word_cloud_images_urls(
+            num_keywords, timeout=wait_timeout_seconds
+        )
         # Transform the List[ReprDocOfTopicDTO] to a list of dicts
         dicts_list = _transform_dto_list_to_list_of_dicts(topic_image_url_dto_list)
         return jsonify(dicts_list)  # 200 OK
     except UserInvalidParamError as err:
         # If num_keywords doesn't have a valid value, send a 422 error message to the user
         abort(422, description=err.message)
+    except WordCloudJobNotDoneError as err:
+        if err.job.state == WordCloudJob.FAILED:
+            # If the images couldn't be generated, send a 500 error message to the user
+            abort(500, description=err.message)
+
+        # If the images are being generated, send the state of the job that generates them
+        status_url = url_for('.get_word_cloud_job', num_keywords=err.job.num_keywords,
+                             model=request.args.get('model'))
+        res = jsonify(job=err.job.as_dict(), status_url=status_url, description=err.message)
+        res.status_code = 202
+        res.headers['Location'] = status_url
+        return res
+
+
+@user_api.route('/topics/wordcloud/jobs/<int:num_keywords>')
+def get_word_cloud_job(num_keywords: int):
+    """
+    REST API endpoint that returns the state of the job that generates the wordcloud images with the given
+    num_keywords: pending, rendering, done or failed. When the job is done, the URLs of the images are returned
+    by the /topics/wordcloud endpoint (the url field of the response).
+
+    The endpoint can only be called with a HTTP GET method. The URL embedded param num_keywords is obligatory.
+
+    If the wordcloud images with the num_keywords param haven't been requested, an error (in JSON format)
+    with HTTP 404 status code is returned.
+    """
+
+    job = _get_models_wrapper().get_word_cloud_job(num_keywords)
+    if job is None:
+        abort(404, description='The wordcloud images with {0} keywords haven\'t been requested.'.format(num_keywords))
+
+    return jsonify(job=job.as_dict(),
+                   url=url_for('.get_topics_word_cloud_images_urls', num_keywords=num_keywords,
+                               model=request.args.get('model')))  # 200 OK
 
 
 @user_api.route('/topics/<int:topic_id>/documents')
+@_http_cache_get_response
 def get_k_most_repr_docs_of_topic(topic_id: int):
     """
     REST API endpoint that returns info about the most representative documents of the given topic.
@@ -83,6 +371,9 @@ def get_k_most_repr_docs_of_topic(topic_id: int):
     with HTTP 404 status code is returned.
 
     If the num_documents param is not valid, an error (in JSON format) with HTTP 422 status code is returned.
+
+    If the request has an 'Accept: application/x-ndjson' header, the documents are streamed in NDJSON format
+    (one JSON object per line), each one as soon as it's summary is available. See _stream_dtos_as_ndjson().
     """
 
     # Get the num_documents param from the request URL
@@ -90,11 +381,19 @@ def get_k_most_repr_docs_of_topic(topic_id: int):
     num_documents = request.args.get('num_documents', type=int)
 
     try:
+        if _is_ndjson_response_requested():
+            # The params are checked before the response starts, so the errors have the right status code
+            res = _stream_dtos_as_ndjson(
+                _get_models_wrapper().iter_k_most_repr_docs_of_topic(topic_id, num_documents)
+            )
+            # The summaries aren't known when the headers are sent, and some of them can be replaced by the
+            # first sentences of the documents (see _jsonify_docs_dtos()), so the streamed response isn't cached
+            res.cache_control.no_store = True
+            return res  # 200 OK
+
         # Call the ModelsWrapper get_k_most_repr_docs_of_topic(), passing it the topic_id and the num_documents
-        repr_doc_of_topic_dto_list = models_wrapper.get_k_most_repr_docs_of_topic(topic_id, num_documents)
-        # Transform the List[ReprDocOfTopicDTO] to a list of dicts
-        dicts_list = _transform_dto_list_to_list_of_dicts(repr_doc_of_topic_dto_list)
-        return jsonify(dicts_list)  # 200 OK
+        repr_doc_of_topic_dto_list = _get_models_wrapper().get_k_most_repr_docs_of_topic(topic_id, num_documents)
+        return _jsonify_docs_dtos(repr_doc_of_topic_dto_list)  # 200 OK
     except UserInvalidParamError as err:
         # If num_documents doesn't have a valid value, send a 422 error message to the user
         abort(422, description=err.message)
@@ -104,6 +403,7 @@ def get_k_most_repr_docs_of_topic(topic_id: int):
 
 
 @user_api.route('/text/related/topics', methods=['POST'])
+@_cache_text_response
 def get_text_related_topics():
     """
     REST API endpoint that returns info about the probability of the topics being related with the given text.
@@ -114,6 +414,9 @@ def get_text_related_topics():
     * A max_num_topics: int param in the URL (endpoint?max_num_topics=10, for example)
 
     If the max_num_topics param is not valid, an error (in JSON format) with HTTP 422 status code is returned.
+
+    If there are too many texts waiting to be processed, or mallet doesn't process the text in time, an error
+    (in JSON format) with HTTP 503 status code is returned (with a Retry-After header in the second case).
     """
 
     # Get the text param from the request body
@@ -126,16 +429,80 @@ def get_text_related_topics():
 
     try:
         # Call the ModelsWrapper get_text_related_topics(), passing it the text and the max_num_topics
-        text_topic_prob_dto_list = models_wrapper.get_text_related_topics(text, max_num_topics)
+        text_topic_prob_dto_list = _get_models_wrapper().get_text_related_topics(text, max_num_topics)
         # Transform the List[TextTopicProbDTO] to a list of dicts
         dicts_list = _transform_dto_list_to_list_of_dicts(text_topic_prob_dto_list)
         return jsonify(dicts_list)  # 200 OK
     except UserInvalidParamError as err:
         # If max_num_topics doesn't have a valid value, send a 422 error message to the user
         abort(422, description=err.message)
+    except MalletInferencePoolFullError as err:
+        # If there are too many texts waiting to be processed by mallet, send a 503 error message to the user
+        abort(503, description=str(err))
+    except MalletInferenceTimeoutError as err:
+        # If mallet didn't process the text in time, send a 503 error message with a Retry-After header to the user
+        return _mallet_inference_timeout(err)
+
+
+@user_api.route('/text/related/topics/batch', methods=['POST'])
+def get_texts_related_topics():
+    """
+    REST API endpoint that returns info about the probability of the topics being related with each of the
+    given texts. The topics of all the texts are inferred in one pass.
+
+    The endpoint can only be called with a HTTP POST method. The params that admits are:
+
+    * A JSON array of texts (strings) in the request body
+    * A max_num_topics: int param in the URL (endpoint?max_num_topics=10, for example)
+
+    The response is a JSON array with an element for each text, in the same order. The element of a text is
+    an object with a topics list, or with an error object (with HTTP 422 status code) if the text couldn't be processed.
+
+    If the request body isn't a JSON array, an error (in JSON format) with HTTP 400 status code is returned.
+
+    If the max_num_topics param is not valid or there are too many texts, an error (in JSON format)
+    with HTTP 422 status code is returned.
+
+    If there are too many texts waiting to be processed, or mallet doesn't process the text in time, an error
+    (in JSON format) with HTTP 503 status code is returned (with a Retry-After header in the second case).
+    """
+
+    # Get the texts from the request body
+    texts = request.get_json(silent=True)
+    if not isinstance(texts, list):
+        abort(400, description='The request body must be a JSON array of texts.')
+
+    # Get the max_num_topics param from the request URL
+    # If the param is not present or it's type is not int, None is returned
+    max_num_topics = request.args.get('max_num_topics', type=int)
+
+    try:
+        # Call the ModelsWrapper get_texts_related_topics(), passing it the texts and the max_num_topics
+        texts_related_topics_dto_list = _get_models_wrapper().get_texts_related_topics(texts, max_num_topics)
+    except UserInvalidParamError as err:
+        # If max_num_topics or the number of texts isn't valid, send a 422 error message to the user
+        abort(422, description=err.message)
+    except MalletInferencePoolFullError as err:
+        # If there are too many texts waiting to be processed by mallet, send a 503 error message to the user
+        abort(503, description=str(err))
+    except MalletInferenceTimeoutError as err:
+        # If mallet didn't process the text in time, send a 503 error message with a Retry-After header to the user
+        return _mallet_inference_timeout(err)
+
+    # Transform the List[TextRelatedTopicsDTO] to a list of dicts, with the errors in the same format as the
+    # errors of the API
+    dicts_list = []
+    for texts_related_topics_dto in texts_related_topics_dto_list:
+        if texts_related_topics_dto.error is None:
+            dicts_list.append({'topics': _transform_dto_list_to_list_of_dicts(texts_related_topics_dto.topics)})
+        else:
+            dicts_list.append({'error': {'status_code': 422, 'status_name': 'Unprocessable Entity',
+                                         'description': texts_related_topics_dto.error}})
+    return jsonify(dicts_list)  # 200 OK
 
 
 @user_api.route('/text/related/documents', methods=['POST'])
+@_cache_text_response
 def get_text_related_docs():
     """
     REST API endpoint that returns the documents of the dataset more related to the given text.
@@ -146,6 +513,12 @@ def get_text_related_docs():
     * A num_documents: int param in the URL (endpoint?num_documents=10, for example)
 
     If the num_documents param is not valid, an error (in JSON format) with HTTP 422 status code is returned.
+
+    If there are too many texts waiting to be processed, or mallet doesn't process the text in time, an error
+    (in JSON format) with HTTP 503 status code is returned (with a Retry-After header in the second case).
+
+    If the request has an 'Accept: application/x-ndjson' header, the documents are streamed in NDJSON format
+    (one JSON object per line), each one as soon as it's summary is available. See _stream_dtos_as_ndjson().
     """
 
     # Get the text param from the request body
@@ -157,17 +530,28 @@ def get_text_related_docs():
     num_documents = request.args.get('num_documents', type=int)
 
     try:
+        if _is_ndjson_response_requested():
+            # The params are checked before the response starts, so the errors have the right status code
+            return _stream_dtos_as_ndjson(
+                _get_models_wrapper().iter_text_related_docs(text, num_documents)
+            )  # 200 OK
+
         # Call the ModelsWrapper get_text_related_docs(), passing it the text and the num_documents
-        text_related_doc_dto_list = models_wrapper.get_text_related_docs(text, num_documents)
-        # Transform the List[TextRelatedDocDTO] to a list of dicts
-        dicts_list = _transform_dto_list_to_list_of_dicts(text_related_doc_dto_list)
-        return jsonify(dicts_list)  # 200 OK
+        text_related_doc_dto_list = _get_models_wrapper().get_text_related_docs(text, num_documents)
+        return _jsonify_docs_dtos(text_related_doc_dto_list)  # 200 OK
     except UserInvalidParamError as err:
         # If num_documents doesn't have a valid value, send a 422 error message to the user
         abort(422, description=err.message)
+    except MalletInferencePoolFullError as err:
+        # If there are too many texts waiting to be processed by mallet, send a 503 error message to the user
+        abort(503, description=str(err))
+    except MalletInferenceTimeoutError as err:
+        # If mallet didn't process the text in time, send a 503 error message with a Retry-After header to the user
+        return _mallet_inference_timeout(err)
 
 
 @user_api.route('/text/summary', methods=['POST'])
+@_cache_text_response
 def get_text_summary():
     """
     REST API endpoint that summarizes a given text.
@@ -190,14 +574,73 @@ def get_text_summary():
 
     try:
         # Call the ModelsWrapper get_text_summary(), passing it the text and the num_summary_sentences
-        return jsonify(vars(models_wrapper.get_text_summary(text, num_summary_sentences)))  # 200 OK
+        return jsonify(_dto_to_dict(_get_models_wrapper().get_text_summary(text, num_summary_sentences)))  # 200 OK
     except UserInvalidParamError as err:
         # If num_summary_sentences doesn't have a valid value, send a 422 error message to the user
         abort(422, description=err.message)
 
 
+def _is_ndjson_response_requested() -> bool:
+    """
+    Returns True if the client prefers a streamed NDJSON response (application/x-ndjson) over a JSON response.
+    """
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _stream_dtos_as_ndjson(dto_iterator: Iterator[Any]):
+    """
+    Given an iterator of DTO objects, this function returns a streamed response in NDJSON format, with a line with
+    the JSON representation of each DTO object, sent as soon as the DTO object is returned by the iterator.
+
+    The status code of the response is sent before the DTO objects are obtained, so if an error happens
+    while the response is being streamed, the error (in the same JSON format as the rest of errors of the API,
+    with HTTP 500 status code) is sent as the last line of the response.
+    """
+
+    def generate_lines():
+        try:
+            for dto_obj in dto_iterator:
+                yield json.dumps(_dto_to_dict(dto_obj)) + '\n'
+        except Exception as err:
+            current_app.logger.exception(err)
+            yield json.dumps({'error': {'status_code': 500, 'status_name': 'Internal Server Error',
+                                        'description': 'The response couldn\'t be completed.'}}) + '\n'
+
+    response = current_app.response_class(stream_with_context(generate_lines()), mimetype=NDJSON_MIMETYPE)
+    # The ModelsWrapper used by the iterator is released when the response has been sent (or the client has
+    # disconnected), instead of when the request is torn down, because that can happen before streaming the response
+    models_wrapper_exit_stack = g.pop('models_wrapper_exit_stack', None)
+    if models_wrapper_exit_stack is not None:
+        response.call_on_close(models_wrapper_exit_stack.close)
+    return response
+
+
+def _dto_to_dict(dto_obj) -> Dict[str, Any]:
+    """
+    Given a DTO object, this function returns a dict with it's attributes, that can be passed to jsonify function.
+    The attributes that start with '_' are internal, and aren't included.
+    """
+    return {name: value for name, value in vars(dto_obj).items() if not name.startswith('_')}
+
+
 def _transform_dto_list_to_list_of_dicts(dto_list) -> List[Dict[str, Any]]:
     """
     Given a list of DTO objects, this function returns a list of dicts, that can be passed to jsonify function.
     """
-    return [vars(dto_obj) for dto_obj in dto_list]
+    return [_dto_to_dict(dto_obj) for dto_obj in dto_list]
+
+
+def _jsonify_docs_dtos(docs_dto_list):
+    """
+    Given a list of DTO objects of documents with summaries (ReprDocOfTopicDTO or TextRelatedDocDTO objects),
+    this function returns a JSON response with them.
+
+    If the summary of any document wasn't generated with the SummarizationModel (for example, because the
+    SummarizationPool didn't summarize it in time, and it has been replaced by the first sentences of the document),
+    the response has a 'Cache-Control: no-store' header, so it isn't cached by the clients nor by the response cache,
+    and the next request can obtain the real summary.
+    """
+    res = jsonify(_transform_dto_list_to_list_of_dicts(docs_dto_list))
+    if not all(dto_obj.summary_generated_with_the_model for dto_obj in docs_dto_list):
+        res.cache_control.no_store = True
+    return res
@@ -25,6 +25,10 @@ def create_app():
     from web_backend.apis.admin import admin_api
     app.register_blueprint(admin_api)
 
+    # Register the blueprint that serves the static files with a version in their URL (before the default static route)
+    from web_backend.apis.static_files import static_files
+    app.register_blueprint(static_files)
+
     # Create a route to check if the application is running
     @app.route('/')
     def app_running_message():
@@ -0,0 +1,322 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from web_backend.utils import Config, join_paths, get_config
+
+
+class ResponseCache:
+    """
+    Cache of responses, with a bounded size in bytes and LRU eviction.
+
+    Each entry stores the body of a response (bytes), and is identified by a key obtained with the get_key() method,
+    that is a hash of all the values the response depends on.
+
+    Optionally, entries expire after ttl_seconds, and the entries evicted from memory are stored in a second tier
+    on disk (a folder with a file for each entry), also bounded in size. The folder can be shared by several
+    processes: the entries stored on disk by a process are also found by the other ones.
+
+    The cache is thread-safe. The disk is accessed without holding the lock of the cache, so a slow disk access
+    only delays the request that needs it.
+    """
+
+    def __init__(self, max_size_bytes: int, ttl_seconds: float = 0, disk_dir_path: str = None,
+                 disk_max_size_bytes: int = 0):
+        """
+        :param max_size_bytes: Max number of bytes of the responses stored in memory.
+        :param ttl_seconds: Number of seconds after which an entry expires. If is 0, entries don't expire.
+        :param disk_dir_path: Path to the folder of the disk tier. If is None, there is no disk tier.
+        :param disk_max_size_bytes: Max number of bytes of the responses stored on disk.
+        """
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir_path = disk_dir_path
+        self.disk_max_size_bytes = disk_max_size_bytes
+
+        self._lock = threading.Lock()
+        # Dict key -> (body, creation_time), sorted from the least recently used to the most recently used
+        self._entries: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self._size_bytes = 0
+
+        # Dict key -> size of the file, sorted from the oldest to the newest file
+        self._disk_entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._disk_size_bytes = 0
+        if disk_dir_path is not None:
+            os.makedirs(disk_dir_path, exist_ok=True)
+            self._disk_entries, self._disk_size_bytes = self._read_disk_entries()
+
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    @classmethod
+    def from_config(cls, section: str, config: Config = None) -> Optional['ResponseCache']:
+        """
+        Creates a ResponseCache with the params of the given section of the *-conf.ini file:
+
+        * MAX_SIZE_BYTES: If is 0 or isn't specified, the cache is disabled and None is returned.
+        * TTL_SECONDS: If is 0 or isn't specified, entries don't expire.
+        * DISK_DIR_PATH: If is empty or isn't specified, there is no disk tier.
+        * DISK_MAX_SIZE_BYTES
+
+        :param section: Section of the *-conf.ini file with the params of the cache.
+        :param config: Config object from which the params are obtained. If is None, get_config() is used.
+        """
+        params = cls.get_config_params(section, config)
+        if params['max_size_bytes'] <= 0:
+            return None
+        return cls(**params)
+
+    @staticmethod
+    def get_config_params(section: str, config: Config = None) -> Dict[str, Any]:
+        """
+        Returns a dict with the params of the given section of the *-conf.ini file used by from_config(),
+        with the names of the arguments of the constructor.
+        """
+        if config is None:
+            config = get_config()
+
+        return dict(max_size_bytes=config.get_int(section, 'MAX_SIZE_BYTES', fallback=0),
+                    ttl_seconds=config.get_int(section, 'TTL_SECONDS', fallback=0),
+                    disk_dir_path=config.get(section, 'DISK_DIR_PATH', fallback='') or None,
+                    disk_max_size_bytes=config.get_int(section, 'DISK_MAX_SIZE_BYTES', fallback=0))
+
+    @staticmethod
+    def get_key(*values: Any, **named_values: Any) -> str:
+        """
+        Returns a key that identifies the given values. Named values are sorted by name, so their order doesn't matter.
+        """
+        key_hash = hashlib.sha256()
+        for value in list(values) + sorted(named_values.items()):
+            encoded_value = repr(value).encode('utf-8')
+            # The length is included to avoid collisions between different splits of the same bytes
+            key_hash.update(str(len(encoded_value)).encode('ascii') + b':' + encoded_value)
+        return key_hash.hexdigest()
+
+    def _is_expired(self, creation_time: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - creation_time > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Returns the body stored with the given key, or None if there isn't a valid entry with that key.
+        The entries found on disk are moved back to memory.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                body, creation_time = entry
+                if not self._is_expired(creation_time):
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return body
+                self._remove_entry(key)
+
+        # The disk is accessed without holding the lock, so a slow disk access doesn't block the rest of requests
+        disk_entry = self._get_from_disk(key)
+
+        with self._lock:
+            if disk_entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            body, creation_time = disk_entry
+            self._stats['disk_hits'] += 1
+            if key not in self._disk_entries:
+                # The entry has been stored on disk by other process
+                self._disk_entries[key] = len(body)
+                self._disk_size_bytes += len(body)
+            evicted_entries = self._put_in_memory(key, body, creation_time)
+
+        self._put_on_disk(evicted_entries)
+        return body
+
+    def put(self, key: str, body: bytes):
+        """
+        Stores the given body with the given key, evicting the least recently used entries if needed.
+        Bodies greater than max_size_bytes aren't stored.
+        """
+        if len(body) > self.max_size_bytes:
+            return
+
+        with self._lock:
+            evicted_entries = self._put_in_memory(key, body, time.time())
+
+        self._put_on_disk(evicted_entries)
+
+    def _put_in_memory(self, key: str, body: bytes, creation_time: float) -> List[Tuple[str, bytes, float]]:
+        """
+        Stores the given body in memory, evicting the least recently used entries if needed.
+        It must be called with the lock acquired, and the body can't be greater than max_size_bytes.
+
+        :return: List of tuples (key, body, creation_time) of the evicted entries that haven't expired, \
+        that must be stored on disk with _put_on_disk().
+        """
+        if key in self._entries:
+            self._remove_entry(key)
+
+        self._entries[key] = (body, creation_time)
+        self._size_bytes += len(body)
+
+        evicted_entries = []
+        while self._size_bytes > self.max_size_bytes:
+            evicted_key, (evicted_body, evicted_creation_time) = self._entries.popitem(last=False)
+            self._size_bytes -= len(evicted_body)
+            self._stats['evictions'] += 1
+            if not self._is_expired(evicted_creation_time):
+                evicted_entries.append((evicted_key, evicted_body, evicted_creation_time))
+        return evicted_entries
+
+    def _remove_entry(self, key: str):
+        body, _ = self._entries.pop(key)
+        self._size_bytes -= len(body)
+
+    def clear(self):
+        """
+        Removes all the entries of the cache, in memory and on disk. All the files of the disk tier are removed,
+        including the ones stored by other processes, so when several processes share the folder, only one of them
+        must call this method, and the rest must call clear_memory().
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._disk_entries.clear()
+            self._disk_size_bytes = 0
+
+        if self.disk_dir_path is not None:
+            disk_entries, _ = self._read_disk_entries()
+            self._remove_disk_files(list(disk_entries))
+
+    def clear_memory(self):
+        """
+        Removes the entries stored in memory, and reads again the info of the entries stored on disk, so the
+        entries removed from disk by other process (see clear()) are forgotten, and the ones stored after that
+        are kept.
+        """
+        if self.disk_dir_path is not None:
+            disk_entries, disk_size_bytes = self._read_disk_entries()
+        else:
+            disk_entries, disk_size_bytes = OrderedDict(), 0
+
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+            self._disk_entries = disk_entries
+            self._disk_size_bytes = disk_size_bytes
+
+    def _get_disk_entry_path(self, key: str) -> str:
+        return join_paths(self.disk_dir_path, key)
+
+    def _read_disk_entries(self) -> Tuple['OrderedDict[str, int]', int]:
+        """
+        Returns the info of the entries stored on disk (by previous executions or other processes): a dict
+        key -> size of the file, sorted from the oldest to the newest file, and the sum of their sizes.
+        It must be called without the lock.
+        """
+        disk_entries: 'OrderedDict[str, int]' = OrderedDict()
+        disk_size_bytes = 0
+        # Files that start with '.' are temporary files
+        files_stats = []
+        for entry in os.scandir(self.disk_dir_path):
+            try:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    files_stats.append((entry.name, entry.stat()))
+            except OSError:
+                # The file has been removed by other process
+                pass
+        for file_name, file_stat in sorted(files_stats, key=lambda name_and_stat: name_and_stat[1].st_mtime):
+            disk_entries[file_name] = file_stat.st_size
+            disk_size_bytes += file_stat.st_size
+        return disk_entries, disk_size_bytes
+
+    def _get_from_disk(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """
+        Returns a tuple (body, creation_time) with the entry stored on disk with the given key (by this process
+        or other one), or None if there isn't a valid entry with that key. It must be called without the lock.
+        """
+        if self.disk_dir_path is None:
+            return None
+
+        disk_entry_path = self._get_disk_entry_path(key)
+        try:
+            # The modification time of the file is the creation time of the entry
+            creation_time = os.path.getmtime(disk_entry_path)
+            if not self._is_expired(creation_time):
+                with open(disk_entry_path, 'rb') as disk_entry_file:
+                    return disk_entry_file.read(), creation_time
+        except OSError:
+            # The file doesn't exist or has been removed by other process
+            pass
+
+        self._remove_disk_entries([key])
+        return None
+
+    def _put_on_disk(self, entries: List[Tuple[str, bytes, float]]):
+        """
+        Stores the given entries (tuples (key, body, creation_time)) on disk, removing the oldest files if needed.
+        It must be called without the lock.
+        """
+        if self.disk_dir_path is None:
+            return
+
+        for key, body, creation_time in entries:
+            if len(body) > self.disk_max_size_bytes:
+                continue
+
+            # Write to a temporary file and rename it, so other processes never read partially written files
+            with tempfile.NamedTemporaryFile('wb', dir=self.disk_dir_path, prefix='.', delete=False) as tmp_file:
+                tmp_file.write(body)
+            os.utime(tmp_file.name, (creation_time, creation_time))
+            os.replace(tmp_file.name, self._get_disk_entry_path(key))
+
+            removed_keys = []
+            with self._lock:
+                if key in self._disk_entries:
+                    self._disk_size_bytes -= self._disk_entries.pop(key)
+                self._disk_entries[key] = len(body)
+                self._disk_size_bytes += len(body)
+
+                while self._disk_size_bytes > self.disk_max_size_bytes:
+                    removed_key, size = self._disk_entries.popitem(last=False)
+                    self._disk_size_bytes -= size
+                    removed_keys.append(removed_key)
+
+            self._remove_disk_files(removed_keys)
+
+    def _remove_disk_entries(self, keys: List[str]):
+        """
+        Removes the given entries from disk. It must be called without the lock.
+        """
+        with self._lock:
+            for key in keys:
+                if key in self._disk_entries:
+                    self._disk_size_bytes -= self._disk_entries.pop(key)
+
+        self._remove_disk_files(keys)
+
+    def _remove_disk_files(self, keys: List[str]):
+        for key in keys:
+            try:
+                os.remove(self._get_disk_entry_path(key))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with statistics about the cache.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(num_entries=len(self._entries), size_bytes=self._size_bytes,
+                         num_disk_entries=len(self._disk_entries), disk_size_bytes=self._disk_size_bytes)
+        return stats
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes a text before using it as part of a cache key: removes leading and trailing whitespaces and
+    converts all the line breaks to '\\n'. This doesn't modify the result of the models.
+    """
+    return text.replace('\r\n', '\n').replace('\r', '\n').strip()
+
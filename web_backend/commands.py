@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict
+
+try:
+    import fcntl
+except ImportError:
+    # Not available in Windows, where the server runs in a single process
+    fcntl = None
+
+
+class CommandsBroadcaster:
+    """
+    Broadcasts commands (for example, clearing the in-memory caches) to all the processes that serve the app,
+    through a JSON file shared by them, so the commands are executed by all the processes without restarting them.
+
+    The file has a counter for each command (a command name and it's arguments), that is incremented each time
+    the command is published. The run_pending() method, that must be called by each process before answering
+    a request, runs the handler of the commands whose counter has changed since the last call. The file is only
+    read again when it changes on disk (it's modification time, inode or size changes), like the params file.
+
+    A command published several times before a process runs it is only run once by that process, so the
+    commands must be idempotent. The commands published before a process is created (or forked) aren't run by it.
+    The broadcaster is thread-safe.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        :param file_path: Path to the file shared by the processes. It's created when the first command is published.
+        """
+        self.file_path = file_path
+
+        self._lock = threading.RLock()
+        self._handlers: Dict[str, Callable[..., None]] = {}
+        self._file_version = None
+        # Dict command key -> counter of the command when it was run (or ignored) by this process
+        self._counters: Dict[str, int] = {}
+        self._pid = None
+        self._skip_pending()
+
+    def register(self, command: str, handler: Callable[..., None]):
+        """
+        Registers the function that runs the given command. It receives the arguments of the command
+        as keyword arguments.
+        """
+        self._handlers[command] = handler
+
+    @staticmethod
+    def _get_command_key(command: str, args: Dict[str, Any]) -> str:
+        return json.dumps([command, args], sort_keys=True)
+
+    def _get_file_version(self):
+        """
+        Returns a tuple that changes each time the file is modified on disk, or None if it doesn't exist.
+        """
+        try:
+            file_stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return file_stat.st_mtime_ns, file_stat.st_ino, file_stat.st_size
+
+    def _read_commands(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the content of the file: a dict command key -> dict with the command, it's args and it's counter.
+        """
+        try:
+            with open(self.file_path, 'r') as commands_file:
+                return json.load(commands_file)
+        except FileNotFoundError:
+            return {}
+
+    def _skip_pending(self):
+        """
+        Marks the commands published until now as run, without running them. Must be called with the lock acquired.
+        """
+        self._file_version = self._get_file_version()
+        self._counters = {key: command['counter'] for key, command in self._read_commands().items()}
+        self._pid = os.getpid()
+
+    def publish(self, command: str, **args: Any):
+        """
+        Publishes the given command, with the given arguments, so it's run by all the processes,
+        and runs it in the current process.
+
+        :raises KeyError: If the command hasn't been registered.
+        """
+        if command not in self._handlers:
+            raise KeyError('Command "{0}" not registered'.format(command))
+
+        key = self._get_command_key(command, args)
+        dir_path = os.path.dirname(os.path.abspath(self.file_path))
+        os.makedirs(dir_path, exist_ok=True)
+
+        # The file is locked while it's read and replaced, so the counters published at the same time by
+        # other processes aren't lost. The new content is written to a temporary file that replaces the file,
+        # so other processes never read a partially written file.
+        with open(self.file_path + '.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            commands = self._read_commands()
+            counter = commands.get(key, {}).get('counter', 0) + 1
+            commands[key] = {'command': command, 'args': args, 'counter': counter}
+            with tempfile.NamedTemporaryFile('w', dir=dir_path, suffix='.json', delete=False) as tmp_file:
+                json.dump(commands, tmp_file)
+            os.replace(tmp_file.name, self.file_path)
+
+        self.run_pending()
+
+    def run_pending(self):
+        """
+        Runs the commands published (by any process) since the last call. If the file hasn't changed,
+        it isn't read. In a process forked from the one that created the broadcaster, the commands published
+        until the first call aren't run.
+        """
+        if self._pid == os.getpid() and self._get_file_version() == self._file_version:
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._skip_pending()
+                return
+
+            file_version = self._get_file_version()
+            if file_version == self._file_version:
+                # Other thread has run the commands while this one was waiting for the lock
+                return
+
+            for key, command in self._read_commands().items():
+                if self._counters.get(key, 0) < command['counter']:
+                    # The counter is updated before running the command, so a failed command isn't run again
+                    self._counters[key] = command['counter']
+                    handler = self._handlers.get(command['command'])
+                    if handler is not None:
+                        handler(**command['args'])
+            self._file_version = file_version
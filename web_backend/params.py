@@ -1,9 +1,26 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, List, Tuple
+
 import yaml
 
-from web_backend.utils import get_abspath_from_project_source_root
+from web_backend.utils import get_abspath_from_project_source_root, join_paths
+
+try:
+    import fcntl
+except ImportError:
+    # Not available in Windows, where the server runs in a single process
+    fcntl = None
 
 _PARAMS_FILE_PATH = get_abspath_from_project_source_root('params-file.yaml')
 
+# Line of a yaml file with a key, and optionally it's value and a comment
+_YAML_KEY_LINE_REGEX = re.compile(r'^(?P<indentation> *)(?P<key>[^\s#:][^#:]*?):(?P<separator> *)(?P<value>[^#\s]*)'
+                                  r'(?P<comment>\s*#.*)?\s*$')
+
 
 def _load_yaml_file(yaml_file_path: str):
     """
@@ -17,10 +34,116 @@ def _load_yaml_file(yaml_file_path: str):
         return yaml.load(yaml_file, Loader=yaml.SafeLoader)
 
 
+def _flatten_dict(dict_obj: Dict[str, Any], keys_prefix: str = '') -> Dict[str, Any]:
+    """
+    Given a dict with nested dicts, returns a dict with an entry for each key of each dict, using '.' to separate keys.
+
+    Example:
+
+    >>> _flatten_dict({'text': {'min': 1}})
+    {'text': {'min': 1}, 'text.min': 1}
+    """
+    flattened_dict = {}
+    for key, value in dict_obj.items():
+        name = keys_prefix + str(key)
+        flattened_dict[name] = value
+        if isinstance(value, dict):
+            flattened_dict.update(_flatten_dict(value, name + '.'))
+    return flattened_dict
+
+
+class _ParamsRegistry:
+    """
+    Registry that parses a params file only once, and serves the params values from a flattened dict.
+
+    The file is parsed again only when it changes on disk (it's modification time, inode or size changes),
+    or when it's updated with the update_param() function. The registry is thread-safe.
+    """
+
+    def __init__(self, yaml_file_path: str):
+        self.yaml_file_path = yaml_file_path
+        self._lock = threading.Lock()
+        self._file_version = None
+        self._params: Dict[str, Any] = {}
+
+    def _get_file_version(self):
+        """
+        Returns a tuple that changes each time the params file is modified on disk.
+        """
+        file_stat = os.stat(self.yaml_file_path)
+        return file_stat.st_mtime_ns, file_stat.st_ino, file_stat.st_size
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the value of the param with the specified name, reloading the params file if it has changed.
+        """
+        if self._get_file_version() != self._file_version:
+            self.reload()
+
+        # The dict is replaced (never modified) in each reload, so it can be accessed without the lock
+        return self._params[name]
+
+    def get_all(self) -> Dict[str, Any]:
+        """
+        Returns a dict with all the params (with nested dicts), reloading the params file if it has changed.
+        """
+        if self._get_file_version() != self._file_version:
+            self.reload()
+
+        return {name: value for name, value in self._params.items() if '.' not in name}
+
+    def get_version(self) -> str:
+        """
+        Returns a str that changes each time the params file changes.
+        """
+        file_version = self._get_file_version()
+        if file_version != self._file_version:
+            self.reload()
+        return '-'.join(str(value) for value in file_version)
+
+    def reload(self):
+        """
+        Parses again the params file. The new params replace the previous ones atomically.
+        """
+        with self._lock:
+            file_version = self._get_file_version()
+            if file_version == self._file_version:
+                # Other thread has reloaded the file while this one was waiting for the lock
+                return
+
+            self._params = _flatten_dict(_load_yaml_file(self.yaml_file_path))
+            self._file_version = file_version
+
+    def invalidate(self):
+        """
+        Forces the params file to be parsed again in the next access to a param.
+        """
+        with self._lock:
+            self._file_version = None
+
+
+_params_registries: Dict[str, _ParamsRegistry] = {}
+_params_registries_lock = threading.Lock()
+
+
+def _get_params_registry(yaml_file_path: str) -> _ParamsRegistry:
+    """
+    Returns the _ParamsRegistry of the given params file. Only one registry is created for each params file.
+    """
+    yaml_file_path = os.path.abspath(yaml_file_path)
+
+    with _params_registries_lock:
+        if yaml_file_path not in _params_registries:
+            _params_registries[yaml_file_path] = _ParamsRegistry(yaml_file_path)
+        return _params_registries[yaml_file_path]
+
+
 def get_param(name: str, yaml_file_path: str = None) -> int:
     """
     Returns the value of the param with the specified name from a yaml file.
 
+    The yaml file is only parsed again if it has changed since the last call.
+
     Example:
 
     >>> get_param('topics.text.num_keywords.default')
@@ -42,46 +165,101 @@ def get_param(name: str, yaml_file_path: str = None) -> int:
     if yaml_file_path is None:
         yaml_file_path = _PARAMS_FILE_PATH
 
-    # Load the yaml file into a python dict
-    yaml_file_obj = _load_yaml_file(yaml_file_path)
+    # Obtain the value from the registry of the params file
+    return _get_params_registry(yaml_file_path).get(name)
+
+
+def get_params(yaml_file_path: str = None) -> Dict[str, Any]:
+    """
+    Returns a dict with all the params of a yaml file, with the same structure as the file (nested dicts).
+
+    :param yaml_file_path: Path to the params file.
+    """
+    if yaml_file_path is None:
+        yaml_file_path = _PARAMS_FILE_PATH
+
+    return _get_params_registry(yaml_file_path).get_all()
+
+
+def get_params_version(yaml_file_path: str = None) -> str:
+    """
+    Returns a str that identifies the current content of the params file. It changes each time the file changes,
+    so it can be used as part of the keys of caches of values that depend on the params.
+
+    :param yaml_file_path: Path to the params file.
+    """
+    if yaml_file_path is None:
+        yaml_file_path = _PARAMS_FILE_PATH
+
+    return _get_params_registry(yaml_file_path).get_version()
+
 
-    # Obtain the keys from the str
-    keys = name.split('.')
+def _replace_yaml_value(yaml_lines: List[str], keys: List[str], value: int) -> List[str]:
+    """
+    Given the lines of a yaml file with nested dicts (in block style, one key in each line), returns the lines with
+    the value of the given keys replaced by the given value. The other lines, the comments and the order of the keys
+    aren't modified.
 
-    # Iterate into the dicts using the keys
-    param_value = yaml_file_obj
-    for key in keys:
-        param_value = param_value[key]
+    :raises KeyError: If the keys don't have a value in the lines.
+    """
+    # Keys of the dicts that contain the current line, with their indentation
+    parent_keys: List[Tuple[int, str]] = []
+    for line_index, line in enumerate(yaml_lines):
+        match = _YAML_KEY_LINE_REGEX.match(line)
+        if match is None:
+            # Blank or comment lines
+            continue
 
-    # Return the value of the last dict
-    return param_value
+        indentation = len(match.group('indentation'))
+        while parent_keys and parent_keys[-1][0] >= indentation:
+            parent_keys.pop()
+        parent_keys.append((indentation, match.group('key')))
+
+        if [key for _, key in parent_keys] == keys and match.group('value') != '':
+            new_yaml_lines = list(yaml_lines)
+            new_yaml_lines[line_index] = '{0}{1}:{2}{3}{4}\n'.format(
+                match.group('indentation'), match.group('key'), match.group('separator') or ' ', value,
+                match.group('comment') or ''
+            )
+            return new_yaml_lines
+
+    raise KeyError('.'.join(keys))
 
 
 def update_param(name: str, value: int, yaml_file_path: str = None):
     """
     Given a param name, updates it's value.
 
+    Only the line of the param is modified, so the comments and the order of the params of the file are kept.
+    The params file is locked while it's read and replaced, so the values updated at the same time by other
+    processes aren't lost.
+
     :param name: Name of the parameter, using '.' to separate keys.
     :param value: New value of the param (int).
     :param yaml_file_path: Path to the params file.
+    :raises KeyError: If the param doesn't exist, or has nested params.
     """
     if yaml_file_path is None:
         yaml_file_path = _PARAMS_FILE_PATH
 
-    # Load the yaml file into a python dict
-    yaml_file_obj = _load_yaml_file(yaml_file_path)
+    yaml_file_dir_path = os.path.dirname(os.path.abspath(yaml_file_path))
+    lock_file_path = join_paths(yaml_file_dir_path, '.' + os.path.basename(yaml_file_path) + '.lock')
+    with open(lock_file_path, 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
 
-    # Obtain the keys from the str
-    keys = name.split('.')
+        with open(yaml_file_path, 'r') as yaml_file:
+            yaml_lines = yaml_file.readlines()
 
-    # Iterate into the dicts using the keys, except the last key
-    param_dict = yaml_file_obj
-    for key in keys[:len(keys) - 1]:
-        param_dict = param_dict[key]
+        # Obtain the keys from the str, and replace the value of the param in the line where it's defined
+        yaml_lines = _replace_yaml_value(yaml_lines, name.split('.'), value)
 
-    # Update the inner dict with the value
-    param_dict[keys[-1]] = value
+        # The new content is written to a temporary file that replaces the params file, so other threads
+        # or processes never read a partially written params file
+        with tempfile.NamedTemporaryFile('w', dir=yaml_file_dir_path, suffix='.yaml', delete=False) as yaml_file:
+            yaml_file.writelines(yaml_lines)
+        shutil.copymode(yaml_file_path, yaml_file.name)
+        os.replace(yaml_file.name, yaml_file_path)
 
-    # Rewrite the yaml file with the new dict
-    with open(yaml_file_path, 'w') as yaml_file:
-        yaml.dump(yaml_file_obj, yaml_file)
+    # Force the registry of the params file to parse it again
+    _get_params_registry(yaml_file_path).invalidate()
@@ -0,0 +1,164 @@
+"""
+Module to generate in batch (offline) some elements used by the backend, and store them on disk, \
+inside the ModelsWrapper.PRECOMPUTED_ELEMENTS_DIR_PATH folder. The backend loads them at startup, if they exist.
+
+The CONF_INI_FILE_PATH environment variable must be set. Usage:
+
+::
+
+    # Store the documents of the dataset in a memory-mapped corpus store, with the positions of their sentences
+    python -m web_backend.precompute corpus
+    # Store only the documents, without the positions of their sentences
+    python -m web_backend.precompute corpus --no-sentences
+    # Generate the summaries of all the documents of the dataset
+    python -m web_backend.precompute summaries
+    # Generate the summaries with 2 and 4 sentences of all the documents of the dataset
+    python -m web_backend.precompute summaries --num-summary-sentences 2 4
+    # Generate the topics distribution of all the documents of the dataset
+    python -m web_backend.precompute docs-topics
+    # Convert the word embeddings of the summarization model into a memory-mapped store
+    python -m web_backend.precompute embeddings
+    # Store them as float32, and only the words of the dataset documents
+    python -m web_backend.precompute embeddings --dtype float32 --prune-to-dataset-vocabulary
+    # Obtain the vectors of all the sentences of the dataset documents (requires the stored word embeddings)
+    python -m web_backend.precompute sentence-vectors
+    # Generate the wordcloud images with all the valid numbers of keywords
+    python -m web_backend.precompute wordclouds
+    # Generate the wordcloud images with 10 and 20 keywords
+    python -m web_backend.precompute wordclouds --num-keywords 10 20
+    # Generate the topics distribution of the documents with other topics model, instead of the default one
+    python -m web_backend.precompute --model lda_mallet_20topics_model docs-topics
+"""
+
+import argparse
+
+import numpy as np
+
+from web_backend.wrapper.twenty_news_groups_dataset_models_wrapper import TwentyNewsGroupsDatasetModelsWrapper
+
+
+def precompute_corpus(store_sentences=True, model_name=None):
+    """
+    Stores the original content of all the documents of the dataset in a memory-mapped CorpusStore.
+
+    :param store_sentences: If is True, the positions of the sentences of each document are also stored.
+    :param model_name: Name of the topics model. If is None, the default model of the *-conf.ini file is used.
+    """
+    models_wrapper = TwentyNewsGroupsDatasetModelsWrapper(model_name)
+    models_wrapper.build_corpus_store(store_sentences)
+
+
+def precompute_summaries(num_summary_sentences_values=None, model_name=None):
+    """
+    Generates the summaries of all the documents of the dataset and stores them on disk.
+
+    :param num_summary_sentences_values: Numbers of sentences of the summaries to be generated. \
+    If is None, the default value of the summaries of the documents is obtained from the params file.
+    :param model_name: Name of the topics model. If is None, the default model of the *-conf.ini file is used.
+    """
+    models_wrapper = TwentyNewsGroupsDatasetModelsWrapper(model_name)
+    models_wrapper.build_summaries_store(num_summary_sentences_values)
+
+
+def precompute_docs_topics(model_name=None):
+    """
+    Obtains the topics distribution of all the documents of the dataset and stores it on disk.
+
+    :param model_name: Name of the topics model. If is None, the default model of the *-conf.ini file is used.
+    """
+    models_wrapper = TwentyNewsGroupsDatasetModelsWrapper(model_name)
+    models_wrapper.build_docs_topics_index()
+
+
+def precompute_embeddings(dtype=np.float16, prune_to_dataset_vocabulary=False, glove_vectors_dim=100,
+                          model_name=None):
+    """
+    Converts the word embeddings of the summarization model into an EmbeddingsStore and stores it on disk.
+
+    :param dtype: Type of the stored vectors: np.float16 or np.float32.
+    :param prune_to_dataset_vocabulary: If is True, only the words of the dataset documents are stored.
+    :param glove_vectors_dim: Dimension of the Glove vectors to be stored. Only used with the Glove embeddings.
+    :param model_name: Name of the topics model. If is None, the default model of the *-conf.ini file is used.
+    """
+    models_wrapper = TwentyNewsGroupsDatasetModelsWrapper(model_name)
+    models_wrapper.build_embeddings_store(dtype, prune_to_dataset_vocabulary, glove_vectors_dim)
+
+
+def precompute_sentence_vectors(model_name=None):
+    """
+    Obtains the vectors of all the sentences of the dataset documents with the summarization model and stores
+    them on disk. The word embeddings must have been stored before with precompute_embeddings().
+
+    :param model_name: Name of the topics model. If is None, the default model of the *-conf.ini file is used.
+    """
+    models_wrapper = TwentyNewsGroupsDatasetModelsWrapper(model_name)
+    models_wrapper.build_sentence_vectors_store()
+
+
+def precompute_word_clouds(num_keywords_values=None, model_name=None):
+    """
+    Generates the wordcloud images of all the topics and stores them inside the ModelsWrapper.WORDCLOUD_IMAGES_DIR_PATH
+    folder, so they aren't generated when they are requested for the first time.
+
+    :param num_keywords_values: Numbers of keywords of the images to be generated. \
+    If is None, the images with all the valid numbers of keywords (specified in the params file) are generated.
+    :param model_name: Name of the topics model. If is None, the default model of the *-conf.ini file is used.
+    """
+    models_wrapper = TwentyNewsGroupsDatasetModelsWrapper(model_name)
+    models_wrapper.build_word_cloud_images(num_keywords_values)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Generates in batch some elements used by the backend.')
+    parser.add_argument('--model', default=None,
+                        help='Name of the topics model. By default, the BEST_TOPICS_MODEL_NAME of the *-conf.ini file.')
+    subparsers = parser.add_subparsers(dest='element')
+    subparsers.required = True
+
+    corpus_parser = subparsers.add_parser('corpus', help='Original content of all the documents of the dataset.')
+    corpus_parser.add_argument('--no-sentences', action='store_true',
+                               help='Don\'t store the positions of the sentences of the documents.')
+
+    summaries_parser = subparsers.add_parser('summaries', help='Summaries of all the documents of the dataset.')
+    summaries_parser.add_argument('--num-summary-sentences', type=int, nargs='+', default=None,
+                                  help='Numbers of sentences of the summaries. '
+                                       'By default, the value specified in the params file is used.')
+
+    subparsers.add_parser('docs-topics', help='Topics distribution of all the documents of the dataset.')
+
+    embeddings_parser = subparsers.add_parser('embeddings', help='Word embeddings of the summarization model.')
+    embeddings_parser.add_argument('--dtype', choices=['float16', 'float32'], default='float16',
+                                   help='Type of the stored vectors. By default, float16.')
+    embeddings_parser.add_argument('--prune-to-dataset-vocabulary', action='store_true',
+                                   help='Store only the words of the dataset documents. The words of new texts '
+                                        'that aren\'t in the dataset are ignored when summarizing them.')
+    embeddings_parser.add_argument('--glove-vectors-dim', type=int, default=100, choices=[50, 100, 200, 300],
+                                   help='Dimension of the Glove vectors. By default, 100.')
+
+    subparsers.add_parser('sentence-vectors', help='Vectors of all the sentences of the dataset documents. '
+                                                   'The word embeddings must have been stored before.')
+
+    word_clouds_parser = subparsers.add_parser('wordclouds', help='Wordcloud images of all the topics.')
+    word_clouds_parser.add_argument('--num-keywords', type=int, nargs='+', default=None,
+                                    help='Numbers of keywords of the images. '
+                                         'By default, all the valid values specified in the params file are used.')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+
+    if args.element == 'corpus':
+        precompute_corpus(not args.no_sentences, args.model)
+    elif args.element == 'summaries':
+        precompute_summaries(args.num_summary_sentences, args.model)
+    elif args.element == 'docs-topics':
+        precompute_docs_topics(args.model)
+    elif args.element == 'embeddings':
+        precompute_embeddings(np.dtype(args.dtype), args.prune_to_dataset_vocabulary, args.glove_vectors_dim,
+                              args.model)
+    elif args.element == 'sentence-vectors':
+        precompute_sentence_vectors(args.model)
+    elif args.element == 'wordclouds':
+        precompute_word_clouds(args.num_keywords, args.model)
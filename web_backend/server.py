@@ -0,0 +1,333 @@
+"""
+Module that runs the backend in production with several worker processes, that share the models loaded only once.
+
+The master process loads the ModelsWrappers of the default model and the preloaded models, and then forks the
+worker processes, that answer the requests with a Waitress server listening in the same socket. The forked processes
+share the memory pages of the models with the master process (copy-on-write), so the memory doesn't grow with
+the number of workers, while the requests are processed in parallel, without sharing the GIL.
+Only POSIX systems are supported (os.fork() is required).
+
+The master process handles the following signals:
+
+* **SIGTERM** or **SIGINT**: Graceful stop. The workers stop accepting connections, finish the requests \
+  in progress (up to SERVER.GRACEFUL_TIMEOUT_SECONDS seconds) and exit.
+* **SIGHUP**: Graceful reload. The *-conf.ini file is read again and the models loaded in the master (and the new \
+  default model, if it has changed) are loaded again. Then, new workers are forked and the old ones are stopped \
+  gracefully. The old workers keep answering requests until the new ones are ready. The params of the sections \
+  of the models (INFERENCE, SUMMARIZATION, WORDCLOUD) are applied to the models loaded again, and the params read \
+  by the APIs (RESPONSE_CACHE, HTTP_CACHE, WORDCLOUD.WAIT_TIMEOUT_SECONDS, ADMIN.API_TOKEN) to the next requests. \
+  The params of the SERVER section, the MODELS section (except the default model) and \
+  ADMIN.COMMANDS_FILE_PATH are only read at startup, so changing them requires a restart.
+
+The other models are loaded by each worker the first time they are requested, so their memory isn't shared.
+The workers that die are replaced automatically. The CONF_INI_FILE_PATH environment variable must be set. Usage:
+
+::
+
+    # Run the server in the 8080 port, with the number of workers and threads of the [SERVER] section
+    python -m web_backend.server --port 8080
+    # Run the server with 4 worker processes of 8 threads each
+    python -m web_backend.server --port 8080 --workers 4 --threads 8
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from typing import Dict, Set
+
+from flask import Flask
+from topics_and_summary.utils import pretty_print
+
+from web_backend.utils import UserResourceWithParamValueNotFoundError, get_config, reload_config
+from web_backend.wrapper.models_registry import ModelsRegistry
+
+
+def _freeze_gc():
+    """
+    Moves all the objects tracked by the garbage collector to a permanent generation, that isn't collected.
+    Without this, the first collections of each forked process write into the pages of the objects of the models,
+    and the OS copies them (copy-on-write), multiplying the memory by the number of processes.
+    gc.freeze() is only available in python >= 3.7.
+    """
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+
+
+def _unfreeze_gc():
+    """
+    Moves the objects frozen by _freeze_gc() back to the collected generations, so the ones that aren't used
+    anymore (for example, the previous ModelsWrapper after a reload) can be collected.
+    """
+    if hasattr(gc, 'unfreeze'):
+        gc.unfreeze()
+    gc.collect()
+
+
+class PreforkServer:
+    """
+    Server that loads the models in the master process and forks several worker processes that answer
+    the requests with a Waitress server. See the documentation of the web_backend.server module.
+    """
+
+    _MASTER_LOOP_INTERVAL_SECONDS = 0.5
+
+    def __init__(self, app: Flask, models_registry: ModelsRegistry, host: str = '0.0.0.0',
+                 port: int = 8080, num_workers: int = 4, num_threads: int = 4, graceful_timeout: float = 30,
+                 backlog: int = 1024):
+        """
+        :param app: Flask application answered by the workers.
+        :param models_registry: Registry of the ModelsWrappers used by the app. The default model and the preloaded \
+        models are loaded before forking the workers.
+        :param host: Host where the server listens.
+        :param port: Port where the server listens.
+        :param num_workers: Number of worker processes.
+        :param num_threads: Number of threads of each worker process.
+        :param graceful_timeout: Max number of seconds that a worker waits for the requests in progress when \
+        it's stopped.
+        :param backlog: Max number of connections waiting to be accepted.
+        """
+        self.app = app
+        self.models_registry = models_registry
+        self.host = host
+        self.port = port
+        self.num_workers = num_workers
+        self.num_threads = num_threads
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+
+        self._socket: socket.socket = None
+        # Pids of the workers of the current generation, and of the workers that are being stopped
+        self._workers: Set[int] = set()
+        self._stopping_workers: Dict[int, float] = {}
+        self._stop_requested = False
+        self._reload_requested = False
+
+    def run(self):
+        """
+        Loads the models, forks the workers and supervises them until the server is stopped.
+        """
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen(self.backlog)
+
+        self._load_models()
+        # The Admin API of the workers asks the master to reload the models, instead of reloading them by itself
+        self.app.config['PREFORK_MASTER_PID'] = os.getpid()
+
+        signal.signal(signal.SIGTERM, self._on_stop_signal)
+        signal.signal(signal.SIGINT, self._on_stop_signal)
+        signal.signal(signal.SIGHUP, self._on_reload_signal)
+
+        pretty_print('Serving on http://{}:{} with {} workers'.format(self.host, self.port, self.num_workers))
+        self._spawn_workers()
+        while not self._stop_requested:
+            if self._reload_requested:
+                self._reload_requested = False
+                self._reload()
+            self._reap_workers()
+            self._spawn_workers()
+            self._kill_timed_out_workers()
+            time.sleep(self._MASTER_LOOP_INTERVAL_SECONDS)
+
+        self._stop()
+
+    def _load_models(self):
+        """
+        Loads the ModelsWrappers of the default model and the preloaded models in the master process and prepares
+        them to be shared with the forked workers.
+
+        :raises RuntimeError: If the models couldn't be loaded.
+        """
+        self.models_registry.start()
+        if not self.models_registry.wait():
+            raise RuntimeError('The models couldn\'t be loaded: {}'.format(self._get_models_errors()))
+
+        self._prepare_models_for_fork()
+
+    def _prepare_models_for_fork(self):
+        """
+        Prepares the loaded ModelsWrappers to be shared with the workers that will be forked.
+        """
+        # The worker processes of the pools are started by each worker, not by the master
+        for models_wrapper in self.models_registry.get_loaded_models_wrappers():
+            models_wrapper.stop_worker_processes()
+        _freeze_gc()
+
+    def _get_models_errors(self) -> str:
+        """
+        Returns the errors of the models of the registry that couldn't be loaded.
+        """
+        return ', '.join('{}: {}'.format(model_name, loader_status['error'])
+                         for model_name, loader_status in self.models_registry.get_loaders_status().items()
+                         if loader_status['error'] is not None)
+
+    def _reload(self):
+        """
+        Loads again the ModelsWrappers of the master, forks a new generation of workers with them and stops
+        the old workers gracefully. If the models can't be loaded, the old workers are kept.
+        """
+        pretty_print('Reloading the models')
+        _unfreeze_gc()
+        reload_config()
+        try:
+            self.models_registry.set_default_model(get_config().best_topics_model_name)
+        except UserResourceWithParamValueNotFoundError as err:
+            pretty_print('The default model couldn\'t be changed: {}'.format(err.message))
+        self.models_registry.reload()
+        if not self.models_registry.wait():
+            pretty_print('The models couldn\'t be reloaded: {}'.format(self._get_models_errors()))
+            _freeze_gc()
+            return
+
+        self._prepare_models_for_fork()
+
+        old_workers = self._workers
+        self._workers = set()
+        self._spawn_workers()
+        for pid in old_workers:
+            self._stop_worker(pid)
+
+    def _on_stop_signal(self, signum, frame):
+        self._stop_requested = True
+
+    def _on_reload_signal(self, signum, frame):
+        self._reload_requested = True
+
+    def _spawn_workers(self):
+        """
+        Forks workers until the current generation has num_workers workers.
+        """
+        while len(self._workers) < self.num_workers:
+            pid = os.fork()
+            if pid == 0:
+                # Child process. It never returns from _run_worker().
+                self._run_worker()
+            self._workers.add(pid)
+
+    def _reap_workers(self):
+        """
+        Removes the workers that have exited. The workers of the current generation are replaced later.
+        """
+        while True:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self._workers:
+                pretty_print('Worker {} died. Starting a new one'.format(pid))
+            self._workers.discard(pid)
+            self._stopping_workers.pop(pid, None)
+
+    def _stop_worker(self, pid: int):
+        """
+        Asks a worker to stop gracefully. If it doesn't stop in time, it's killed by _kill_timed_out_workers().
+        """
+        self._stopping_workers[pid] = time.time() + self.graceful_timeout + 5
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _kill_timed_out_workers(self):
+        for pid, deadline in list(self._stopping_workers.items()):
+            if time.time() > deadline:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _stop(self):
+        """
+        Stops all the workers gracefully, and waits until they exit.
+        """
+        pretty_print('Stopping the server')
+        for pid in self._workers:
+            self._stop_worker(pid)
+        self._workers = set()
+        while self._stopping_workers:
+            self._reap_workers()
+            self._kill_timed_out_workers()
+            time.sleep(self._MASTER_LOOP_INTERVAL_SECONDS / 5)
+        self._socket.close()
+
+    def _run_worker(self):
+        """
+        Answers requests in a forked worker process until it receives a SIGTERM signal.
+        """
+        # Waitress is only needed to run the server, so it isn't a dependency of the package
+        from waitress import create_server
+
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            for models_wrapper in self.models_registry.get_loaded_models_wrappers():
+                models_wrapper.start_worker_processes()
+
+            server = create_server(self.app, sockets=[self._socket], threads=self.num_threads)
+
+            def on_stop_signal(signum, frame):
+                # Stop accepting connections (the other workers accept them), and wait for the requests in progress
+                server.accepting = False
+                threading.Thread(target=self._drain_worker, args=(server,), daemon=True).start()
+
+            def on_drained_signal(signum, frame):
+                # The Waitress server stops when a SystemExit is raised in it's loop
+                raise SystemExit()
+
+            signal.signal(signal.SIGTERM, on_stop_signal)
+            signal.signal(signal.SIGUSR1, on_drained_signal)
+            server.run()
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            # The child must never return to the master loop, nor run the exit handlers of the master
+            os._exit(exit_code)
+
+    def _drain_worker(self, server):
+        """
+        Waits until the Waitress server of a worker has no open connections (the idle ones are closed), or until
+        graceful_timeout seconds have elapsed, and then stops it with a SIGUSR1 signal.
+        """
+        deadline = time.time() + self.graceful_timeout
+        while server.active_channels and time.time() < deadline:
+            for channel in list(server.active_channels.values()):
+                if not channel.requests:
+                    channel.will_close = True
+            server.pull_trigger()
+            time.sleep(0.1)
+        os.kill(os.getpid(), signal.SIGUSR1)
+
+
+def _parse_args():
+    config = get_config()
+    parser = argparse.ArgumentParser(description='Runs the backend with several worker processes.')
+    parser.add_argument('--host', default='0.0.0.0', help='Host where the server listens. By default, 0.0.0.0.')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8080)),
+                        help='Port where the server listens. By default, the PORT environment variable or 8080.')
+    parser.add_argument('--workers', type=int, default=config.get_int('SERVER', 'NUM_WORKERS', fallback=4),
+                        help='Number of worker processes. By default, the value of the *-conf.ini file.')
+    parser.add_argument('--threads', type=int, default=config.get_int('SERVER', 'NUM_THREADS', fallback=4),
+                        help='Number of threads of each worker process. By default, the value of the *-conf.ini file.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+
+    from web_backend.app import create_app
+    from web_backend.apis.user import models_registry
+
+    PreforkServer(create_app(), models_registry, host=args.host, port=args.port, num_workers=args.workers,
+                  num_threads=args.threads,
+                  graceful_timeout=get_config().get_float('SERVER', 'GRACEFUL_TIMEOUT_SECONDS', fallback=30)).run()
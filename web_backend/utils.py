@@ -1,5 +1,9 @@
 import configparser
+import os
+import threading
+import uuid
 from os import path, environ
+from typing import IO, Dict, List, Tuple
 
 # This python module (utils.py) must be in the root folder of the python package project.
 PROJECT_SOURCE_ROOT_PATH = path.dirname(path.abspath(__file__))
@@ -27,6 +31,87 @@ def get_abspath_from_project_source_root(_path: str) -> str:
     return path.abspath(join_paths(PROJECT_SOURCE_ROOT_PATH, _path))
 
 
+# Paths where the topics models and the wordcloud images are stored on disk. They are defined here (instead of only
+# in the ModelsWrapper class), so they can be used without importing the models libraries.
+TOPICS_MODELS_DIR_PATH = get_abspath_from_project_source_root('saved-elements/models/topics')
+WORDCLOUD_IMAGES_DIR_PATH = get_abspath_from_project_source_root('static/wordcloud-images')
+
+
+class ReplacingFilesWriter:
+    """
+    Writes files inside a folder with temporary names, and replaces the files with the final names (with os.replace())
+    when all of them have been written, in the same order in which they were created.
+
+    The replaced files keep existing for the processes that have them open or memory-mapped, so the files of a store
+    that is being used (by this or other processes) are never truncated: accessing the pages of a memory-mapped file
+    that has been truncated makes the process crash with a SIGBUS. Usage:
+
+    ::
+
+        with ReplacingFilesWriter(dir_path) as files_writer:
+            with files_writer.open('data.bin') as data_file:
+                data_file.write(data)
+            with files_writer.open('index.npy') as index_file:
+                np.save(index_file, index)
+        # Here, data.bin and index.npy have been replaced, in that order
+
+    If an exception is raised inside the with block, the temporary files are removed, and no file is replaced.
+    The temporary files start with '.' and end with '.tmp'.
+    """
+
+    def __init__(self, dir_path: str):
+        """
+        :param dir_path: Path to the folder of the files. It's created if it doesn't exist.
+        """
+        self.dir_path = dir_path
+        # List of tuples (final file path, temporary file path)
+        self._files_paths: List[Tuple[str, str]] = []
+        os.makedirs(dir_path, exist_ok=True)
+
+    def get_tmp_file_path(self, file_name: str) -> str:
+        """
+        Returns the path to a new temporary file that will replace the file with the given name. It's used by
+        the functions that need a path instead of a file object, like np.lib.format.open_memmap().
+        """
+        tmp_file_path = join_paths(self.dir_path, '.{0}.{1}.tmp'.format(file_name, uuid.uuid4().hex))
+        self._files_paths.append((join_paths(self.dir_path, file_name), tmp_file_path))
+        return tmp_file_path
+
+    def open(self, file_name: str, mode: str = 'wb') -> IO:
+        """
+        Opens a new temporary file that will replace the file with the given name.
+        """
+        return open(self.get_tmp_file_path(file_name), mode)
+
+    def replace(self):
+        """
+        Replaces the files with the temporary files written until now.
+        """
+        for file_path, tmp_file_path in self._files_paths:
+            os.replace(tmp_file_path, file_path)
+        self._files_paths = []
+
+    def remove_tmp_files(self):
+        """
+        Removes the temporary files written until now, without replacing the files.
+        """
+        for _, tmp_file_path in self._files_paths:
+            try:
+                os.remove(tmp_file_path)
+            except OSError:
+                pass
+        self._files_paths = []
+
+    def __enter__(self) -> 'ReplacingFilesWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.replace()
+        else:
+            self.remove_tmp_files()
+
+
 def rename_attribute(obj, old_attribute_name, new_attribute_name):
     """
     Given a object, this function renames one of it's attributes.
@@ -35,9 +120,9 @@ def rename_attribute(obj, old_attribute_name, new_attribute_name):
     delattr(obj, old_attribute_name)
 
 
-def get_param_value_from_conf_file(section: str, param: str) -> str:
+class Config:
     """
-    Returns the value of the specified param from the x-conf.ini file.
+    Configuration loaded from the x-conf.ini file.
 
     * The x-conf.ini file contains configuration for the development environment
     * The production-conf.ini file contains configuration for the production environment
@@ -52,26 +137,112 @@ def get_param_value_from_conf_file(section: str, param: str) -> str:
     and that need to be modified manually to point to the location of those files/folders \
     in the filesystem where the backend is executed.
 
-    :param section: Name of the section in the x-conf.ini file. For example: '[MALLET]'.
-    :param param: Name of the param inside that section. For example: 'SOURCE_CODE_PATH'.
-    :return: A str with the value specified in the x-conf.ini file for that param.
+    The value of any param can be overridden with an environment variable called WEB_BACKEND_<SECTION>_<PARAM>.
+    For example, the WEB_BACKEND_MALLET_SOURCE_CODE_PATH environment variable overrides the SOURCE_CODE_PATH param
+    of the [MALLET] section.
 
-    Example:
+    The file is read only once, when the object is created. Use the get_config() function to obtain the
+    configuration object shared by the whole process, and the reload_config() function to read the file again.
+    """
 
-    ; development-conf.ini
+    ENV_VARS_PREFIX = 'WEB_BACKEND_'
+    """ Prefix of the environment variables that override the params of the x-conf.ini file. """
 
-    [MALLET]
+    def __init__(self, conf_ini_file_path: str):
+        """
+        Reads the given x-conf.ini file.
 
-    SOURCE_CODE_PATH = /path/to/mallet
+        :param conf_ini_file_path: Path to the x-conf.ini file.
+        """
+        if not path.isfile(conf_ini_file_path):
+            raise EnvironmentError('The x-conf.ini file specified in the CONF_INI_FILE_PATH environment variable '
+                                   'doesn\'t exist: {}'.format(conf_ini_file_path))
 
-    To access that value, execute:
+        self.conf_ini_file_path = conf_ini_file_path
+        self._config_parser = configparser.ConfigParser()
+        self._config_parser.read(conf_ini_file_path)
 
-    >>> get_param_value_from_conf_file('MALLET', 'SOURCE_CODE_PATH')
+    def get(self, section: str, param: str, fallback: str = None) -> str:
+        """
+        Returns the value of the specified param. The value of the WEB_BACKEND_<SECTION>_<PARAM> environment variable
+        has preference over the value in the x-conf.ini file.
+
+        :param section: Name of the section in the x-conf.ini file. For example: '[MALLET]'.
+        :param param: Name of the param inside that section. For example: 'SOURCE_CODE_PATH'.
+        :param fallback: Value returned if the param isn't specified. If is None and the param isn't specified, \
+        a KeyError is raised.
+        :return: A str with the value of the param.
+        """
+        env_var_name = '{0}{1}_{2}'.format(self.ENV_VARS_PREFIX, section, param).upper()
+        if env_var_name in environ:
+            return environ[env_var_name]
+
+        try:
+            return self._config_parser[section][param]
+        except KeyError:
+            if fallback is None:
+                raise
+            return fallback
+
+    def get_int(self, section: str, param: str, fallback: int = None) -> int:
+        """
+        Returns the value of the specified param as an int. See get().
+        """
+        return int(self.get(section, param, None if fallback is None else str(fallback)))
+
+    def get_float(self, section: str, param: str, fallback: float = None) -> float:
+        """
+        Returns the value of the specified param as a float. See get().
+        """
+        return float(self.get(section, param, None if fallback is None else str(fallback)))
 
+    def get_bool(self, section: str, param: str, fallback: bool = None) -> bool:
+        """
+        Returns the value of the specified param as a bool. Valid values are: 1/0, yes/no, true/false and on/off.
+        See get().
+        """
+        value = self.get(section, param, None if fallback is None else str(fallback)).lower()
+        if value not in self._config_parser.BOOLEAN_STATES:
+            raise ValueError('Param {0} of section [{1}] must be a bool. Given value: {2}'
+                             .format(param, section, value))
+        return self._config_parser.BOOLEAN_STATES[value]
+
+    @property
+    def mallet_source_code_path(self) -> str:
+        """ Path to the mallet executable file. """
+        return self.get('MALLET', 'SOURCE_CODE_PATH')
+
+    @property
+    def glove_embeddings_path(self) -> str:
+        """ Path to the folder with the Glove word embeddings. """
+        return self.get('EMBEDDINGS', 'GLOVE_PATH')
+
+    @property
+    def word2vec_embeddings_path(self) -> str:
+        """ Path to the file with the Word2Vec word embeddings. """
+        return self.get('EMBEDDINGS', 'WORD2VEC_PATH')
+
+    @property
+    def twenty_news_groups_dir_path(self) -> str:
+        """ Path to the folder with the 20 NewsGroups dataset original documents. """
+        return self.get('DATASETS', 'TWENTY_NEWS_GROUPS_DIR_PATH')
+
+    @property
+    def best_topics_model_name(self) -> str:
+        """ Name of the best topics model. """
+        return self.get('MODELS', 'BEST_TOPICS_MODEL_NAME')
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def _get_conf_ini_file_path() -> str:
+    """
+    Returns the path to the x-conf.ini file, obtained from the CONF_INI_FILE_PATH environment variable.
     """
-    # Obtain the path to the x-conf.ini file from the CONF_INI_FILE_PATH environment variable
     try:
-        conf_ini_file_path = environ['CONF_INI_FILE_PATH']
+        return environ['CONF_INI_FILE_PATH']
     except KeyError:
         raise EnvironmentError(
             "\nThe absolute path to the x-conf.ini file must be specified in the environment variable CONF_INI_FILE_PATH."
@@ -81,10 +252,71 @@ def get_param_value_from_conf_file(section: str, param: str) -> str:
             "\nTo specify the path in Windows, use the command: 'set CONF_INI_FILE_PATH=<path/to/x-conf.ini>'"
         )
 
-    config = configparser.ConfigParser()
-    config.read(conf_ini_file_path)
 
-    return config[section][param]
+def get_config() -> Config:
+    """
+    Returns the Config object shared by the whole process. The x-conf.ini file is only read the first time.
+    """
+    global _config
+
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = Config(_get_conf_ini_file_path())
+    return _config
+
+
+def reload_config() -> Config:
+    """
+    Reads again the x-conf.ini file specified in the CONF_INI_FILE_PATH environment variable, and replaces the
+    Config object shared by the whole process.
+    """
+    global _config
+
+    with _config_lock:
+        _config = Config(_get_conf_ini_file_path())
+    return _config
+
+
+def check_paths_exist(paths: Dict[str, str]):
+    """
+    Checks that all the given paths exist. If some of them don't exist, raises an EnvironmentError with all of them.
+
+    :param paths: Dict where keys are descriptions of the paths (for example, 'MALLET.SOURCE_CODE_PATH') \
+    and values are the paths.
+    """
+    not_found_paths = ['{0}: {1}'.format(description, _path) for description, _path in paths.items()
+                       if not path.exists(_path)]
+    if len(not_found_paths) > 0:
+        raise EnvironmentError('The following paths don\'t exist. Check the x-conf.ini file.\n' +
+                               '\n'.join(not_found_paths))
+
+
+def get_param_value_from_conf_file(section: str, param: str) -> str:
+    """
+    Returns the value of the specified param from the x-conf.ini file.
+
+    The value is obtained from the Config object shared by the whole process, so the file is only read once.
+    See the Config class for more info.
+
+    :param section: Name of the section in the x-conf.ini file. For example: '[MALLET]'.
+    :param param: Name of the param inside that section. For example: 'SOURCE_CODE_PATH'.
+    :return: A str with the value specified in the x-conf.ini file for that param.
+
+    Example:
+
+    ; development-conf.ini
+
+    [MALLET]
+
+    SOURCE_CODE_PATH = /path/to/mallet
+
+    To access that value, execute:
+
+    >>> get_param_value_from_conf_file('MALLET', 'SOURCE_CODE_PATH')
+
+    """
+    return get_config().get(section, param)
 
 
 class UserError(Exception):
@@ -0,0 +1,201 @@
+import os
+import tempfile
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from web_backend.utils import join_paths
+
+
+def _get_sentences_spans(text: str, sentences: List[str]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Returns the (start, end) positions (in characters) of each of the given sentences inside the given text,
+    or None if any sentence isn't a substring of the text, after the end of the previous sentence.
+    """
+    spans = []
+    position = 0
+    for sentence in sentences:
+        start = text.find(sentence, position)
+        if start < 0:
+            return None
+        position = start + len(sentence)
+        spans.append((start, position))
+    return spans
+
+
+class CorpusStore(Sequence[str]):
+    """
+    Compact on-disk store with the original content of all the documents of a dataset, used instead of keeping
+    the documents in memory as python strings.
+
+    The store is a sequence of strings (like a list), where the position of each document is the document id.
+    It's a folder with the following files:
+
+    * **docs.bin**: Content of all the documents, encoded in UTF-8, one after other.
+    * **docs-offsets.npy**: Array with num_docs + 1 offsets. The document with id i is stored in the bytes \
+      [offsets[i], offsets[i+1]) of the .bin file.
+    * **sentences-spans.npy** (optional): int32 array of shape (num_sentences, 2) with the (start, end) \
+      positions, in characters, of each sentence inside it's document.
+    * **docs-sentences-offsets.npy** (optional): Array with num_docs + 1 offsets. The sentences of the document \
+      with id i are the rows [offsets[i], offsets[i+1]) of the sentences-spans.npy file. The documents whose \
+      sentences couldn't be located inside them have 0 sentences.
+
+    All the files are memory-mapped read-only when the store is loaded, so the documents aren't loaded into memory,
+    and all the processes that load the same store share the same pages through the OS page cache.
+    A document is decoded directly from the memory-mapped bytes, without copying them before.
+    """
+
+    _DOCS_FILE_NAME = 'docs.bin'
+    _DOCS_OFFSETS_FILE_NAME = 'docs-offsets.npy'
+    _SENTENCES_SPANS_FILE_NAME = 'sentences-spans.npy'
+    _DOCS_SENTENCES_OFFSETS_FILE_NAME = 'docs-sentences-offsets.npy'
+
+    def __init__(self, dir_path: str):
+        """
+        Loads (memory-maps) the store stored in the given folder.
+
+        :param dir_path: Path to the folder of the store.
+        """
+        self.dir_path = dir_path
+
+        docs_file_path = join_paths(dir_path, self._DOCS_FILE_NAME)
+        if os.path.getsize(docs_file_path) > 0:
+            self._docs = np.memmap(docs_file_path, dtype=np.uint8, mode='r')
+        else:
+            # np.memmap can't map empty files
+            self._docs = np.empty(0, dtype=np.uint8)
+        self._docs_offsets = np.load(join_paths(dir_path, self._DOCS_OFFSETS_FILE_NAME), mmap_mode='r')
+        self.num_docs = len(self._docs_offsets) - 1
+
+        if os.path.exists(join_paths(dir_path, self._DOCS_SENTENCES_OFFSETS_FILE_NAME)):
+            self._sentences_spans = np.load(join_paths(dir_path, self._SENTENCES_SPANS_FILE_NAME), mmap_mode='r')
+            self._docs_sentences_offsets = np.load(join_paths(dir_path, self._DOCS_SENTENCES_OFFSETS_FILE_NAME),
+                                                   mmap_mode='r')
+        else:
+            self._sentences_spans = None
+            self._docs_sentences_offsets = None
+
+    @classmethod
+    def load(cls, dir_path: str) -> Optional['CorpusStore']:
+        """
+        Loads the store stored in the given folder. If the folder doesn't exist, returns None.
+        """
+        if not os.path.exists(join_paths(dir_path, cls._DOCS_OFFSETS_FILE_NAME)):
+            return None
+        return cls(dir_path)
+
+    @classmethod
+    def build(cls, dir_path: str, docs_contents: Iterable[str],
+              tokenize_func: Callable[[str], List[str]] = None) -> 'CorpusStore':
+        """
+        Stores the given documents in the given folder, and loads the store from it.
+
+        :param dir_path: Path to the folder where the store will be saved. It's created if it doesn't exist.
+        :param docs_contents: Original content of all the documents of the dataset, ordered by document id.
+        :param tokenize_func: Function that splits a text into sentences, like the nltk sent_tokenize() function. \
+        If is not None, the positions of the sentences of each document are also stored.
+        :return: The store loaded from the given folder.
+        """
+        os.makedirs(dir_path, exist_ok=True)
+
+        # All the files are written with temporary names and then renamed, so the files of a previous store in the
+        # same folder aren't truncated while they are memory-mapped (by this or other processes), which would make
+        # the accesses to them crash with a SIGBUS, and the processes that have them mapped keep the old files
+        tmp_files_paths = {}
+
+        def create_tmp_file(file_name: str):
+            tmp_file = tempfile.NamedTemporaryFile('wb', dir=dir_path, prefix='.' + file_name + '.', delete=False)
+            tmp_files_paths[file_name] = tmp_file.name
+            return tmp_file
+
+        docs_offsets = [0]
+        sentences_spans: List[Tuple[int, int]] = []
+        docs_sentences_offsets = [0]
+        try:
+            with create_tmp_file(cls._DOCS_FILE_NAME) as docs_file:
+                progress_bar = tqdm(docs_contents)
+                progress_bar.set_description('Storing the documents')
+                for doc_content in progress_bar:
+                    encoded_doc_content = doc_content.encode('utf-8')
+                    docs_file.write(encoded_doc_content)
+                    docs_offsets.append(docs_offsets[-1] + len(encoded_doc_content))
+
+                    if tokenize_func is not None:
+                        doc_sentences_spans = _get_sentences_spans(doc_content, tokenize_func(doc_content))
+                        sentences_spans.extend(doc_sentences_spans or [])
+                        docs_sentences_offsets.append(len(sentences_spans))
+
+            if tokenize_func is not None:
+                with create_tmp_file(cls._SENTENCES_SPANS_FILE_NAME) as sentences_spans_file:
+                    np.save(sentences_spans_file, np.array(sentences_spans, dtype=np.int32).reshape(-1, 2))
+                with create_tmp_file(cls._DOCS_SENTENCES_OFFSETS_FILE_NAME) as docs_sentences_offsets_file:
+                    np.save(docs_sentences_offsets_file, np.array(docs_sentences_offsets, dtype=np.int64))
+            with create_tmp_file(cls._DOCS_OFFSETS_FILE_NAME) as docs_offsets_file:
+                np.save(docs_offsets_file, np.array(docs_offsets, dtype=np.int64))
+        except BaseException:
+            for tmp_file_path in tmp_files_paths.values():
+                os.remove(tmp_file_path)
+            raise
+
+        if tokenize_func is None:
+            # The sentences of a previous store don't correspond to the new documents
+            for file_name in (cls._DOCS_SENTENCES_OFFSETS_FILE_NAME, cls._SENTENCES_SPANS_FILE_NAME):
+                if os.path.exists(join_paths(dir_path, file_name)):
+                    os.remove(join_paths(dir_path, file_name))
+
+        # The offsets file is renamed the last, because it's existence marks the store as complete
+        for file_name in (cls._DOCS_FILE_NAME, cls._SENTENCES_SPANS_FILE_NAME, cls._DOCS_SENTENCES_OFFSETS_FILE_NAME,
+                          cls._DOCS_OFFSETS_FILE_NAME):
+            if file_name in tmp_files_paths:
+                os.replace(tmp_files_paths[file_name], join_paths(dir_path, file_name))
+
+        return cls(dir_path)
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def __getitem__(self, doc_id):
+        """
+        Returns the content of the document with the given id, or a list with the contents of the documents
+        in the given slice.
+        """
+        if isinstance(doc_id, slice):
+            return [self[i] for i in range(*doc_id.indices(self.num_docs))]
+        if doc_id < 0:
+            doc_id += self.num_docs
+        if doc_id < 0 or doc_id >= self.num_docs:
+            raise IndexError('doc_id out of range')
+        return str(self.get_doc_bytes(doc_id), 'utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for doc_id in range(self.num_docs):
+            yield self[doc_id]
+
+    def get_doc_bytes(self, doc_id: int) -> memoryview:
+        """
+        Returns the content of the document with the given id, encoded in UTF-8, as a memoryview of the
+        memory-mapped file (without copying it).
+        """
+        return memoryview(self._docs[self._docs_offsets[doc_id]:self._docs_offsets[doc_id + 1]])
+
+    def has_sentences(self) -> bool:
+        """
+        Returns True if the positions of the sentences of the documents are stored.
+        """
+        return self._docs_sentences_offsets is not None
+
+    def get_doc_sentences(self, doc_id: int) -> Optional[List[str]]:
+        """
+        Returns the sentences of the document with the given id, or None if their positions aren't stored
+        (or the document has 0 sentences stored), so they must be obtained with the tokenizer.
+        """
+        if self._docs_sentences_offsets is None:
+            return None
+        start, end = self._docs_sentences_offsets[doc_id:doc_id + 2].tolist()
+        if start == end:
+            return None
+
+        doc_content = self[doc_id]
+        return [doc_content[sentence_start:sentence_end]
+                for sentence_start, sentence_end in self._sentences_spans[start:end].tolist()]
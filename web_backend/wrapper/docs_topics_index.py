@@ -0,0 +1,167 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+
+from web_backend.utils import ReplacingFilesWriter, join_paths
+
+
+class DocsTopicsIndex:
+    """
+    Index with the topics distribution of all the documents of a dataset, generated in batch.
+
+    The distributions are stored in a float32 array of shape (num_docs, num_topics), where the row i contains
+    the topics distribution of the document with id i (position of the document in the topics model corpus).
+    The array is stored in the docs-topics.npy file, and it's memory-mapped when the index is loaded.
+
+    When the index is loaded, the documents are grouped by their dominant topic, sorted by the probability of that
+    topic in descending order. This per-topic inverted index allows obtaining the documents more related with a text
+    without computing the score of all the documents of the dataset.
+
+    The index also stores, for each topic, the ids of the most representative documents of the topic, sorted by
+    the probability of the topic in descending order. They are computed with the precompute_most_repr_docs() method.
+
+    The fingerprint of the topics model used to build the index is stored in the model-fingerprint.txt file,
+    so an index built with other topics model (for example, before training the model again) isn't loaded.
+    """
+
+    _DOCS_TOPICS_FILE_NAME = 'docs-topics.npy'
+    _MODEL_FINGERPRINT_FILE_NAME = 'model-fingerprint.txt'
+
+    def __init__(self, docs_topics: np.ndarray):
+        """
+        :param docs_topics: Array of shape (num_docs, num_topics) with the topics distribution of each document.
+        """
+        self.docs_topics = docs_topics
+        self.num_docs, self.num_topics = docs_topics.shape
+
+        # Dominant topic of each document, and the probability of that topic in the document
+        self.dominant_topics = np.argmax(docs_topics, axis=1)
+        self.dominant_topics_probs = docs_topics[np.arange(self.num_docs), self.dominant_topics]
+
+        # For each topic, ids of the documents with that dominant topic, sorted by the topic probability (descending)
+        docs_ids_sorted_by_prob = np.argsort(-self.dominant_topics_probs, kind='stable')
+        self._docs_ids_by_dominant_topic = [
+            docs_ids_sorted_by_prob[self.dominant_topics[docs_ids_sorted_by_prob] == topic]
+            for topic in range(self.num_topics)
+        ]
+
+        # For each topic, ids of the most representative documents, sorted by the topic probability (descending)
+        self._most_repr_docs_ids_by_topic = [np.empty(0, dtype=np.int64)] * self.num_topics
+
+    @classmethod
+    def exists(cls, dir_path: str) -> bool:
+        """
+        Returns True if an index is stored in the given folder, built with any topics model.
+        """
+        return os.path.exists(join_paths(dir_path, cls._DOCS_TOPICS_FILE_NAME))
+
+    @classmethod
+    def load(cls, dir_path: str, model_fingerprint: str = None) -> Optional['DocsTopicsIndex']:
+        """
+        Loads (memory-maps) the index stored in the given folder. If the index doesn't exist, or it was built
+        with a topics model with other fingerprint, returns None.
+
+        :param dir_path: Path to the folder where the index is stored.
+        :param model_fingerprint: Fingerprint of the current topics model. If is None, it isn't checked.
+        """
+        if not cls.exists(dir_path):
+            return None
+
+        if model_fingerprint is not None:
+            try:
+                with open(join_paths(dir_path, cls._MODEL_FINGERPRINT_FILE_NAME), 'r') as fingerprint_file:
+                    if fingerprint_file.read().strip() != model_fingerprint:
+                        return None
+            except FileNotFoundError:
+                return None
+
+        return cls(np.load(join_paths(dir_path, cls._DOCS_TOPICS_FILE_NAME), mmap_mode='r'))
+
+    @classmethod
+    def build(cls, dir_path: str, docs_topics: np.ndarray, model_fingerprint: str = '') -> 'DocsTopicsIndex':
+        """
+        Stores the given topics distributions in the given folder, and loads the index from it.
+
+        :param dir_path: Path to the folder where the index will be saved. It's created if it doesn't exist.
+        :param docs_topics: Array of shape (num_docs, num_topics) with the topics distribution of each document.
+        :param model_fingerprint: Fingerprint of the topics model that generated the topics distributions.
+        """
+        # The files are written with temporary names and then renamed, so the file of a previous index in the
+        # same folder isn't overwritten while it's memory-mapped (by this or other processes). The fingerprint is
+        # replaced the last, so while the files are replaced, the new distributions are rejected by load()
+        with ReplacingFilesWriter(dir_path) as files_writer:
+            with files_writer.open(cls._DOCS_TOPICS_FILE_NAME) as docs_topics_file:
+                np.save(docs_topics_file, np.asarray(docs_topics, dtype=np.float32))
+            with files_writer.open(cls._MODEL_FINGERPRINT_FILE_NAME, 'w') as fingerprint_file:
+                fingerprint_file.write(model_fingerprint)
+        return cls.load(dir_path)
+
+    def get_related_docs(self, text_topics: np.ndarray, num_docs: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the num_docs documents more related with a text, given the topics distribution of the text.
+
+        The score of each document is the probability of it's dominant topic in the text multiplied by the
+        probability of that topic in the document.
+
+        :param text_topics: Array of shape (num_topics,) with the topics distribution of the text.
+        :param num_docs: Number of documents to be returned.
+        :return: A tuple (docs_ids, docs_probs, docs_dominant_topics) of arrays, sorted by docs_probs \
+        in descending order.
+        """
+        # Inside a topic, documents are sorted by score, so only the first num_docs documents of each topic
+        # can be among the num_docs documents more related with the text
+        candidates_ids = np.concatenate([docs_ids[:num_docs] for docs_ids in self._docs_ids_by_dominant_topic])
+        candidates_probs = text_topics[self.dominant_topics[candidates_ids]] * \
+            self.dominant_topics_probs[candidates_ids]
+
+        num_docs = min(num_docs, len(candidates_ids))
+        if num_docs == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        # Select the num_docs candidates with the highest score, and sort only them
+        best_candidates = np.argpartition(-candidates_probs, num_docs - 1)[:num_docs]
+        best_candidates = best_candidates[np.argsort(-candidates_probs[best_candidates], kind='stable')]
+
+        docs_ids = candidates_ids[best_candidates]
+        return docs_ids, candidates_probs[best_candidates], self.dominant_topics[docs_ids]
+
+    def _rank_docs_of_topic(self, topic: int, num_docs: int) -> np.ndarray:
+        """
+        Returns the ids of the num_docs documents with the highest probability of the given topic, sorted by
+        that probability in descending order.
+        """
+        num_docs = min(num_docs, self.num_docs)
+        if num_docs == 0:
+            return np.empty(0, dtype=np.int64)
+
+        topic_probs = np.asarray(self.docs_topics[:, topic])
+        docs_ids = np.argpartition(-topic_probs, num_docs - 1)[:num_docs]
+        return docs_ids[np.argsort(-topic_probs[docs_ids], kind='stable')]
+
+    def precompute_most_repr_docs(self, num_docs: int):
+        """
+        Computes and stores, for each topic, the ids of the num_docs most representative documents of the topic.
+        After this, get_most_repr_docs_of_topic() with num_docs or less documents only slices the stored ids.
+        """
+        self._most_repr_docs_ids_by_topic = [self._rank_docs_of_topic(topic, num_docs)
+                                             for topic in range(self.num_topics)]
+
+    def get_most_repr_docs_of_topic(self, topic: int, num_docs: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the num_docs most representative documents of the given topic.
+
+        If more documents than the precomputed ones are requested, the ranking of the topic is computed again
+        and stored.
+
+        :param topic: Topic id in the range [0,num_topics-1].
+        :param num_docs: Number of documents to be returned.
+        :return: A tuple (docs_ids, docs_topic_probs) of arrays, sorted by docs_topic_probs in descending order.
+        """
+        docs_ids = self._most_repr_docs_ids_by_topic[topic]
+        if len(docs_ids) < min(num_docs, self.num_docs):
+            docs_ids = self._rank_docs_of_topic(topic, num_docs)
+            self._most_repr_docs_ids_by_topic[topic] = docs_ids
+
+        docs_ids = docs_ids[:num_docs]
+        return docs_ids, self.docs_topics[docs_ids, topic]
@@ -0,0 +1,180 @@
+import gzip
+import os
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from web_backend.utils import ReplacingFilesWriter, join_paths
+
+
+def iter_glove_embeddings(file_path: str) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    Reads the word embeddings of a Glove text file (one word followed by it's vector components in each line)
+    and returns an iterator of tuples (word, vector).
+    """
+    with open(file_path, encoding='utf-8') as glove_file:
+        for line in glove_file:
+            values = line.rstrip().split(' ')
+            yield values[0], np.asarray(values[1:], dtype=np.float32)
+
+
+def _read_word2vec_word(word2vec_file: BinaryIO) -> bytes:
+    """
+    Reads the bytes of a word of a word2vec binary file, until the space that separates it from it's vector.
+    """
+    word = bytearray()
+    while True:
+        char = word2vec_file.read(1)
+        if char == b' ' or char == b'':
+            return bytes(word)
+        # The vector of the previous word can be followed by a line break
+        if char != b'\n':
+            word += char
+
+
+def iter_word2vec_embeddings(file_path: str) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    Reads the word embeddings of a word2vec binary file (optionally compressed with gzip, like the
+    GoogleNews-vectors-negative300.bin.gz file) and returns an iterator of tuples (word, vector).
+    """
+    open_func = gzip.open if file_path.endswith('.gz') else open
+    with open_func(file_path, 'rb') as word2vec_file:
+        num_words, vectors_size = map(int, word2vec_file.readline().split())
+        vector_num_bytes = np.dtype(np.float32).itemsize * vectors_size
+        for _ in range(num_words):
+            word = _read_word2vec_word(word2vec_file).decode('utf-8', errors='ignore')
+            yield word, np.frombuffer(word2vec_file.read(vector_num_bytes), dtype='<f4')
+
+
+class EmbeddingsStore:
+    """
+    Compact on-disk store with word embeddings, used instead of loading the original embeddings files into memory.
+
+    The store is a folder with the following files:
+
+    * **vocabulary.npy**: Array with the words, encoded in UTF-8 and sorted, so a word is found with a binary search.
+    * **vectors.npy**: Array of shape (num_words, vectors_size), float16 or float32, where the row i contains \
+      the vector of the word i of the vocabulary.
+
+    Both files are memory-mapped read-only when the store is loaded, so the embeddings aren't loaded into memory,
+    and all the processes that load the same store share the same pages through the OS page cache.
+    """
+
+    _VOCABULARY_FILE_NAME = 'vocabulary.npy'
+    _VECTORS_FILE_NAME = 'vectors.npy'
+    _COPY_CHUNK_NUM_WORDS = 100000
+
+    MAX_WORD_NUM_BYTES = 64
+    """ Words longer than this number of bytes (in UTF-8) aren't stored. """
+
+    def __init__(self, dir_path: str):
+        """
+        Loads (memory-maps) the store stored in the given folder.
+
+        :param dir_path: Path to the folder of the store.
+        """
+        self.dir_path = dir_path
+
+        self.vocabulary = np.load(join_paths(dir_path, self._VOCABULARY_FILE_NAME), mmap_mode='r')
+        self.vectors = np.load(join_paths(dir_path, self._VECTORS_FILE_NAME), mmap_mode='r')
+        self.num_words, self.vectors_size = self.vectors.shape
+
+    @classmethod
+    def load(cls, dir_path: str) -> Optional['EmbeddingsStore']:
+        """
+        Loads the store stored in the given folder. If the folder doesn't exist, returns None.
+        """
+        if not os.path.exists(join_paths(dir_path, cls._VOCABULARY_FILE_NAME)):
+            return None
+        return cls(dir_path)
+
+    @classmethod
+    def build(cls, dir_path: str, words_vectors: Iterable[Tuple[str, np.ndarray]], dtype=np.float16,
+              vocabulary: Set[str] = None) -> 'EmbeddingsStore':
+        """
+        Stores the given word embeddings in the given folder, and loads the store from it.
+
+        The vectors are written to a temporary file while they are read, so the embeddings are never fully
+        loaded into memory.
+
+        :param dir_path: Path to the folder where the store will be saved. It's created if it doesn't exist.
+        :param words_vectors: Iterable of tuples (word, vector), like the ones returned by the \
+        iter_glove_embeddings() and iter_word2vec_embeddings() functions.
+        :param dtype: Type of the stored vectors. float16 halves the size of the store.
+        :param vocabulary: If is not None, only the words inside it are stored.
+        :return: The store loaded from the given folder.
+        """
+        os.makedirs(dir_path, exist_ok=True)
+        tmp_vectors_file_path = join_paths(dir_path, '.vectors.tmp')
+
+        words: List[bytes] = []
+        vectors_size = 0
+        with open(tmp_vectors_file_path, 'wb') as tmp_vectors_file:
+            progress_bar = tqdm(words_vectors)
+            progress_bar.set_description('Storing the word embeddings')
+            for word, vector in progress_bar:
+                if vocabulary is not None and word not in vocabulary:
+                    continue
+                encoded_word = word.encode('utf-8')
+                if len(encoded_word) == 0 or len(encoded_word) > cls.MAX_WORD_NUM_BYTES:
+                    continue
+
+                words.append(encoded_word)
+                vectors_size = len(vector)
+                tmp_vectors_file.write(np.asarray(vector, dtype=dtype).tobytes())
+
+        # Sort the words, and the vectors in the same order. Duplicated words keep their first vector.
+        words_array = np.array(words, dtype='S{}'.format(max([len(word) for word in words], default=1)))
+        words_array, first_positions = np.unique(words_array, return_index=True)
+
+        if len(words) > 0:
+            tmp_vectors = np.memmap(tmp_vectors_file_path, dtype=dtype, mode='r', shape=(len(words), vectors_size))
+        else:
+            # np.memmap can't map empty files
+            tmp_vectors = np.empty((0, vectors_size), dtype=dtype)
+        # The files are written with temporary names and then renamed, so the files of a previous store in the
+        # same folder aren't overwritten while they are memory-mapped (by this or other processes)
+        with ReplacingFilesWriter(dir_path) as files_writer:
+            vectors = np.lib.format.open_memmap(files_writer.get_tmp_file_path(cls._VECTORS_FILE_NAME), mode='w+',
+                                                dtype=dtype, shape=(len(words_array), vectors_size))
+            # The vectors are copied in chunks, to avoid loading all of them into memory
+            for start in range(0, len(words_array), cls._COPY_CHUNK_NUM_WORDS):
+                chunk_positions = first_positions[start:start + cls._COPY_CHUNK_NUM_WORDS]
+                vectors[start:start + len(chunk_positions)] = tmp_vectors[chunk_positions]
+            vectors.flush()
+            del vectors, tmp_vectors
+            os.remove(tmp_vectors_file_path)
+
+            # The vocabulary file is replaced the last, because it's existence marks the store as complete
+            with files_writer.open(cls._VOCABULARY_FILE_NAME) as vocabulary_file:
+                np.save(vocabulary_file, words_array)
+
+        return cls(dir_path)
+
+    def get_words_vectors(self, words: List[str]) -> np.ndarray:
+        """
+        Returns a float32 array of shape (len(words), vectors_size) with the vectors of the given words.
+        The words that aren't in the store have a vector of zeros.
+        """
+        words_vectors = np.zeros((len(words), self.vectors_size), dtype=np.float32)
+        if len(words) == 0 or self.num_words == 0:
+            return words_vectors
+
+        encoded_words = [word.encode('utf-8') for word in words]
+        # Words longer than the longest word of the vocabulary can't be in it (and would be truncated)
+        valid_length = np.array([len(word) <= self.vocabulary.itemsize for word in encoded_words])
+        encoded_words = np.array(encoded_words, dtype=self.vocabulary.dtype)
+
+        positions = np.minimum(np.searchsorted(self.vocabulary, encoded_words), self.num_words - 1)
+        found = valid_length & (self.vocabulary[positions] == encoded_words)
+
+        words_vectors[found] = self.vectors[positions[found]]
+        return words_vectors
+
+    def get_word_vector(self, word: str) -> np.ndarray:
+        """
+        Returns the vector of the given word, or a vector of zeros if the word isn't in the store.
+        """
+        return self.get_words_vectors([word])[0]
+
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from web_backend.utils import join_paths
+
+
+def get_file_digest(file_path: str) -> str:
+    """
+    Returns a 16 characters hexadecimal digest of the content of the given file.
+    """
+    file_hash = hashlib.blake2b(digest_size=8)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 16), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class ImagesManifest:
+    """
+    Manifest with the digest of the content of each image of a folder, stored in the manifest.json file
+    of the folder. The images of a folder must not change after it's manifest has been built.
+
+    The version of the manifest is a digest of the digests of all the images, so it changes when any image changes.
+    It's included in the URLs of the images, so they can be cached forever by the clients (immutable URLs),
+    and the digest of each image is used as it's ETag.
+    """
+
+    FILE_NAME = 'manifest.json'
+
+    def __init__(self, dir_path: str, files_digests: Dict[str, str]):
+        """
+        :param dir_path: Path to the folder of the images.
+        :param files_digests: Dict with the digest of each image, by file name.
+        """
+        self.dir_path = dir_path
+        self.files_digests = files_digests
+        self.version = hashlib.blake2b(json.dumps(files_digests, sort_keys=True).encode('utf-8'),
+                                       digest_size=8).hexdigest()
+
+    @classmethod
+    def build(cls, dir_path: str) -> 'ImagesManifest':
+        """
+        Obtains the digests of all the images of the given folder and stores them in it's manifest.json file.
+        The file is written atomically, so the manifest can be built on a folder that is being served.
+        """
+        files_digests = {file_name: get_file_digest(join_paths(dir_path, file_name))
+                         for file_name in sorted(os.listdir(dir_path))
+                         if file_name != cls.FILE_NAME and not file_name.startswith('.')}
+
+        tmp_file_path = join_paths(dir_path, '.{}.{}.tmp'.format(cls.FILE_NAME, os.getpid()))
+        with open(tmp_file_path, 'w') as tmp_file:
+            json.dump(files_digests, tmp_file, sort_keys=True)
+        os.replace(tmp_file_path, join_paths(dir_path, cls.FILE_NAME))
+
+        return cls(dir_path, files_digests)
+
+    @classmethod
+    def load(cls, dir_path: str) -> Optional['ImagesManifest']:
+        """
+        Loads the manifest of the given folder. If the folder doesn't exist, returns None.
+        If the folder exists but it doesn't have manifest (the images were generated before the manifests
+        existed), the manifest is built.
+        """
+        if not os.path.isdir(dir_path):
+            return None
+        try:
+            with open(join_paths(dir_path, cls.FILE_NAME)) as manifest_file:
+                return cls(dir_path, json.load(manifest_file))
+        except FileNotFoundError:
+            return cls.build(dir_path)
+
+    def get_file_digest(self, file_name: str) -> Optional[str]:
+        """
+        Returns the digest of the given image, or None if the image isn't in the manifest.
+        """
+        return self.files_digests.get(file_name)
+
+
+# Manifests already loaded, by folder path, with the version of their manifest.json file
+_loaded_manifests: Dict[str, Tuple[Tuple[int, int, int], ImagesManifest]] = {}
+_loaded_manifests_lock = threading.Lock()
+
+
+def _get_manifest_file_version(dir_path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Returns a tuple that changes each time the manifest.json file of the given folder is written (it's modification
+    time, inode and size), or None if it doesn't exist.
+    """
+    try:
+        file_stat = os.stat(join_paths(dir_path, ImagesManifest.FILE_NAME))
+    except FileNotFoundError:
+        return None
+    return file_stat.st_mtime_ns, file_stat.st_ino, file_stat.st_size
+
+
+def get_images_manifest(dir_path: str) -> Optional[ImagesManifest]:
+    """
+    Returns the manifest of the given folder, loading it the first time. If the folder doesn't exist, returns None.
+
+    The manifest is loaded again if it's manifest.json file changes, for example, if the images of the folder
+    have been removed and rendered again (by this process or other one).
+    """
+    file_version = _get_manifest_file_version(dir_path)
+    with _loaded_manifests_lock:
+        loaded_manifest = _loaded_manifests.get(dir_path)
+    if file_version is not None and loaded_manifest is not None and loaded_manifest[0] == file_version:
+        return loaded_manifest[1]
+
+    manifest = ImagesManifest.load(dir_path)
+    with _loaded_manifests_lock:
+        if manifest is None:
+            _loaded_manifests.pop(dir_path, None)
+        else:
+            # The manifest.json file may have been created by load()
+            _loaded_manifests[dir_path] = (_get_manifest_file_version(dir_path), manifest)
+    return manifest
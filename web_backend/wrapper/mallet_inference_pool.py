@@ -0,0 +1,352 @@
+import copy
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from web_backend.utils import join_paths
+
+Bow = List[Tuple[int, int]]
+TopicProbList = List[Tuple[int, float]]
+
+
+class MalletInferencePoolFullError(Exception):
+    """
+    Exception raised when a text can't be sent to the MalletInferencePool because it's queue is full.
+    """
+
+
+class MalletInferenceTimeoutError(TimeoutError):
+    """
+    Exception raised when mallet doesn't infer the topics of a text sent to the MalletInferencePool in time
+    (because the workers are busy with other texts, or a mallet Java process hangs).
+
+    The exception contains a message attribute and a retry_after attribute, with the number of seconds
+    after which the text can be sent again.
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        """
+        :param message: Message of the Error.
+        :param retry_after: Number of seconds after which the text can be sent again.
+        """
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+class _InferenceTask:
+    """
+    Documents waiting in the queue of the MalletInferencePool, sent in the same call to infer() or infer_batch(),
+    and the result of their inference.
+    """
+
+    def __init__(self, bows: List[Bow]):
+        self.bows = bows
+        self.results: List[TopicProbList] = None
+        self.error: Exception = None
+        self.done = threading.Event()
+
+
+class ThreadSafeLdaMalletInference:
+    """
+    Callable that infers the topics of documents in bag of words format with a gensim LdaMallet model, like it's
+    __getitem__ method, but can be called by several threads and processes at the same time.
+
+    LdaMallet.__getitem__ writes the documents and reads the inferred topics in files with fixed names
+    (prefix + 'corpus.txt', prefix + 'doctopics.txt.infer', ...), so concurrent calls overwrite each other's files,
+    and a document can receive the topics of other document. Here, each thread of each process uses a copy of the
+    model whose prefix is a temporary folder of it's own, with links to the files of the trained model that
+    mallet needs to infer the topics (the corpus.mallet file, whose pipe is used to import the documents,
+    and the inferencer.mallet file).
+    """
+
+    _MODEL_FILES_NAMES = ['corpus.mallet', 'inferencer.mallet']
+
+    def __init__(self, lda_mallet):
+        """
+        :param lda_mallet: gensim LdaMallet model.
+        """
+        self._lda_mallet = lda_mallet
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # List of tuples (pid of the process that created the folder, path to the folder)
+        self._temp_dirs_paths: List[Tuple[int, str]] = []
+
+    def _get_thread_model(self):
+        """
+        Returns the copy of the LdaMallet model of the current thread, creating it the first time.
+        """
+        # The copies created before forking the process (threading.local values are inherited by the
+        # thread that forks) aren't used, because their folder is also used by the parent process
+        if getattr(self._local, 'pid', None) != os.getpid():
+            temp_dir_path = tempfile.mkdtemp(prefix='mallet-inference-')
+            model_files_paths = [self._lda_mallet.fcorpusmallet(), self._lda_mallet.finferencer()]
+            for file_name, file_path in zip(self._MODEL_FILES_NAMES, model_files_paths):
+                try:
+                    os.symlink(os.path.abspath(file_path), join_paths(temp_dir_path, file_name))
+                except OSError:
+                    # Symbolic links aren't always allowed in Windows
+                    shutil.copyfile(file_path, join_paths(temp_dir_path, file_name))
+
+            thread_model = copy.copy(self._lda_mallet)
+            thread_model.prefix = temp_dir_path + os.sep
+            self._local.model = thread_model
+            self._local.pid = os.getpid()
+            with self._lock:
+                self._temp_dirs_paths.append((os.getpid(), temp_dir_path))
+
+        return self._local.model
+
+    def __call__(self, bows: List[Bow]) -> List[TopicProbList]:
+        """
+        Infers the topics of the given documents with only one mallet Java process.
+
+        :param bows: Documents in bag of words format.
+        :return: A list of tuples (topic, probability) for each document.
+        :raises MalletInferencePoolFullError: If the queue is full.
+        :raises MalletInferenceTimeoutError: If the results aren't available in timeout seconds.
+        """
+        return list(self._get_thread_model()[bows])
+
+    def remove_temp_files(self):
+        """
+        Removes the temporary folders created by the current process. It must be called when the model
+        isn't going to be used anymore.
+        """
+        with self._lock:
+            # The folders created by the parent process (before forking this one) are removed by the parent
+            temp_dirs_paths = [path for pid, path in self._temp_dirs_paths if pid == os.getpid()]
+            self._temp_dirs_paths = [(pid, path) for pid, path in self._temp_dirs_paths if pid != os.getpid()]
+        for temp_dir_path in temp_dirs_paths:
+            shutil.rmtree(temp_dir_path, ignore_errors=True)
+
+
+class MalletInferencePool:
+    """
+    Pool of long-lived workers that infer the topics of documents with mallet.
+
+    Mallet can only infer topics launching a Java process (a JVM) that loads the inferencer file from disk.
+    To amortize that cost, each worker takes from the queue all the documents that are waiting (up to
+    max_batch_size) and infers the topics of all of them with only one mallet Java process.
+    With num_workers workers, at most num_workers Java processes are running at the same time (plus the ones
+    of the hung workers that have been replaced).
+
+    The queue is bounded: if it's full, infer() raises a MalletInferencePoolFullError instead of waiting.
+    If the result of a document isn't available in timeout seconds, infer() raises a MalletInferenceTimeoutError.
+
+    A worker whose batch takes more than timeout seconds (for example, because the Java process hangs) is replaced
+    by a new worker in the next call to infer(), so the pool keeps num_workers workers available. The hung worker
+    exits when it's batch finishes. It's Java process is launched by the infer function, so it can't be killed here:
+    to avoid launching Java processes without limit, at most max_num_replaced_workers replaced workers can be
+    running at the same time. While there are more, the hung workers aren't replaced, and the texts wait in the
+    queue (or are rejected when it's full).
+    The infer function must support being called by several threads at the same time
+    (see ThreadSafeLdaMalletInference).
+    """
+
+    def __init__(self, infer_func: Callable[[List[Bow]], List[TopicProbList]], num_workers: int = 2,
+                 max_queue_size: int = 64, max_batch_size: int = 32, timeout: float = 120,
+                 max_num_replaced_workers: int = None):
+        """
+        Creates the pool and starts the workers.
+
+        :param infer_func: Function that, given a list of documents in bag of words format, infers the topics \
+        of all of them with only one mallet Java process, and returns a list with a list of tuples (topic, prob) \
+        for each document. For example: the __getitem__ method of a gensim LdaMallet model.
+        :param num_workers: Number of workers (max number of mallet Java processes running at the same time).
+        :param max_queue_size: Max number of documents waiting in the queue.
+        :param max_batch_size: Max number of documents sent to the same mallet Java process.
+        :param timeout: Max number of seconds that infer() waits for the result of a document.
+        :param max_num_replaced_workers: Max number of hung workers that have been replaced and are still running. \
+        If is None, it's num_workers.
+        """
+        self._infer_func = infer_func
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.max_num_replaced_workers = num_workers if max_num_replaced_workers is None else max_num_replaced_workers
+
+        self._queue = queue.Queue(max_queue_size)
+        self._workers_lock = threading.Lock()
+        # Dict worker -> time (time.monotonic()) when the batch in progress of the worker started, or None
+        self._workers: Dict[threading.Thread, float] = {}
+        # Hung workers that have been replaced, and are still running
+        self._replaced_workers: Set[threading.Thread] = set()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'num_documents': 0, 'num_batches': 0, 'num_errors': 0, 'num_rejected': 0,
+                       'num_worker_restarts': 0}
+
+        self._start_workers()
+
+    def _is_hung(self, batch_start_time: float) -> bool:
+        return batch_start_time is not None and time.monotonic() - batch_start_time > self.timeout
+
+    def _start_workers(self):
+        """
+        Replaces the hung workers (up to max_num_replaced_workers replaced workers running), and starts the workers
+        that aren't running (the workers of the process that has forked the current one, or the ones that have
+        exited). Workers are daemon threads, so they don't block the process exit.
+        """
+        with self._workers_lock:
+            if self._closed:
+                return
+            self._replaced_workers = {worker for worker in self._replaced_workers if worker.is_alive()}
+            hung_workers = [worker for worker, batch_start_time in self._workers.items()
+                            if worker.is_alive() and self._is_hung(batch_start_time)]
+            hung_workers = hung_workers[:max(0, self.max_num_replaced_workers - len(self._replaced_workers))]
+            self._replaced_workers.update(hung_workers)
+            if len(hung_workers) > 0:
+                self._increment_stat('num_worker_restarts', len(hung_workers))
+
+            self._workers = {worker: batch_start_time for worker, batch_start_time in self._workers.items()
+                             if worker.is_alive() and worker not in hung_workers}
+            while len(self._workers) < self.num_workers:
+                worker = threading.Thread(target=self._worker_loop, name='MalletInferenceWorker', daemon=True)
+                self._workers[worker] = None
+                worker.start()
+
+    def _set_batch_start_time(self, batch_start_time: float = None) -> bool:
+        """
+        Stores when the batch in progress of the current worker started (None if it hasn't a batch in progress).
+
+        :return: False if the current worker has been replaced, so it must exit.
+        """
+        worker = threading.current_thread()
+        with self._workers_lock:
+            if worker not in self._workers:
+                return False
+            self._workers[worker] = batch_start_time
+            return True
+
+    def _increment_stat(self, stat_name: str, value: int = 1):
+        with self._stats_lock:
+            self._stats[stat_name] += value
+
+    def _worker_loop(self):
+        """
+        Loop executed by each worker: takes the documents waiting in the queue and infers their topics.
+        """
+        while True:
+            # Wait for a task, and then take the rest of the tasks waiting in the queue, until max_batch_size
+            # documents are taken. The documents of a task are never split, so a task can exceed max_batch_size.
+            # A None task is sent by close() to wake up each worker, so it exits
+            task = self._queue.get()
+            if task is None:
+                return
+            batch = [task]
+            batch_num_docs = len(task.bows)
+            while batch_num_docs < self.max_batch_size:
+                try:
+                    task = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if task is None:
+                    # The worker exits after this batch, because close() has removed it from the workers
+                    break
+                batch.append(task)
+                batch_num_docs += len(task.bows)
+
+            self._set_batch_start_time(time.monotonic())
+            try:
+                results = list(self._infer_func([bow for task in batch for bow in task.bows]))
+                for task in batch:
+                    task.results = results[:len(task.bows)]
+                    results = results[len(task.bows):]
+                self._increment_stat('num_batches')
+                self._increment_stat('num_documents', batch_num_docs)
+            except Exception as err:
+                # If mallet fails, only the documents of this batch receive the error
+                for task in batch:
+                    task.error = err
+                self._increment_stat('num_errors')
+            finally:
+                for task in batch:
+                    task.done.set()
+
+            if not self._set_batch_start_time(None):
+                # The worker took too much time and has been replaced
+                return
+
+    def infer(self, bow: Bow) -> TopicProbList:
+        """
+        Infers the topics of the given document with mallet. Blocks until the result is available.
+
+        :param bow: Document in bag of words format: a list of tuples (word_id, word_count).
+        :return: List of tuples (topic, probability).
+        """
+        return self.infer_batch([bow])[0]
+
+    def infer_batch(self, bows: List[Bow]) -> List[TopicProbList]:
+        """
+        Infers the topics of the given documents with mallet. All the documents are sent to the same mallet
+        Java process, and occupy only one position of the queue. Blocks until the results are available.
+
+        :param bows: Documents in bag of words format.
+        :return: A list of tuples (topic, probability) for each document.
+        :raises MalletInferencePoolFullError: If the queue is full.
+        :raises MalletInferenceTimeoutError: If the results aren't available in timeout seconds.
+        """
+        if len(bows) == 0:
+            return []
+
+        # Health check: replace the workers that are hung
+        self._start_workers()
+
+        task = _InferenceTask(bows)
+        try:
+            self._queue.put_nowait(task)
+        except queue.Full:
+            self._increment_stat('num_rejected')
+            raise MalletInferencePoolFullError('Too many texts waiting to be processed by mallet. Try again later.')
+
+        if not task.done.wait(self.timeout):
+            raise MalletInferenceTimeoutError('Mallet didn\'t infer the topics of the text in {} seconds. '
+                                              'Try again later.'.format(self.timeout),
+                                              retry_after=max(1, int(self.timeout)))
+        if task.error is not None:
+            raise task.error
+
+        return task.results
+
+    def close(self):
+        """
+        Stops the workers. The idle workers exit immediately, and the ones with a batch in progress when it finishes.
+        The workers aren't started again, so the pool can't be used after this.
+        """
+        with self._workers_lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers = {}
+        for _ in workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                # The workers take the tasks of the full queue, and exit after their batch
+                break
+
+    def is_healthy(self) -> bool:
+        """
+        Returns True if all the workers are running and none of them is hung.
+        """
+        with self._workers_lock:
+            return len(self._workers) == self.num_workers and \
+                all(worker.is_alive() and not self._is_hung(batch_start_time)
+                    for worker, batch_start_time in self._workers.items())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with statistics about the pool.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_size'] = self._queue.qsize()
+        with self._workers_lock:
+            stats['num_replaced_workers_running'] = sum(worker.is_alive() for worker in self._replaced_workers)
+        stats['healthy'] = self.is_healthy()
+        return stats
@@ -0,0 +1,306 @@
+import functools
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List
+
+from web_backend.utils import UserResourceWithParamValueNotFoundError, get_config, join_paths
+from web_backend.wrapper.models_wrapper_loader import ModelsWrapperLoader
+
+if TYPE_CHECKING:
+    # Only imported for the type hints, because it imports the (heavy) models libraries
+    from web_backend.wrapper.models_wrapper import ModelsWrapper
+
+
+class ModelsRegistry:
+    """
+    Registry of the topics models stored in a folder (each model is a subfolder), that loads a ModelsWrapper
+    for each model the first time it's requested, in a background thread (see ModelsWrapperLoader).
+
+    The default model is used when no model is specified. The loaded models are kept in a LRU: when more than
+    max_loaded_models are loaded, or their size exceeds memory_budget_bytes, the least recently used ones are evicted.
+    The default model, the preloaded models and the models that are being loaded are never evicted.
+
+    The memory used by a model is estimated with the size of it's folder. The requests use the models with use(),
+    so the requests in progress that use an evicted model finish normally, and the model is closed
+    (see ModelsWrapper.close()) when they end, so it's memory can be freed. The models whose load has failed
+    are loaded again when they are requested after retry_after seconds.
+
+    A model can be replaced with reload(), that loads it again in the background while the current one keeps
+    answering the requests, and the default model can be changed with set_default_model(), that doesn't change it
+    until the new default model is loaded.
+    """
+
+    def __init__(self, models_wrapper_factory: Callable[..., 'ModelsWrapper'], default_model_name: str,
+                 models_dir_path: str, max_loaded_models: int = 2, memory_budget_bytes: int = 0,
+                 preloaded_models_names: List[str] = None, retry_after: int = 10):
+        """
+        :param models_wrapper_factory: Function (or ModelsWrapper subclass) that creates the ModelsWrapper. \
+        It must accept the name of the topics model as first argument, and a progress_callback keyword argument.
+        :param default_model_name: Name of the model used when no model is specified.
+        :param models_dir_path: Path to the folder where the topics models are stored.
+        :param max_loaded_models: Max number of models loaded at the same time.
+        :param memory_budget_bytes: Max size (in bytes) of the folders of the models loaded at the same time. \
+        If is 0, the size isn't limited.
+        :param preloaded_models_names: Names of the models loaded by start(), apart from the default model.
+        :param retry_after: Number of seconds that clients should wait before retrying a request \
+        while a model is loading. A model whose load has failed is loaded again when it's requested after \
+        this number of seconds.
+        """
+        self._models_wrapper_factory = models_wrapper_factory
+        self.default_model_name = default_model_name
+        self.models_dir_path = models_dir_path
+        self.max_loaded_models = max_loaded_models
+        self.memory_budget_bytes = memory_budget_bytes
+        self.preloaded_models_names = preloaded_models_names or []
+        self.retry_after = retry_after
+
+        self._lock = threading.RLock()
+        # Dict model name -> loader, sorted from the least to the most recently used model
+        self._loaders: 'OrderedDict[str, ModelsWrapperLoader]' = OrderedDict()
+        # Name of the model that will be the default model when it's loaded
+        self._next_default_model_name: str = None
+        # Dict model name -> size of it's folder
+        self._models_sizes: Dict[str, int] = {}
+        self._num_evictions = 0
+
+    @classmethod
+    def from_config(cls, models_wrapper_factory: Callable[..., 'ModelsWrapper'],
+                    models_dir_path: str) -> 'ModelsRegistry':
+        """
+        Creates a ModelsRegistry with the params of the [MODELS] section of the *-conf.ini file:
+
+        * BEST_TOPICS_MODEL_NAME: Name of the default model.
+        * MAX_LOADED_MODELS
+        * MEMORY_BUDGET_MB: If is 0 or isn't specified, the size of the loaded models isn't limited.
+        * PRELOADED_MODELS_NAMES: Names of the models (separated by commas) loaded when the app starts, \
+        apart from the default model.
+        """
+        config = get_config()
+
+        preloaded_models_names = config.get('MODELS', 'PRELOADED_MODELS_NAMES', fallback='')
+        return cls(models_wrapper_factory, config.best_topics_model_name, models_dir_path,
+                   max_loaded_models=config.get_int('MODELS', 'MAX_LOADED_MODELS', fallback=2),
+                   memory_budget_bytes=config.get_int('MODELS', 'MEMORY_BUDGET_MB', fallback=0) * 1024 * 1024,
+                   preloaded_models_names=[name.strip() for name in preloaded_models_names.split(',')
+                                           if name.strip() != ''])
+
+    def get_models_names(self) -> List[str]:
+        """
+        Returns the names of the models stored in the models folder, sorted alphabetically.
+        The folder is listed each time, so the models added after the app has started are also returned.
+        """
+        if not os.path.isdir(self.models_dir_path):
+            return []
+        return sorted(name for name in os.listdir(self.models_dir_path)
+                      if not name.startswith('.') and os.path.isdir(join_paths(self.models_dir_path, name)))
+
+    def has_model(self, model_name: str) -> bool:
+        """
+        Returns True if the given model is stored in the models folder.
+        """
+        # The names with separators aren't allowed, so the user can't access other folders
+        return os.path.basename(model_name) == model_name and not model_name.startswith('.') and \
+            os.path.isdir(join_paths(self.models_dir_path, model_name))
+
+    def start(self):
+        """
+        Starts loading the default model and the preloaded models in background threads.
+        """
+        for model_name in [self.default_model_name] + self.preloaded_models_names:
+            self.get_loader(model_name)
+
+    def get(self, model_name: str = None) -> 'ModelsWrapper':
+        """
+        Returns the ModelsWrapper of the given model (or the default one, if model_name is None).
+        If the model hasn't been loaded yet, it starts loading it and raises a ModelsWrapperNotReadyError.
+
+        :raises UserResourceWithParamValueNotFoundError: If the model doesn't exist.
+        :raises ModelsWrapperNotReadyError: If the model hasn't been loaded yet.
+        """
+        return self.get_loader(model_name).get()
+
+    @contextmanager
+    def use(self, model_name: str = None) -> Iterator['ModelsWrapper']:
+        """
+        Context manager that returns the ModelsWrapper of the given model (or the default one, if model_name is None),
+        like get(), and prevents it from being closed (if it's evicted or reloaded) until the context is exited:
+
+        ::
+
+            with models_registry.use(model_name) as models_wrapper:
+                ...
+
+        :raises UserResourceWithParamValueNotFoundError: If the model doesn't exist.
+        :raises ModelsWrapperNotReadyError: If the model hasn't been loaded yet.
+        """
+        loader = self.get_loader(model_name)
+        models_wrapper = loader.acquire()
+        try:
+            yield models_wrapper
+        finally:
+            loader.release(models_wrapper)
+
+    def get_loader(self, model_name: str = None) -> ModelsWrapperLoader:
+        """
+        Returns the ModelsWrapperLoader of the given model (or the default one, if model_name is None),
+        and marks the model as the most recently used. If the model isn't in the registry (or it's load has failed
+        at least retry_after seconds ago), it starts loading it.
+
+        :raises UserResourceWithParamValueNotFoundError: If the model doesn't exist.
+        """
+        with self._lock:
+            if model_name is None:
+                model_name = self._get_default_model_name()
+
+            loader = self._loaders.get(model_name)
+            if loader is not None and not loader.has_failed(self.retry_after):
+                self._loaders.move_to_end(model_name)
+                return loader
+
+            # The default model can be loaded even if it isn't in the models folder (the ModelsWrapper reports
+            # the error), but the other models must be in it
+            if model_name != self.default_model_name and not self.has_model(model_name):
+                raise UserResourceWithParamValueNotFoundError('Model "{0}" not found'.format(model_name))
+
+            loader = ModelsWrapperLoader(functools.partial(self._models_wrapper_factory, model_name),
+                                         retry_after=self.retry_after)
+            # If the load of the model has failed, the failed loader is replaced
+            self._loaders.pop(model_name, None)
+            self._loaders[model_name] = loader
+            evicted_loaders = self._evict()
+
+        for evicted_loader in evicted_loaders:
+            evicted_loader.close()
+        loader.start()
+        return loader
+
+    def _get_default_model_name(self) -> str:
+        """
+        Returns the name of the default model. If a new default model has been set and it's already loaded,
+        it becomes the default model.
+        """
+        next_loader = self._loaders.get(self._next_default_model_name)
+        if next_loader is not None and next_loader.get_status()['state'] != ModelsWrapperLoader.LOADING:
+            if next_loader.is_ready():
+                self.default_model_name = self._next_default_model_name
+            self._next_default_model_name = None
+        return self.default_model_name
+
+    def set_default_model(self, model_name: str):
+        """
+        Starts loading the given model, and makes it the default model when it's loaded. Until then, the current
+        default model is used. If the given model can't be loaded, the current default model is kept.
+
+        :raises UserResourceWithParamValueNotFoundError: If the model doesn't exist.
+        """
+        with self._lock:
+            if model_name == self.default_model_name:
+                self._next_default_model_name = None
+                return
+            self.get_loader(model_name)
+            self._next_default_model_name = model_name
+
+    def reload(self, model_name: str = None) -> bool:
+        """
+        Starts loading again the given model (or all the models of the registry, if model_name is None)
+        in background threads. Until a model is loaded again, the current ModelsWrapper keeps answering the requests.
+
+        :return: False if the model isn't in the registry or a load of it is already in progress, else True.
+        """
+        with self._lock:
+            if model_name is None:
+                loaders = list(self._loaders.values())
+            else:
+                loaders = [self._loaders[model_name]] if model_name in self._loaders else []
+
+        return len(loaders) > 0 and all([loader.reload() for loader in loaders])
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until all the loads (and reloads) in progress finish. The timeout is applied to each one of them.
+
+        :return: True if all the models of the registry are ready and no reload is in progress.
+        """
+        with self._lock:
+            loaders = list(self._loaders.values())
+        results = [loader.wait(timeout) for loader in loaders]
+        with self._lock:
+            # Applies the change of the default model, if it has been loaded
+            self._get_default_model_name()
+        return all(results)
+
+    def get_loaders_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns a dict with the status of the loader (see ModelsWrapperLoader.get_status()) of each model
+        of the registry.
+        """
+        with self._lock:
+            loaders = dict(self._loaders)
+        return {model_name: loader.get_status() for model_name, loader in loaders.items()}
+
+    def get_loaded_models_wrappers(self) -> List['ModelsWrapper']:
+        """
+        Returns the ModelsWrappers of the models of the registry that are loaded.
+        """
+        with self._lock:
+            loaders = list(self._loaders.values())
+        return [loader.get() for loader in loaders if loader.is_ready()]
+
+    def _get_model_size(self, model_name: str) -> int:
+        """
+        Returns the size (in bytes) of the folder of the given model, used as an estimation of it's memory usage.
+        """
+        if model_name not in self._models_sizes:
+            size = 0
+            for dir_path, _, files_names in os.walk(join_paths(self.models_dir_path, model_name)):
+                size += sum(os.path.getsize(join_paths(dir_path, file_name)) for file_name in files_names)
+            self._models_sizes[model_name] = size
+        return self._models_sizes[model_name]
+
+    def _evict(self) -> List[ModelsWrapperLoader]:
+        """
+        Removes the least recently used models until there are at most max_loaded_models models
+        and their size doesn't exceed the memory_budget_bytes. It must be called with the lock acquired.
+
+        :return: The loaders of the removed models, that must be closed.
+        """
+        pinned_models_names = {self.default_model_name, self._next_default_model_name} | \
+            set(self.preloaded_models_names)
+        # The most recently used model is the one that is being requested, so it isn't evicted
+        evictable_models_names = [name for name, loader in list(self._loaders.items())[:-1]
+                                  if name not in pinned_models_names and
+                                  loader.get_status()['state'] != ModelsWrapperLoader.LOADING]
+
+        evicted_loaders = []
+        for model_name in evictable_models_names:
+            size = sum(self._get_model_size(name) for name in self._loaders)
+            if len(self._loaders) <= self.max_loaded_models and \
+                    (self.memory_budget_bytes <= 0 or size <= self.memory_budget_bytes):
+                break
+            evicted_loaders.append(self._loaders.pop(model_name))
+            self._num_evictions += 1
+        return evicted_loaders
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Returns a dict with the default model, and the state of each model stored in the models folder
+        (not_loaded if it isn't in the registry).
+        """
+        with self._lock:
+            default_model_name = self._get_default_model_name()
+            loaders = dict(self._loaders)
+            models_names = sorted(set(self.get_models_names()) | set(loaders))
+            return {
+                'default_model': default_model_name,
+                'next_default_model': self._next_default_model_name,
+                'num_evictions': self._num_evictions,
+                'models': [
+                    {
+                        'name': model_name,
+                        'state': loaders[model_name].get_status()['state'] if model_name in loaders else 'not_loaded',
+                        'size_bytes': self._get_model_size(model_name)
+                    } for model_name in models_names
+                ]
+            }
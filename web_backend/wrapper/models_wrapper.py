@@ -1,17 +1,33 @@
+import hashlib
 import os
-from typing import List, Tuple, Any, Dict
+from typing import List, Tuple, Any, Dict, Callable, Iterator, Optional, Sequence
 
+import numpy as np
 from networkx import PowerIterationFailedConvergence
 from nltk import sent_tokenize
 from topics_and_summary.models.summarization import TextRank
 from topics_and_summary.models.topics import TopicsModel, LdaMalletModel
+from topics_and_summary.preprocessing.text import preprocess_text
 from topics_and_summary.utils import pretty_print
-from topics_and_summary.visualizations import plot_word_clouds_of_topics
 from tqdm import tqdm
 
 from web_backend.params import get_param
 from web_backend.utils import get_abspath_from_project_source_root, join_paths, UserInvalidParamError, \
-    UserResourceWithParamValueNotFoundError, rename_attribute, get_param_value_from_conf_file
+    UserResourceWithParamValueNotFoundError, get_config, check_paths_exist, TOPICS_MODELS_DIR_PATH, \
+    WORDCLOUD_IMAGES_DIR_PATH
+from web_backend.wrapper.corpus_store import CorpusStore
+from web_backend.wrapper.docs_topics_index import DocsTopicsIndex
+from web_backend.wrapper.embeddings_store import EmbeddingsStore, iter_glove_embeddings, iter_word2vec_embeddings
+from web_backend.wrapper.images_manifest import get_images_manifest
+from web_backend.wrapper.mallet_inference_pool import MalletInferencePool, ThreadSafeLdaMalletInference
+from web_backend.wrapper.sentence_vectors_cache import SentenceVectorsStore
+from web_backend.wrapper.summaries_store import SummariesStore
+from web_backend.wrapper.summarization import TextRankSummarizer
+from web_backend.wrapper.summarization_pool import SummarizationPool
+from web_backend.wrapper.topics_inference import TopicsInferencer
+from web_backend.wrapper.topics_keywords_table import TopicsKeywordsTable
+from web_backend.wrapper.word_cloud_jobs import WordCloudJob, WordCloudJobNotDoneError, WordCloudJobQueue
+from web_backend.wrapper.word_cloud_rendering import WordCloudRenderer
 
 
 class ModelsWrapper:
@@ -22,17 +38,22 @@ class ModelsWrapper:
     TOPICS_MODELS_DIR_PATH folder.
     """
 
-    TOPICS_MODELS_DIR_PATH = get_abspath_from_project_source_root('saved-elements/models/topics')
+    TOPICS_MODELS_DIR_PATH = TOPICS_MODELS_DIR_PATH
     """ Path where the topics models are stored on disk. """
 
-    WORDCLOUD_IMAGES_DIR_PATH = get_abspath_from_project_source_root('static/wordcloud-images')
+    WORDCLOUD_IMAGES_DIR_PATH = WORDCLOUD_IMAGES_DIR_PATH
     """ Path where the wordcloud images are stored on disk. """
 
+    PRECOMPUTED_ELEMENTS_DIR_PATH = get_abspath_from_project_source_root('saved-elements/precomputed')
+    """ Path where the elements generated in batch with the web_backend.precompute module are stored on disk. """
+
     def __init__(self, topics_model_name: str, dataset_path: str, model_class=LdaMalletModel,
-                 summarization_model_word_embeddings='glove'):
+                 summarization_model_word_embeddings='glove', progress_callback: Callable[[str], None] = None):
         """
-        Loads the TopicsModel and creates the SummarizationModel. It also generates the wordcloud images and stores
-        them in the static/wordcloud-images folder.
+        Loads the TopicsModel and creates the SummarizationModel. If the TopicsModel is a LdaMalletModel, it also
+        creates an in-process TopicsInferencer, used instead of mallet to infer the topics of new texts.
+        It also loads the elements generated in batch (summaries of the dataset documents, word embeddings, ...),
+        if they have been previously generated with the web_backend.precompute module.
 
         :param topics_model_name: Name of the topics_model stored in the TOPICS_MODELS_DIR_PATH folder.
         :param dataset_path: Path to the folder that contains the original dataset documents.
@@ -44,8 +65,35 @@ class ModelsWrapper:
 
         :param summarization_model_word_embeddings: Word embeddings to be used by the summarization model. \
         Possible values are: 'glove' or 'word2vec'.
+        :param progress_callback: Function called with a description of each loading stage, when the stage starts. \
+        Used to report the loading progress.
         """
 
+        self._progress_callback = progress_callback
+
+        self.topics_model_name = topics_model_name
+        self.summarization_model_word_embeddings = summarization_model_word_embeddings
+
+        # Check that all the required paths exist before loading the models, because it can take some minutes
+        config = get_config()
+        required_paths = {
+            'dataset_path': dataset_path,
+            'topics_model_name': join_paths(self.TOPICS_MODELS_DIR_PATH, topics_model_name)
+        }
+        if model_class == LdaMalletModel:
+            required_paths['MALLET.SOURCE_CODE_PATH'] = config.mallet_source_code_path
+        if summarization_model_word_embeddings not in ('glove', 'word2vec'):
+            raise Exception('Wrong value for parameter summarization_model_word_embeddings.\n'
+                            'Given value: {0}\n'
+                            'Possible values: "glove" or "word2vec"'.format(summarization_model_word_embeddings))
+        # The original word embeddings files are only needed if the EmbeddingsStore hasn't been generated
+        embeddings_store = EmbeddingsStore.load(self._get_embeddings_store_dir_path())
+        if embeddings_store is None and summarization_model_word_embeddings == 'glove':
+            required_paths['EMBEDDINGS.GLOVE_PATH'] = config.glove_embeddings_path
+        elif embeddings_store is None and summarization_model_word_embeddings == 'word2vec':
+            required_paths['EMBEDDINGS.WORD2VEC_PATH'] = config.word2vec_embeddings_path
+        check_paths_exist(required_paths)
+
         # Load topics model from disk
         if not issubclass(model_class, TopicsModel) or not model_class != TopicsModel:
             raise Exception('Wrong value for parameter model_class.\n'
@@ -53,36 +101,378 @@ class ModelsWrapper:
                             'It must be a subclass of the topics_and_summary.models.topics.TopicsModel class.'
                             .format(model_class))
         elif model_class == LdaMalletModel:
-            pretty_print('Loading the Topics Model')
-            # Load mallet_source_code_path from the *-conf.ini file
-            mallet_source_code_path = get_param_value_from_conf_file('MALLET', 'SOURCE_CODE_PATH')
+            self._report_progress('Loading the Topics Model')
             # LdaMalletModel has a different load method (has a mallet_path param)
             model_class: LdaMalletModel
             self.topics_model = model_class.load(topics_model_name,
                                                  model_parent_dir_path=self.TOPICS_MODELS_DIR_PATH,
                                                  dataset_path=dataset_path,
-                                                 mallet_path=mallet_source_code_path)
+                                                 mallet_path=config.mallet_source_code_path)
         else:
-            pretty_print('Loading the Topics Model')
+            self._report_progress('Loading the Topics Model')
             model_class: TopicsModel
             self.topics_model = model_class.load(topics_model_name,
                                                  model_parent_dir_path=self.TOPICS_MODELS_DIR_PATH,
                                                  dataset_path=dataset_path)
 
-        # Create the summarization model
-        pretty_print('Creating the TextRank model')
-        if summarization_model_word_embeddings == 'glove':
-            # Load glove_embeddings_path from the *-conf.ini file
-            glove_embeddings_path = get_param_value_from_conf_file('EMBEDDINGS', 'GLOVE_PATH')
-            self.summarization_model = TextRank(embedding_model='glove', embeddings_path=glove_embeddings_path)
-        elif summarization_model_word_embeddings == 'word2vec':
-            # Load word2vec_embeddings_path from the *-conf.ini file
-            word2vec_embeddings_path = get_param_value_from_conf_file('EMBEDDINGS', 'WORD2VEC_PATH')
-            self.summarization_model = TextRank(embedding_model='word2vec', embeddings_path=word2vec_embeddings_path)
-        else:
-            raise Exception('Wrong value for parameter summarization_model_word_embeddings.\n'
+        # Identifies the loaded topics model, so the elements generated with other topics model with the same name
+        # (trained again) aren't used: the topics distribution of the documents, the wordcloud images, and the
+        # responses stored in the response cache and by the clients (see the user_api blueprint)
+        self.topics_model_fingerprint = self._get_topics_model_fingerprint()
+
+        # Build the table with the most important keywords of each topic, up to the max number of keywords
+        # of the endpoint, so the topics aren't obtained from the topics model in each request
+        self._report_progress('Building the topics keywords table')
+        self.topics_keywords_table = TopicsKeywordsTable.from_topics(
+            self.topics_model.get_topics(get_param('topics.text.num_keywords.max'))
+        )
+
+        # Create the in-process topics inferencer. If the INFERENCE.ENGINE param of the *-conf.ini file is 'mallet',
+        # the topics of new texts are inferred with mallet, using a MalletInferencePool that sends the texts
+        # that arrive at the same time to the same mallet Java process
+        inference_engine = config.get('INFERENCE', 'ENGINE', fallback='numpy')
+        if inference_engine not in ('numpy', 'mallet'):
+            raise Exception('Wrong value for param ENGINE of section [INFERENCE] in the *-conf.ini file.\n'
                             'Given value: {0}\n'
-                            'Possible values: "glove" or "word2vec"'.format(summarization_model_word_embeddings))
+                            'Possible values: "numpy" or "mallet"'.format(inference_engine))
+        if model_class == LdaMalletModel and inference_engine == 'numpy':
+            self._report_progress('Creating the in-process topics inferencer')
+            self.topics_inferencer = TopicsInferencer.from_lda_mallet(self.topics_model.model)
+        else:
+            self.topics_inferencer = None
+
+        # The LdaMallet model infers the topics in files with fixed names, so the threads (and workers of the
+        # MalletInferencePool) that call it at the same time must use different files
+        if model_class == LdaMalletModel:
+            self._mallet_inference = ThreadSafeLdaMalletInference(self.topics_model.model)
+        else:
+            self._mallet_inference = None
+
+        if model_class == LdaMalletModel and inference_engine == 'mallet' and \
+                config.get_int('INFERENCE', 'MALLET_NUM_WORKERS', fallback=0) > 0:
+            self._report_progress('Creating the mallet inference pool')
+            self.mallet_inference_pool = MalletInferencePool(
+                self._mallet_inference,
+                num_workers=config.get_int('INFERENCE', 'MALLET_NUM_WORKERS'),
+                max_queue_size=config.get_int('INFERENCE', 'MALLET_MAX_QUEUE_SIZE', fallback=64),
+                max_batch_size=config.get_int('INFERENCE', 'MALLET_MAX_BATCH_SIZE', fallback=32)
+            )
+        else:
+            self.mallet_inference_pool = None
+
+        # Create the summarization model. If the word embeddings have been stored in an EmbeddingsStore,
+        # they are memory-mapped instead of being loaded from the original files, that takes minutes and gigabytes.
+        self._report_progress('Creating the TextRank model')
+        summarizer_kwargs = self._get_summarizer_kwargs()
+        if embeddings_store is not None:
+            pretty_print('Loaded the word embeddings stored in batch from ' + embeddings_store.dir_path)
+            self.summarization_model = TextRankSummarizer(embeddings_store, **summarizer_kwargs)
+        elif summarization_model_word_embeddings == 'glove':
+            self.summarization_model = TextRank(embedding_model='glove', embeddings_path=config.glove_embeddings_path)
+        else:
+            self.summarization_model = TextRank(embedding_model='word2vec',
+                                                embeddings_path=config.word2vec_embeddings_path)
+
+        # Create the pool of processes that summarize the documents of a response in parallel. It's only created
+        # with the EmbeddingsStore, because the worker processes memory-map it instead of loading the embeddings.
+        if embeddings_store is not None and config.get_int('SUMMARIZATION', 'NUM_WORKERS', fallback=0) > 0:
+            self._report_progress('Creating the summarization pool')
+            self.summarization_pool = SummarizationPool(
+                embeddings_store.dir_path,
+                num_workers=config.get_int('SUMMARIZATION', 'NUM_WORKERS'),
+                timeout=config.get_int('SUMMARIZATION', 'TIMEOUT_SECONDS', fallback=10),
+                summarizer_kwargs=summarizer_kwargs,
+                stats_callback=self.summarization_model.add_stats
+            )
+        else:
+            self.summarization_pool = None
+
+        self._report_progress('Loading the elements generated in batch')
+
+        # Load the summaries of the dataset documents generated in batch. If they haven't been generated,
+        # the summaries of the documents are generated in the moment with the summarization model.
+        self.summaries_store = SummariesStore.load(self._get_summaries_store_dir_path())
+        if self.summaries_store is not None:
+            pretty_print('Loaded the summaries generated in batch from ' + self.summaries_store.dir_path)
+
+        # Load the topics distribution of the dataset documents generated in batch. If it hasn't been generated,
+        # the documents related with a text are obtained with the topics model.
+        self.docs_topics_index = DocsTopicsIndex.load(self._get_precomputed_elements_dir_path(),
+                                                      self.topics_model_fingerprint)
+        if self.docs_topics_index is None and DocsTopicsIndex.exists(self._get_precomputed_elements_dir_path()):
+            pretty_print('The topics distribution of the dataset documents was generated with other topics model. '
+                         'It must be generated again')
+        if self.docs_topics_index is not None:
+            pretty_print('Loaded the topics distribution of the dataset documents')
+            # Rank the most representative documents of each topic, up to the max number of documents of the endpoint
+            self.docs_topics_index.precompute_most_repr_docs(get_param('topics.documents.num_documents.max'))
+
+        # Original content of the dataset documents. If the CorpusStore has been generated in batch, it's
+        # memory-mapped from disk. Else, it's obtained from the topics model the first time it's needed.
+        self.corpus_store = CorpusStore.load(self._get_corpus_store_dir_path())
+        if self.corpus_store is not None:
+            pretty_print('Loaded the documents of the dataset stored in batch from ' + self.corpus_store.dir_path)
+        self._docs_contents = None
+
+        # Renderer of the wordcloud images, that renders the images of the topics in parallel worker processes
+        self.word_cloud_renderer = WordCloudRenderer(
+            width=config.get_int('WORDCLOUD', 'IMAGE_WIDTH', fallback=800),
+            height=config.get_int('WORDCLOUD', 'IMAGE_HEIGHT', fallback=400),
+            image_format=config.get('WORDCLOUD', 'IMAGE_FORMAT', fallback='png'),
+            variant_widths=[int(width) for width in config.get('WORDCLOUD', 'IMAGE_VARIANT_WIDTHS', fallback='')
+                            .split(',') if width.strip() != ''],
+            num_workers=config.get_int('WORDCLOUD', 'NUM_WORKERS', fallback=4)
+        )
+
+        # Queue of jobs that render the wordcloud images in a background thread, the first time they are requested.
+        # The images of each topics model are stored in a different folder, and the names of the folders contain
+        # the fingerprint of the topics model, so the images of a topics model trained again are rendered again.
+        self.word_cloud_job_queue = WordCloudJobQueue(join_paths(self.WORDCLOUD_IMAGES_DIR_PATH, topics_model_name),
+                                                      self._render_word_cloud_images,
+                                                      version=self.topics_model_fingerprint[:16])
+
+    def _report_progress(self, stage: str):
+        """
+        Prints the given loading stage and reports it to the progress_callback.
+        """
+        pretty_print(stage)
+        if self._progress_callback is not None:
+            self._progress_callback(stage)
+
+    def stop_worker_processes(self):
+        """
+        Stops the worker processes of the SummarizationPool, if it exists. It's called before forking the process,
+        so the forked processes don't inherit a pool whose worker processes belong to other process.
+        """
+        if self.summarization_pool is not None:
+            self.summarization_pool.shutdown()
+
+    def start_worker_processes(self):
+        """
+        Starts the worker processes of the SummarizationPool, if it exists and they haven't been started by the
+        current process. The threads of the MalletInferencePool and the WordCloudJobQueue are started again
+        automatically, the next time they are used.
+        """
+        if self.summarization_pool is not None:
+            self.summarization_pool.start()
+
+    def close(self):
+        """
+        Stops the threads of the WordCloudJobQueue and the MalletInferencePool and the worker processes of the
+        SummarizationPool, and removes the temporary files of the mallet inference of the current process.
+        Those threads keep references to the ModelsWrapper, so it can't be freed until they are stopped.
+        The ModelsWrapper can't be used after this.
+        """
+        self.word_cloud_job_queue.close()
+        if self.mallet_inference_pool is not None:
+            self.mallet_inference_pool.close()
+        if self._mallet_inference is not None:
+            self._mallet_inference.remove_temp_files()
+        if self.summarization_pool is not None:
+            self.summarization_pool.shutdown()
+
+    def _get_summarizer_kwargs(self) -> Dict[str, Any]:
+        """
+        Returns the params of the PageRank algorithm and the SentenceVectorsCache of the TextRankSummarizer,
+        obtained from the [SUMMARIZATION] section of the *-conf.ini file, and the path to the SentenceVectorsStore.
+        """
+        config = get_config()
+        return {
+            'alpha': config.get_float('SUMMARIZATION', 'PAGERANK_DAMPING', fallback=0.85),
+            'max_iter': config.get_int('SUMMARIZATION', 'PAGERANK_MAX_ITERATIONS', fallback=100),
+            'tol': config.get_float('SUMMARIZATION', 'PAGERANK_TOLERANCE', fallback=1e-06),
+            'partial_ranking': config.get_bool('SUMMARIZATION', 'PAGERANK_PARTIAL_RANKING', fallback=False),
+            'sentence_cache_max_num_sentences': config.get_int('SUMMARIZATION', 'SENTENCE_CACHE_MAX_SENTENCES',
+                                                               fallback=0),
+            'sentence_cache_max_num_texts': config.get_int('SUMMARIZATION', 'SENTENCE_CACHE_MAX_TEXTS', fallback=0),
+            'sentence_vectors_store_dir_path': self._get_sentence_vectors_store_dir_path()
+        }
+
+    def _get_precomputed_elements_dir_path(self) -> str:
+        """
+        Returns the path to the folder where the elements generated in batch for the topics model are stored.
+        """
+        return join_paths(self.PRECOMPUTED_ELEMENTS_DIR_PATH, self.topics_model_name)
+
+    def _get_summaries_store_dir_path(self) -> str:
+        """
+        Returns the path to the folder of the SummariesStore of the topics model and the summarization model.
+        """
+        return join_paths(self._get_precomputed_elements_dir_path(),
+                          'summaries-{}'.format(self.summarization_model_word_embeddings))
+
+    def _get_embeddings_store_dir_path(self) -> str:
+        """
+        Returns the path to the folder of the EmbeddingsStore of the topics model and the summarization model.
+        """
+        return join_paths(self._get_precomputed_elements_dir_path(),
+                          'embeddings-{}'.format(self.summarization_model_word_embeddings))
+
+    def _get_corpus_store_dir_path(self) -> str:
+        """
+        Returns the path to the folder of the CorpusStore with the documents of the topics model dataset.
+        """
+        return join_paths(self._get_precomputed_elements_dir_path(), 'corpus')
+
+    def _get_sentence_vectors_store_dir_path(self) -> str:
+        """
+        Returns the path to the folder of the SentenceVectorsStore of the topics model and the summarization model.
+        """
+        return join_paths(self._get_precomputed_elements_dir_path(),
+                          'sentence-vectors-{}'.format(self.summarization_model_word_embeddings))
+
+    def get_docs_contents(self) -> Sequence[str]:
+        """
+        Returns the original content of all the documents of the dataset. The position of each document in the list
+        is the document id, and it's the same as the position of the document in the topics model corpus.
+        If the CorpusStore has been generated, it's returned instead of a list, so the documents aren't
+        loaded into memory.
+        """
+        if self.corpus_store is not None:
+            return self.corpus_store
+        if self._docs_contents is None:
+            self._docs_contents = self._get_docs_contents_from_topics_model()
+        return self._docs_contents
+
+    def _get_docs_contents_from_topics_model(self) -> List[str]:
+        """
+        Returns the original content of all the documents of the dataset, obtained from the topics model.
+        """
+        return list(self.topics_model.get_dominant_topic_of_each_doc_as_df()['Original doc text'])
+
+    def build_corpus_store(self, store_sentences=True):
+        """
+        Stores in batch the original content of all the documents of the dataset in a CorpusStore, and loads it.
+        After this, the documents are memory-mapped from disk instead of being kept in memory.
+
+        :param store_sentences: If is True, the positions of the sentences of each document are also stored, \
+        so they aren't split into sentences again when the sentences vectors are generated in batch.
+        """
+        pretty_print('Storing the documents of the dataset')
+        # The documents aren't obtained from the current store (if it's loaded), because it's files are replaced
+        docs_contents = self._docs_contents if self._docs_contents is not None else \
+            self._get_docs_contents_from_topics_model()
+        self.corpus_store = CorpusStore.build(self._get_corpus_store_dir_path(), docs_contents,
+                                              sent_tokenize if store_sentences else None)
+        self._docs_contents = None
+
+    def build_summaries_store(self, num_summary_sentences_values: List[int] = None):
+        """
+        Generates in batch the summaries of all the documents of the dataset, stores them on disk and loads them.
+        After this, the summaries of the dataset documents are obtained from disk instead of being generated
+        in the moment.
+
+        :param num_summary_sentences_values: Numbers of sentences of the summaries to be generated. \
+        If is None, the default value of the summaries of the documents is obtained from the params file.
+        """
+        if num_summary_sentences_values is None:
+            num_summary_sentences_values = [get_param('topics.documents.num_summary_sentences.default')]
+
+        pretty_print('Generating the summaries of the dataset documents')
+        self.summaries_store = SummariesStore.build(self._get_summaries_store_dir_path(), self.get_docs_contents(),
+                                                    num_summary_sentences_values, self._summarize_text)
+
+    def build_embeddings_store(self, dtype=np.float16, prune_to_dataset_vocabulary=False, glove_vectors_dim=100):
+        """
+        Converts the original word embeddings files of the summarization model into an EmbeddingsStore,
+        stores it on disk and uses it in the summarization model. After this, the word embeddings are
+        memory-mapped from disk instead of being loaded from the original files.
+
+        :param dtype: Type of the stored vectors: np.float16 or np.float32.
+        :param prune_to_dataset_vocabulary: If is True, only the words of the dataset documents are stored. \
+        This reduces a lot the size of the store, but the words of new texts that aren't in the dataset \
+        are ignored when summarizing them.
+        :param glove_vectors_dim: Dimension of the Glove vectors to be stored. Only used with the Glove embeddings.
+        """
+        config = get_config()
+        if self.summarization_model_word_embeddings == 'glove':
+            glove_dir_path = config.glove_embeddings_path
+            words_vectors = iter_glove_embeddings(join_paths(
+                glove_dir_path, '{0}.{1}d.txt'.format(os.path.basename(os.path.normpath(glove_dir_path)),
+                                                      glove_vectors_dim)
+            ))
+        else:
+            words_vectors = iter_word2vec_embeddings(config.word2vec_embeddings_path)
+
+        vocabulary = None
+        if prune_to_dataset_vocabulary:
+            vocabulary = set()
+            for doc_content in self.get_docs_contents():
+                vocabulary.update(TextRankSummarizer.get_words_of_text(doc_content))
+
+        pretty_print('Storing the word embeddings')
+        embeddings_store = EmbeddingsStore.build(self._get_embeddings_store_dir_path(), words_vectors,
+                                                 dtype=dtype, vocabulary=vocabulary)
+        self.summarization_model = TextRankSummarizer(embeddings_store, **self._get_summarizer_kwargs())
+
+    def build_sentence_vectors_store(self):
+        """
+        Obtains in batch the vectors of all the sentences of the dataset documents, stores them on disk and uses them
+        in the summarization model. After this, the TextRankSummarizer only needs to split the documents
+        into sentences and rank them. The word embeddings must have been stored before in an EmbeddingsStore.
+
+        :raises ValueError: If the word embeddings haven't been stored in an EmbeddingsStore.
+        """
+        if not isinstance(self.summarization_model, TextRankSummarizer):
+            raise ValueError('The word embeddings must be stored in batch before the sentences vectors. '
+                             'Execute "python -m web_backend.precompute embeddings" first.')
+
+        pretty_print('Obtaining the vectors of the sentences of the dataset documents')
+        num_docs = len(self.get_docs_contents())
+        SentenceVectorsStore.build(self._get_sentence_vectors_store_dir_path(),
+                                   (self._get_doc_sentences(doc_id) for doc_id in range(num_docs)),
+                                   self.summarization_model.get_sentences_vectors,
+                                   self.summarization_model.embeddings_store.vectors_size)
+        self.summarization_model = TextRankSummarizer(self.summarization_model.embeddings_store,
+                                                      **self._get_summarizer_kwargs())
+
+    def _get_doc_sentences(self, doc_id: int) -> List[str]:
+        """
+        Returns the sentences of the document with the given id, from the CorpusStore if they are stored on it.
+        """
+        doc_sentences = self.corpus_store.get_doc_sentences(doc_id) if self.corpus_store is not None else None
+        if doc_sentences is None:
+            doc_sentences = sent_tokenize(self.get_docs_contents()[doc_id])
+        return doc_sentences
+
+    def _get_topics_model_fingerprint(self) -> str:
+        """
+        Returns a str that identifies the topics model: a digest of it's topic-word matrix and the number of documents
+        of it's corpus. It changes if the model is trained again, but not if it's copied to other folder.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(self.topics_model.model.get_topics(), dtype=np.float32).tobytes())
+        digest.update(str(len(self.topics_model.corpus)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def build_docs_topics_index(self):
+        """
+        Obtains in batch the topics distribution of all the documents of the dataset, stores it on disk and loads it.
+        After this, the documents related with a text are obtained from it.
+
+        If the topics model is a LdaMalletModel, the distribution obtained by mallet when the model was trained
+        is used (the same one used by the topics model to obtain the most representative documents of each topic),
+        instead of inferring it again, because mallet samples a different distribution each time.
+        """
+        pretty_print('Obtaining the topics distribution of the dataset documents')
+        if isinstance(self.topics_model, LdaMalletModel):
+            docs_topic_prob_lists = self.topics_model.model.load_document_topics()
+        else:
+            docs_topic_prob_lists = self.topics_model.model[self.topics_model.corpus]
+
+        docs_topics = np.zeros((len(self.topics_model.corpus), self.topics_model.num_topics), dtype=np.float32)
+        num_docs = 0
+        for doc_id, doc_topic_prob_list in enumerate(docs_topic_prob_lists):
+            for topic, topic_prob in doc_topic_prob_list:
+                docs_topics[doc_id, topic] = topic_prob
+            num_docs += 1
+        if num_docs != len(self.topics_model.corpus):
+            raise Exception('The topics distribution of {0} documents was obtained, but the corpus of the topics '
+                            'model has {1} documents'.format(num_docs, len(self.topics_model.corpus)))
+
+        self.docs_topics_index = DocsTopicsIndex.build(self._get_precomputed_elements_dir_path(), docs_topics,
+                                                       self.topics_model_fingerprint)
+        self.docs_topics_index.precompute_most_repr_docs(get_param('topics.documents.num_documents.max'))
 
     def get_topics_text(self, num_keywords: int = None) -> List[Dict[str, Any]]:
         """
@@ -93,7 +483,25 @@ class ModelsWrapper:
         If num_keywords value is lesser than the min value for this param or is greater than the max value
         for this param (both specified in the params file) a UserError exception is raised.
 
-        :return: A list of dicts that can be directly used by the jsonify() function.
+        :return: A list of dicts that can be directly used by the jsonify() function, with the following format: \
+        [{"topic": 0, "keywords": [{"name": "god", "probability": 0.87}, ...]}, ...]
+        """
+        num_keywords = self._check_topics_text_num_keywords(num_keywords)
+        return self._get_topics_keywords_table(num_keywords).get_topics(num_keywords)
+
+    def get_topics_text_json(self, num_keywords: int = None) -> bytes:
+        """
+        Same as get_topics_text(), but returns the topics already serialized in JSON format (encoded in UTF-8).
+        The JSON of each num_keywords is serialized only once.
+        """
+        num_keywords = self._check_topics_text_num_keywords(num_keywords)
+        return self._get_topics_keywords_table(num_keywords).get_topics_json(num_keywords)
+
+    @staticmethod
+    def _check_topics_text_num_keywords(num_keywords: int = None) -> int:
+        """
+        Returns the given num_keywords of get_topics_text(), or the default value if is None.
+        If it isn't inside the valid range, a UserInvalidParamError exception is raised.
         """
 
         # Obtain the params values from the params file
@@ -111,38 +519,48 @@ class ModelsWrapper:
                 raise UserInvalidParamError('num_keywords param must be in the range [{0},{1}]'
                                             .format(param_min_value, param_max_value))
 
-        # Obtain the topics as a List[Topic]
-        topics_list = self.topics_model.get_topics(num_keywords)
+        return num_keywords
 
-        # Convert the List[Topic] in the following list:
-        # [{"topic": 0, "keywords": [{"name": "god", "probability": 0.87}, ...]}, ...]
-        for topic in topics_list:
-            # Rename the topic.id attribute to topic.topic
-            rename_attribute(topic, 'id', 'topic')
-            # Transform each Keyword object into a dict
-            topic.keywords = [vars(keyword) for keyword in topic.keywords]
-        # Transform each Topic object into a dict
-        topics_list = [vars(topic) for topic in topics_list]
-
-        return topics_list
-
-    def get_topics_word_cloud_images_urls(self, num_keywords: int = None) -> List['TopicImageUrlDTO']:
+    def _get_topics_keywords_table(self, num_keywords: int) -> TopicsKeywordsTable:
+        """
+        Returns the TopicsKeywordsTable with the keywords of the topics. If it has less than num_keywords keywords
+        (because the max value of the param has been increased after it was built), it's built again.
+        """
+        topics_keywords_table = self.topics_keywords_table
+        if topics_keywords_table.max_num_keywords < num_keywords:
+            topics_keywords_table = TopicsKeywordsTable.from_topics(self.topics_model.get_topics(num_keywords))
+            self.topics_keywords_table = topics_keywords_table
+        return topics_keywords_table
+
+    def get_topics_word_cloud_images_urls(self, num_keywords: int = None,
+                                          timeout: float = None) -> List['TopicImageUrlDTO']:
         """
         Given a number of keywords, this function returns a List[TopicImageUrlDTO] with, for each topic,
         a url that points to a wordcloud image of that topic. Each TopicImageUrlDTO stores:
 
         * The topic id
         * The url to a wordcloud image of the topic, with the num_keywords specified
+        * A srcset with the urls of the image and it's smaller variants, with their widths
 
         If wordcloud images with the same num_keywords have been previously generated, they are not generated again.
-        If not, they are generated and stored inside a new folder <num_keywords>keywords. This new folder is created
-        inside the WORDCLOUD_IMAGES_DIR_PATH folder.
+        If not, a job that generates them is added to the WordCloudJobQueue (or the job that is already generating
+        them is used), and this function waits for it at most timeout seconds. The images are stored inside a new
+        folder <topics_model_name>/<num_keywords>keywords-<topics model fingerprint>, inside the
+        WORDCLOUD_IMAGES_DIR_PATH folder, that is created only when all the images have been generated.
+
+        The urls contain the version of the ImagesManifest of the folder (a digest of the content of the images),
+        so they change when the images change, and can be cached forever by the clients.
 
         If num_keywords has no value, the default value is obtained from the params file.
 
         If num_keywords value is lesser than the min value for this param or is greater than the max value
         for this param (both specified in the params file) a UserError exception is raised.
 
+        If the images haven't been generated in timeout seconds, or they couldn't be generated,
+        a WordCloudJobNotDoneError exception is raised, that contains the WordCloudJob that generates them.
+
+        :param num_keywords: Number of keywords of the wordcloud images.
+        :param timeout: Max number of seconds to wait for the images to be generated. If is None, there is no limit.
         :return: List[TopicImageUrlDTO] with, for each topic, a url that points to a wordcloud image of that topic.
         """
 
@@ -161,37 +579,105 @@ class ModelsWrapper:
                 raise UserInvalidParamError('num_keywords param must be in the range [{0},{1}]'
                                             .format(param_min_value, param_max_value))
 
-        wordcloud_images_num_keywords_dir = join_paths(self.WORDCLOUD_IMAGES_DIR_PATH,
-                                                       '{}keywords'.format(num_keywords))
+        # The images are generated only if they haven't been generated yet
+        job = self.word_cloud_job_queue.submit(num_keywords)
+        if not job.wait(timeout):
+            raise WordCloudJobNotDoneError('The wordcloud images are being generated. Try again later.', job)
+        if not job.is_done():
+            raise WordCloudJobNotDoneError('The wordcloud images couldn\'t be generated.', job)
 
-        # If there is a folder with the same num_keywords inside the wordcloud-images,
-        # that means that images with that num_keywords have been previously generated.
-        # The images are generated only if the folder doesn't exist.
-        if not os.path.exists(wordcloud_images_num_keywords_dir):
-            pretty_print('Generating and storing the wordcloud images in ' + wordcloud_images_num_keywords_dir)
-            os.mkdir(wordcloud_images_num_keywords_dir)
-            plot_word_clouds_of_topics(self.topics_model.get_topics(num_keywords), single_plot_per_topic=True,
-                                       show_plot=False, save=True, dir_save_path=wordcloud_images_num_keywords_dir,
-                                       save_base_name='topic', dpi=200)
+        wordcloud_images_num_keywords_dir = self.word_cloud_job_queue.get_images_dir_path(num_keywords)
+        images_manifest = get_images_manifest(wordcloud_images_num_keywords_dir)
 
-        # Generate the url of each topic and store it inside a TopicImageUrlDTO object
+        # Generate the urls of the images of each topic and store them inside a TopicImageUrlDTO object
         topic_image_url_list = []
         for topic in range(self.topics_model.num_topics):
-            # Generate urls starting in '/static/...'
-            num_keywords_dir_relative_path = '/static/' + wordcloud_images_num_keywords_dir.split('static/')[1]
-            image_url = join_paths(num_keywords_dir_relative_path, 'topic{}.png'.format(topic))
+            # Generate urls starting in '/static/...', with the version of the images after the folder
+            num_keywords_dir_relative_path = join_paths(
+                '/static/' + wordcloud_images_num_keywords_dir.split('static/')[1], images_manifest.version
+            )
+            images_urls = [(width, join_paths(num_keywords_dir_relative_path, file_name))
+                           for width, file_name in self.word_cloud_renderer.get_images_file_names(topic)]
+            # The last image is the main image, and the srcset contains all the images, with their widths
+            image_url = images_urls[-1][1]
+            image_srcset = ', '.join('{0} {1}w'.format(url, width) for width, url in images_urls)
 
-            topic_image_url_list.append(TopicImageUrlDTO(topic, image_url))
+            topic_image_url_list.append(TopicImageUrlDTO(topic, image_url, image_srcset))
 
         return topic_image_url_list
 
+    def get_word_cloud_job(self, num_keywords: int) -> Optional[WordCloudJob]:
+        """
+        Returns the WordCloudJob that generates the wordcloud images with the given num_keywords,
+        or None if the images haven't been requested.
+        """
+        return self.word_cloud_job_queue.get_job(num_keywords)
+
+    def _render_word_cloud_images(self, num_keywords: int, dir_path: str):
+        """
+        Generates the wordcloud images of all the topics with the given num_keywords and stores them inside \
+        the given folder. It's called by the WordCloudJobQueue, in it's background thread.
+        """
+        pretty_print('Generating and storing the wordcloud images with {} keywords'.format(num_keywords))
+        topics_frequencies = [{keyword.name: keyword.probability for keyword in topic.keywords}
+                              for topic in self.topics_model.get_topics(num_keywords)]
+        self.word_cloud_renderer.render(topics_frequencies, dir_path)
+
+    def submit_word_cloud_images_jobs(self, num_keywords_values: List[int] = None) -> List[WordCloudJob]:
+        """
+        Adds to the WordCloudJobQueue the jobs that generate the wordcloud images of all the topics with each
+        of the given numbers of keywords, without waiting for them. The images that have already been generated
+        aren't generated again.
+
+        :param num_keywords_values: Numbers of keywords of the images. If is None, the images with all the \
+        valid numbers of keywords (specified in the params file) are generated.
+        :return: The jobs that generate the images.
+        """
+        if num_keywords_values is None:
+            param_name = 'topics.wordcloud.num_keywords'
+            num_keywords_values = range(get_param(param_name + '.min'), get_param(param_name + '.max') + 1)
+
+        return [self.word_cloud_job_queue.submit(num_keywords) for num_keywords in num_keywords_values]
+
+    def clear_word_cloud_images(self):
+        """
+        Removes the wordcloud images generated for the topics model, so they are generated again (with the current
+        params of the WORDCLOUD section of the *-conf.ini file) the next time they are requested.
+        """
+        self.word_cloud_job_queue.clear()
+
+    def clear_word_cloud_jobs(self):
+        """
+        Forgets the wordcloud images generated until now, without removing them, so they are looked for on disk
+        the next time they are requested, and generated again if they have been removed by other process
+        (see clear_word_cloud_images()).
+        """
+        self.word_cloud_job_queue.clear_finished_jobs()
+
+    def build_word_cloud_images(self, num_keywords_values: List[int] = None):
+        """
+        Generates the wordcloud images of all the topics with each of the given numbers of keywords,
+        so they don't need to be generated when they are requested.
+
+        :param num_keywords_values: Numbers of keywords of the images. If is None, the images with all the \
+        valid numbers of keywords (specified in the params file) are generated.
+        """
+        # All the jobs are added to the queue first, and then the images of each one are waited
+        jobs = self.submit_word_cloud_images_jobs(num_keywords_values)
+        for job in jobs:
+            job.wait()
+            if not job.is_done():
+                raise Exception('The wordcloud images with {0} keywords couldn\'t be generated: {1}'
+                                .format(job.num_keywords, job.error))
+
     def _summarize_text(self, text: str, num_summary_sentences: int) -> Tuple[str, bool]:
         """
         Given a text and a number of sentences, this function tries to generate a summary of the text with \
         that number of sentences using the SummarizationModel.
 
         If the SummarizationModel doesn't converge, this function selects the first num_summary_sentences sentences \
-        as a summary.
+        as a summary. If the SummarizationModel is a TextRankSummarizer, the text is summarized with the
+        _summarize_texts() method, that doesn't raise an exception when the model doesn't converge.
 
         :param text: Text to be summarized.
         :param num_summary_sentences: Number of sentences of the summary.
@@ -200,6 +686,9 @@ class ModelsWrapper:
         contains the first num_summary_sentences sentences of the given text.
         """
 
+        if isinstance(self.summarization_model, TextRankSummarizer):
+            return self._summarize_texts([text], num_summary_sentences)[0]
+
         # Try to generate the summary using the summarization_model
         try:
             text_summary = self.summarization_model.get_k_best_sentences_of_text(text, num_summary_sentences)
@@ -215,6 +704,128 @@ class ModelsWrapper:
 
         return text_summary, summary_generated_with_the_model
 
+    def get_summarization_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with statistics about the summaries generated in the moment: the PageRank stats of the
+        TextRankSummarizer (including the texts summarized by the SummarizationPool) and the SummarizationPool stats.
+        Returns an empty dict if the SummarizationModel isn't a TextRankSummarizer.
+        """
+        if not isinstance(self.summarization_model, TextRankSummarizer):
+            return {}
+
+        stats = {'pagerank': self.summarization_model.get_stats()}
+        if self.summarization_pool is not None:
+            stats['pool'] = self.summarization_pool.get_stats()
+        return stats
+
+    def clear_summaries_cache(self):
+        """
+        Empties the SentenceVectorsCache of the TextRankSummarizer, and restarts the worker processes of the
+        SummarizationPool, so their caches are also emptied. The summaries generated in batch aren't removed.
+        """
+        if isinstance(self.summarization_model, TextRankSummarizer) and \
+                self.summarization_model.sentence_vectors_cache is not None:
+            self.summarization_model.sentence_vectors_cache.clear()
+        if self.summarization_pool is not None:
+            self.summarization_pool.restart()
+
+    def warm_summaries_cache(self, num_documents: int = None):
+        """
+        Summarizes the most representative documents of each topic, so the sentences and the sentences vectors
+        of the documents returned by get_k_most_repr_docs_of_topic() are already cached when they are requested.
+
+        :param num_documents: Number of documents of each topic. If is None, the default value is obtained \
+        from the params file.
+        """
+        for topic_id in range(self.topics_model.num_topics):
+            self.get_k_most_repr_docs_of_topic(topic_id, num_documents)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with the statistics of the summaries generated in the moment (see get_summarization_stats()),
+        the WordCloudJobQueue and the MalletInferencePool (if it exists).
+        """
+        stats = {
+            'summarization': self.get_summarization_stats(),
+            'word_cloud_jobs': self.word_cloud_job_queue.get_stats()
+        }
+        if self.mallet_inference_pool is not None:
+            stats['mallet_inference_pool'] = self.mallet_inference_pool.get_stats()
+        return stats
+
+    def _summarize_texts(self, texts: List[str], num_summary_sentences: int) -> List[Tuple[str, bool]]:
+        """
+        Given a list of texts and a number of sentences, this function generates a summary of each text with \
+        that number of sentences, in the same way as the _summarize_text() method.
+
+        If there are several texts and the SummarizationPool has been created, the texts are summarized in parallel
+        by it's worker processes. The texts that aren't summarized before the pool timeout are summarized with
+        their first num_summary_sentences sentences. Else, if the SummarizationModel is a TextRankSummarizer,
+        all the texts are summarized at once with it's vectorized batch method. Else, the texts are summarized
+        one by one.
+
+        :return: A list of tuples (summary, summary_generated_with_the_model), in the same order as the texts. \
+        See _summarize_text().
+        """
+        if self.summarization_pool is not None and len(texts) > 1:
+            texts_best_sentences = self.summarization_pool.get_k_best_sentences_of_texts(texts, num_summary_sentences)
+        elif isinstance(self.summarization_model, TextRankSummarizer):
+            texts_best_sentences = self.summarization_model.get_k_best_sentences_of_texts(texts,
+                                                                                          num_summary_sentences)
+        else:
+            return [self._summarize_text(text, num_summary_sentences) for text in texts]
+
+        texts_summaries = []
+        for text, text_best_sentences in zip(texts, texts_best_sentences):
+            if text_best_sentences is not None:
+                texts_summaries.append(('\n'.join(text_best_sentences), True))
+            else:
+                # If the SummarizationModel doesn't converge (or the SummarizationPool timeouts),
+                # select the first num_summary_sentences sentences as a summary
+                texts_summaries.append(('\n'.join(sent_tokenize(text)[:num_summary_sentences]), False))
+
+        return texts_summaries
+
+    def _iter_summarize_docs(self, docs_contents: List[str], num_summary_sentences: int, docs_ids: List[int] = None,
+                             chunk_size: int = None) -> Iterator[Tuple[str, bool]]:
+        """
+        Given the contents of some documents of the dataset and a number of sentences, this function returns
+        an iterator of the summaries of the documents, in the same order as the documents, each one as soon as
+        it's available: the summaries stored in the SummariesStore are returned immediately, and the summaries
+        that aren't stored are generated in the moment, in chunks of chunk_size documents, with the
+        _summarize_texts() method.
+
+        :param docs_contents: Original content of the documents.
+        :param num_summary_sentences: Number of sentences of the summaries.
+        :param docs_ids: Ids of the documents. If is None, they are obtained from the documents contents.
+        :param chunk_size: Max number of summaries generated at once. If is None, it's the number of workers \
+        of the SummarizationPool (so they are generated in parallel), or 1 if the pool hasn't been created.
+        :return: An iterator of tuples (summary, summary_generated_with_the_model). See _summarize_text().
+        """
+        if chunk_size is None:
+            chunk_size = self.summarization_pool.num_workers if self.summarization_pool is not None else 1
+        chunk_size = max(chunk_size, 1)
+
+        docs_summaries = [None] * len(docs_contents)
+        if self.summaries_store is not None:
+            for i, doc_content in enumerate(docs_contents):
+                doc_id = docs_ids[i] if docs_ids is not None else self.summaries_store.get_doc_id(doc_content)
+                docs_summaries[i] = self.summaries_store.get_summary(doc_id, num_summary_sentences)
+
+        for i, doc_summary in enumerate(docs_summaries):
+            if doc_summary is None:
+                # Generate the summaries of the next chunk_size documents without stored summary
+                not_stored_positions = [j for j in range(i, len(docs_summaries)) if docs_summaries[j] is None]
+                not_stored_positions = not_stored_positions[:chunk_size]
+                not_stored_summaries = self._summarize_texts([docs_contents[j] for j in not_stored_positions],
+                                                             num_summary_sentences)
+                for j, not_stored_summary in zip(not_stored_positions, not_stored_summaries):
+                    docs_summaries[j] = not_stored_summary
+
+            yield docs_summaries[i]
+            # The summaries already returned aren't needed anymore
+            docs_summaries[i] = None
+
     def get_k_most_repr_docs_of_topic(self, topic_id: int, num_documents: int = None) -> List['ReprDocOfTopicDTO']:
         """
         Given a topic-id and a number of documents, this function returns a List[ReprDocOfTopicDTO] with info
@@ -228,6 +839,25 @@ class ModelsWrapper:
         :param num_documents: Number of documents to be returned.
         :return: List[ReprDocOfTopicDTO] with the num_docs most representative documents of the given topic.
         """
+        k_most_repr_docs_of_topic_df = self._get_k_most_repr_docs_of_topic_df(topic_id, num_documents)
+        # Generate the summaries of all the documents at once
+        return list(self._iter_repr_docs_of_topic(k_most_repr_docs_of_topic_df,
+                                                  summaries_chunk_size=len(k_most_repr_docs_of_topic_df['Topic prob'])))
+
+    def iter_k_most_repr_docs_of_topic(self, topic_id: int, num_documents: int = None) -> Iterator['ReprDocOfTopicDTO']:
+        """
+        Iterator version of get_k_most_repr_docs_of_topic(). The params are checked (and the errors raised)
+        when this method is called, and each ReprDocOfTopicDTO is returned as soon as it's summary is available,
+        so the documents can be sent to the client while the rest of summaries are being generated.
+        """
+        k_most_repr_docs_of_topic_df = self._get_k_most_repr_docs_of_topic_df(topic_id, num_documents)
+        return self._iter_repr_docs_of_topic(k_most_repr_docs_of_topic_df)
+
+    def _get_k_most_repr_docs_of_topic_df(self, topic_id: int, num_documents: int = None) -> Dict[str, Any]:
+        """
+        Checks the params of get_k_most_repr_docs_of_topic() and returns the num_documents most representative
+        documents of the given topic, as a pandas DataFrame (or a dict with the same columns and a 'Doc id' column).
+        """
 
         # Check if the topic_id id has a valid value
         if topic_id < 0 or topic_id > self.topics_model.num_topics - 1:
@@ -250,31 +880,93 @@ class ModelsWrapper:
                 raise UserInvalidParamError('num_documents param must be in the range [{0},{1}]'
                                             .format(param_min_value, param_max_value))
 
-        # Obtain the num_documents most representative documents of the given topic as a pandas DataFrame
-        k_most_repr_docs_of_topic_df = self.topics_model.get_k_most_repr_docs_of_topic_as_df(topic_id, k=num_documents)
+        if self.docs_topics_index is not None:
+            # Obtain the num_documents most representative documents of the given topic from the DocsTopicsIndex
+            docs_ids, docs_topic_probs = self.docs_topics_index.get_most_repr_docs_of_topic(topic_id, num_documents)
+
+            # Dict with the same columns as the DataFrame returned by the topics model, plus the documents ids
+            docs_contents = self.get_docs_contents()
+            k_most_repr_docs_of_topic_df = {
+                'Doc id': docs_ids,
+                'Original doc text': [docs_contents[doc_id] for doc_id in docs_ids],
+                'Topic prob': docs_topic_probs.tolist()  # Convert numpy.float32 to float
+            }
+        else:
+            # Obtain the num_documents most representative documents of the given topic as a pandas DataFrame
+            k_most_repr_docs_of_topic_df = self.topics_model.get_k_most_repr_docs_of_topic_as_df(topic_id,
+                                                                                                 k=num_documents)
+
+        return k_most_repr_docs_of_topic_df
+
+    def _iter_repr_docs_of_topic(self, k_most_repr_docs_of_topic_df: Dict[str, Any],
+                                 summaries_chunk_size: int = None) -> Iterator['ReprDocOfTopicDTO']:
+        """
+        Generates the summaries of the documents returned by _get_k_most_repr_docs_of_topic_df() and returns
+        an iterator of ReprDocOfTopicDTO, in the same order as the documents.
 
+        :param summaries_chunk_size: Max number of summaries generated at once. See _iter_summarize_docs().
+        """
         # Obtain the num_summary_sentences param specific for the most representative documents
         num_summary_sentences = get_param('topics.documents.num_summary_sentences.default')
 
-        # Get the info from the df, generate the summaries and store each doc info inside a ReprDocOfTopicDTO object
-        repr_doc_of_topic_list = []
-        progress_bar = tqdm(range(num_documents))
+        # Generate the summaries of the documents in chunks of summaries_chunk_size documents
+        docs_contents = list(k_most_repr_docs_of_topic_df['Original doc text'])
+        docs_ids = [int(doc_id) for doc_id in k_most_repr_docs_of_topic_df['Doc id']] \
+            if 'Doc id' in k_most_repr_docs_of_topic_df else None
+        docs_summaries = self._iter_summarize_docs(docs_contents, num_summary_sentences, docs_ids,
+                                                   chunk_size=summaries_chunk_size)
+
+        # Get the info from the df and the summaries and return each doc info inside a ReprDocOfTopicDTO object
+        progress_bar = tqdm(range(len(docs_contents)))
         for i in progress_bar:
-            progress_bar.set_description('Selecting document content and generating summaries')
+            progress_bar.set_description('Selecting document content and summaries')
             # Obtain the document content
-            doc_content = k_most_repr_docs_of_topic_df['Original doc text'][i]
-            # Generate the document content summary
-            doc_content_summary, _ = self._summarize_text(doc_content, num_summary_sentences)
-            # In this function, the second value returned by _summarize_text() is not used,
-            # because here the summary of a document is something secondary/accessory, and it doesn't really
-            # matter if the summary was generated with the SummarizationModel or not.
+            doc_content = docs_contents[i]
+            # Obtain the document content summary
+            doc_content_summary, summary_generated_with_the_model = next(docs_summaries)
+            # In this function, the second value returned by _iter_summarize_docs() isn't included in the response,
+            # because here the summary of a document is something secondary/accessory, but it's used to avoid
+            # caching the responses whose summaries can be different in the next request.
 
             # Obtain the document-topic probability
             doc_topic_prob = k_most_repr_docs_of_topic_df['Topic prob'][i]
 
-            repr_doc_of_topic_list.append(ReprDocOfTopicDTO(doc_content, doc_content_summary, doc_topic_prob))
+            yield ReprDocOfTopicDTO(doc_content, doc_content_summary, doc_topic_prob,
+                                    summary_generated_with_the_model)
 
-        return repr_doc_of_topic_list
+    def _text_to_bow(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Preprocesses the given text in the same way as the documents of the dataset of the topics model,
+        and returns it in bag of words format: a list of tuples (word_id, word_count).
+        """
+        preprocessing_options = self.topics_model.dataset.preprocessing_options.as_dict()
+        preprocessed_text = preprocess_text(text, **preprocessing_options)
+        return self.topics_model.dictionary.doc2bow(preprocessed_text.split())
+
+    def _predict_topic_prob_on_text(self, text: str, num_best_topics: int = None) -> List[Tuple[int, float]]:
+        """
+        Returns the probability of each topic being related to the given text, sorted in descending order.
+        The topics are inferred with the in-process TopicsInferencer, with the MalletInferencePool or with the
+        topics model, depending on the INFERENCE.ENGINE param of the *-conf.ini file.
+
+        :param text: The text from which you want to calculate the probability of the topics.
+        :param num_best_topics: Number of topics to be returned. If is None, all the topics are returned.
+        :return: List of tuples (topic, probability).
+        """
+        if self.topics_inferencer is not None:
+            return self.topics_inferencer.predict_topic_prob(self._text_to_bow(text), num_best_topics=num_best_topics)
+
+        if self.mallet_inference_pool is not None:
+            topic_prob_list = self.mallet_inference_pool.infer(self._text_to_bow(text))
+            topic_prob_list = sorted(topic_prob_list, key=lambda topic_prob: topic_prob[1], reverse=True)
+            return topic_prob_list[:num_best_topics]
+
+        if self._mallet_inference is not None:
+            topic_prob_list = self._mallet_inference([self._text_to_bow(text)])[0]
+            topic_prob_list = sorted(topic_prob_list, key=lambda topic_prob: topic_prob[1], reverse=True)
+            return topic_prob_list[:num_best_topics]
+
+        return self.topics_model.predict_topic_prob_on_text(text, num_best_topics=num_best_topics, print_table=False)
 
     def get_text_related_topics(self, text: str, max_num_topics: int = None) -> List['TextTopicProbDTO']:
         """
@@ -300,8 +992,7 @@ class ModelsWrapper:
                                         .format(1, self.topics_model.num_topics))
 
         # Obtain the probability of each topic being related to the given text
-        topic_prob_list = self.topics_model.predict_topic_prob_on_text(text, num_best_topics=max_num_topics,
-                                                                       print_table=False)
+        topic_prob_list = self._predict_topic_prob_on_text(text, num_best_topics=max_num_topics)
 
         # Store the info of each topic in the topic_prob_list inside a TextTopicProbDTO object
         text_topic_prob_list = []
@@ -310,6 +1001,81 @@ class ModelsWrapper:
 
         return text_topic_prob_list
 
+    def _predict_topic_prob_on_bows(self, bows: List[List[Tuple[int, int]]],
+                                    num_best_topics: int = None) -> List[List[Tuple[int, float]]]:
+        """
+        Returns the probability of each topic being related to each of the given texts (in bag of words format),
+        sorted in descending order. The topics of all the texts are inferred in one pass: with one vectorized call
+        to the TopicsInferencer, or with one invocation of mallet (through the MalletInferencePool or the topics model).
+
+        :param bows: Texts preprocessed and transformed to bag of words format with _text_to_bow().
+        :param num_best_topics: Number of topics to be returned of each text. If is None, all the topics are returned.
+        :return: A list of tuples (topic, probability) for each text.
+        """
+        if len(bows) == 0:
+            return []
+
+        if self.topics_inferencer is not None:
+            return self.topics_inferencer.predict_topic_prob_batch(bows, num_best_topics=num_best_topics)
+
+        if self.mallet_inference_pool is not None:
+            topic_prob_lists = self.mallet_inference_pool.infer_batch(bows)
+        elif self._mallet_inference is not None:
+            topic_prob_lists = self._mallet_inference(bows)
+        else:
+            topic_prob_lists = self.topics_model.model[bows]
+
+        return [sorted(topic_prob_list, key=lambda topic_prob: topic_prob[1], reverse=True)[:num_best_topics]
+                for topic_prob_list in topic_prob_lists]
+
+    def get_texts_related_topics(self, texts: List[str], max_num_topics: int = None) -> List['TextRelatedTopicsDTO']:
+        """
+        Batch version of get_text_related_topics(). Given a list of texts and a max number of topics, this function
+        returns a List[TextRelatedTopicsDTO], in the same order as the texts, with the probability of the topics
+        being related with each text. The topics of all the texts are inferred in one pass.
+
+        The errors of a text (for example, if it isn't a str) don't affect the rest of texts: they are stored
+        in the error attribute of the TextRelatedTopicsDTO of that text.
+
+        :param texts: The texts from which you want to calculate the probability of the topics. \
+        The max number of texts is specified in the text.batch.num_texts.max param of the params file.
+        :param max_num_topics: Max number of topics to be returned of each text. The number of TextTopicProbDTO \
+        objects of each text is the min(max_num_topics, topics_model.num_topics).
+        :return: List[TextRelatedTopicsDTO] with the probability of the topics being related with each text.
+        """
+
+        # If max_num_topics has value, check if it's inside the valid range
+        if max_num_topics is not None and (max_num_topics < 1 or max_num_topics > self.topics_model.num_topics):
+            raise UserInvalidParamError('max_num_topics param must be in the range [{0},{1}]'
+                                        .format(1, self.topics_model.num_topics))
+
+        max_num_texts = get_param('text.batch.num_texts.max')
+        if len(texts) > max_num_texts:
+            raise UserInvalidParamError('The number of texts must be less than or equal to {0}'.format(max_num_texts))
+
+        # Preprocess each text. The texts that can't be preprocessed store the error in their DTO.
+        texts_related_topics = [TextRelatedTopicsDTO() for _ in texts]
+        valid_texts_related_topics = []
+        bows = []
+        for text, text_related_topics in zip(texts, texts_related_topics):
+            if not isinstance(text, str):
+                text_related_topics.error = 'text must be a str'
+                continue
+            try:
+                bows.append(self._text_to_bow(text))
+                valid_texts_related_topics.append(text_related_topics)
+            except Exception as err:
+                text_related_topics.error = 'text couldn\'t be processed: {0}'.format(err)
+
+        # Obtain the probability of each topic being related to each valid text, in one pass
+        topic_prob_lists = self._predict_topic_prob_on_bows(bows, num_best_topics=max_num_topics)
+
+        for text_related_topics, topic_prob_list in zip(valid_texts_related_topics, topic_prob_lists):
+            text_related_topics.topics = [TextTopicProbDTO(topic=topic_prob[0], text_topic_prob=topic_prob[1])
+                                          for topic_prob in topic_prob_list]
+
+        return texts_related_topics
+
     def get_text_related_docs(self, text: str, num_documents: int = None) -> List['TextRelatedDocDTO']:
         """
         Given a text and a number of documents, this function returns a List[TextRelatedDocDTO] with info
@@ -325,6 +1091,25 @@ class ModelsWrapper:
         :param num_documents: Number of documents to be returned.
         :return: List[TextRelatedDocDTO] with info about the documents of the dataset more related with the given text.
         """
+        related_docs_df = self._get_text_related_docs_df(text, num_documents)
+        # Generate the summaries of all the documents at once
+        return list(self._iter_text_related_docs(related_docs_df,
+                                                 summaries_chunk_size=len(related_docs_df['Doc prob'])))
+
+    def iter_text_related_docs(self, text: str, num_documents: int = None) -> Iterator['TextRelatedDocDTO']:
+        """
+        Iterator version of get_text_related_docs(). The params are checked (and the errors raised)
+        when this method is called, and each TextRelatedDocDTO is returned as soon as it's summary is available,
+        so the documents can be sent to the client while the rest of summaries are being generated.
+        """
+        related_docs_df = self._get_text_related_docs_df(text, num_documents)
+        return self._iter_text_related_docs(related_docs_df)
+
+    def _get_text_related_docs_df(self, text: str, num_documents: int = None) -> Dict[str, Any]:
+        """
+        Checks the params of get_text_related_docs() and returns the num_documents most related documents
+        to the given text, as a pandas DataFrame (or a dict with the same columns and a 'Doc id' column).
+        """
 
         # Obtain the params values from the params file
         param_name = 'text.num_related_documents'
@@ -340,33 +1125,63 @@ class ModelsWrapper:
                 raise UserInvalidParamError('num_documents param must be in the range [{0},{1}]'
                                             .format(param_min_value, param_max_value))
 
-        # Obtain the num_documents most related documents to the given text as a pandas DataFrame
-        related_docs_df = self.topics_model.get_related_docs_as_df(text, num_docs=num_documents)
+        if self.docs_topics_index is not None:
+            # Obtain the num_documents most related documents to the given text from the DocsTopicsIndex
+            text_topics = np.zeros(self.topics_model.num_topics, dtype=np.float32)
+            for topic, topic_prob in self._predict_topic_prob_on_text(text):
+                text_topics[topic] = topic_prob
+            docs_ids, docs_probs, docs_topics = self.docs_topics_index.get_related_docs(text_topics, num_documents)
+
+            # Dict with the same columns as the DataFrame returned by the topics model, plus the documents ids
+            docs_contents = self.get_docs_contents()
+            related_docs_df = {
+                'Doc id': docs_ids,
+                'Original doc text': [docs_contents[doc_id] for doc_id in docs_ids],
+                'Doc prob': docs_probs.tolist(),  # Convert numpy.float32 to float
+                'Topic index': docs_topics
+            }
+        else:
+            # Obtain the num_documents most related documents to the given text as a pandas DataFrame
+            related_docs_df = self.topics_model.get_related_docs_as_df(text, num_docs=num_documents)
+
+        return related_docs_df
+
+    def _iter_text_related_docs(self, related_docs_df: Dict[str, Any],
+                                summaries_chunk_size: int = None) -> Iterator['TextRelatedDocDTO']:
+        """
+        Generates the summaries of the documents returned by _get_text_related_docs_df() and returns
+        an iterator of TextRelatedDocDTO, in the same order as the documents.
 
+        :param summaries_chunk_size: Max number of summaries generated at once. See _iter_summarize_docs().
+        """
         # Obtain the num_summary_sentences param specific for the related documents
         num_summary_sentences = get_param('topics.documents.num_summary_sentences.default')
 
-        # Get the info from the df, generate the summaries and store each doc info inside a TextRelatedDocDTO object
-        text_related_doc_list = []
-        progress_bar = tqdm(range(num_documents))
+        # Generate the summaries of the documents in chunks of summaries_chunk_size documents
+        docs_contents = list(related_docs_df['Original doc text'])
+        docs_ids = [int(doc_id) for doc_id in related_docs_df['Doc id']] if 'Doc id' in related_docs_df else None
+        docs_summaries = self._iter_summarize_docs(docs_contents, num_summary_sentences, docs_ids,
+                                                   chunk_size=summaries_chunk_size)
+
+        # Get the info from the df and the summaries and return each doc info inside a TextRelatedDocDTO object
+        progress_bar = tqdm(range(len(docs_contents)))
         for i in progress_bar:
-            progress_bar.set_description('Selecting document content and generating summaries')
+            progress_bar.set_description('Selecting document content and summaries')
             # Obtain the document content
-            doc_content = related_docs_df['Original doc text'][i]
-            # Generate the document content summary
-            doc_content_summary, _ = self._summarize_text(doc_content, num_summary_sentences)
-            # In this function, the second value returned by _summarize_text() is not used,
-            # because here the summary of a document is something secondary/accessory, and it doesn't really
-            # matter if the summary was generated with the SummarizationModel or not.
+            doc_content = docs_contents[i]
+            # Obtain the document content summary
+            doc_content_summary, summary_generated_with_the_model = next(docs_summaries)
+            # In this function, the second value returned by _iter_summarize_docs() isn't included in the response,
+            # because here the summary of a document is something secondary/accessory, but it's used to avoid
+            # caching the responses whose summaries can be different in the next request.
 
             # Obtain the document-text probability
             doc_text_prob = related_docs_df['Doc prob'][i]
             # Obtain the dominant topic of the document
             doc_topic = int(related_docs_df['Topic index'][i])  # Convert numpy.int64 to int
 
-            text_related_doc_list.append(TextRelatedDocDTO(doc_content, doc_content_summary, doc_text_prob, doc_topic))
-
-        return text_related_doc_list
+            yield TextRelatedDocDTO(doc_content, doc_content_summary, doc_text_prob, doc_topic,
+                                    summary_generated_with_the_model)
 
     def get_text_summary(self, text: str, num_summary_sentences: int = None) -> 'TextSummaryDTO':
         """
@@ -408,9 +1223,10 @@ class TopicImageUrlDTO:
     The apis/user module will use this class to access the info returned by get_topics_word_cloud_images_urls().
     """
 
-    def __init__(self, topic: int, image_url: str):
+    def __init__(self, topic: int, image_url: str, image_srcset: str):
         self.topic = topic
         self.image_url = image_url
+        self.image_srcset = image_srcset
 
 
 class ReprDocOfTopicDTO:
@@ -422,10 +1238,18 @@ class ReprDocOfTopicDTO:
     The apis/user module will use this class to access the info returned by get_k_most_repr_docs_of_topic().
     """
 
-    def __init__(self, doc_content: str, doc_content_summary: str, doc_topic_prob: float):
+    def __init__(self, doc_content: str, doc_content_summary: str, doc_topic_prob: float,
+                 summary_generated_with_the_model: bool = True):
         self.doc_content = doc_content
         self.doc_content_summary = doc_content_summary
         self.doc_topic_prob = doc_topic_prob
+        # False if the summary contains the first sentences of the document, because the SummarizationModel didn't
+        # converge or the SummarizationPool didn't summarize the document in time. It isn't included in the responses
+        self._summary_generated_with_the_model = summary_generated_with_the_model
+
+    @property
+    def summary_generated_with_the_model(self) -> bool:
+        return self._summary_generated_with_the_model
 
 
 class TextTopicProbDTO:
@@ -442,6 +1266,21 @@ class TextTopicProbDTO:
         self.text_topic_prob = text_topic_prob
 
 
+class TextRelatedTopicsDTO:
+    """
+    DTO that stores the information about the topics related with one of the texts of a batch.
+    If the text couldn't be processed, topics is None and error contains the reason.
+
+    Instances of this class are created inside the get_texts_related_topics() method.
+
+    The apis/user module will use this class to access the info returned by get_texts_related_topics().
+    """
+
+    def __init__(self, topics: List[TextTopicProbDTO] = None, error: str = None):
+        self.topics = topics
+        self.error = error
+
+
 class TextRelatedDocDTO:
     """
     DTO that stores the information about one of the related documents of a given text.
@@ -451,11 +1290,18 @@ class TextRelatedDocDTO:
     The apis/user module will use this class to access the info returned by get_text_related_docs().
     """
 
-    def __init__(self, doc_content: str, doc_content_summary: str, doc_text_prob: float, doc_topic: int):
+    def __init__(self, doc_content: str, doc_content_summary: str, doc_text_prob: float, doc_topic: int,
+                 summary_generated_with_the_model: bool = True):
         self.doc_content = doc_content
         self.doc_content_summary = doc_content_summary
         self.doc_text_prob = doc_text_prob
         self.doc_topic = doc_topic
+        # See ReprDocOfTopicDTO. It isn't included in the responses
+        self._summary_generated_with_the_model = summary_generated_with_the_model
+
+    @property
+    def summary_generated_with_the_model(self) -> bool:
+        return self._summary_generated_with_the_model
 
 
 class TextSummaryDTO:
@@ -0,0 +1,259 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+if TYPE_CHECKING:
+    # Only imported for the type hints, because it imports the (heavy) models libraries
+    from web_backend.wrapper.models_wrapper import ModelsWrapper
+
+
+class ModelsWrapperNotReadyError(Exception):
+    """
+    Exception raised when the ModelsWrapper is requested but it hasn't been loaded yet (or it's load has failed).
+
+    The exception contains a message attribute and a retry_after attribute, with the number of seconds
+    after which the ModelsWrapper may be ready.
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        """
+        :param message: Message of the Error.
+        :param retry_after: Number of seconds after which the ModelsWrapper may be ready.
+        """
+        self.message = message
+        self.retry_after = retry_after
+
+
+class ModelsWrapperLoader:
+    """
+    Loads a ModelsWrapper in a background thread, so the application can answer requests while the models
+    are being loaded (it can take some minutes).
+
+    The loader has the following states:
+
+    * **not_started**: The start() method hasn't been called yet.
+    * **loading**: The ModelsWrapper is being loaded. The get_status() method returns the loading progress.
+    * **ready**: The ModelsWrapper has been loaded, and the get() method returns it.
+    * **failed**: An error happened while loading the ModelsWrapper.
+
+    A loaded ModelsWrapper can be replaced with reload(), that loads a new one in the background while the
+    current one keeps answering the requests.
+
+    The requests obtain the ModelsWrapper with acquire() and return it with release(), so the ModelsWrappers that
+    aren't used anymore (the ones replaced by reload(), or all of them after close()) are closed
+    (see ModelsWrapper.close()) when the last request that uses them finishes, and their memory can be freed.
+    """
+
+    NOT_STARTED = 'not_started'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, models_wrapper_factory: Callable[..., 'ModelsWrapper'], retry_after: int = 10):
+        """
+        :param models_wrapper_factory: Function (or ModelsWrapper subclass) that creates the ModelsWrapper. \
+        It must accept a progress_callback keyword argument.
+        :param retry_after: Number of seconds that clients should wait before retrying a request \
+        while the ModelsWrapper is loading.
+        """
+        self._models_wrapper_factory = models_wrapper_factory
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._state = self.NOT_STARTED
+        self._models_wrapper: 'ModelsWrapper' = None
+        self._completed_stages: List[str] = []
+        self._current_stage: str = None
+        self._error: str = None
+        self._start_time: float = None
+        self._end_time: float = None
+        self._thread: threading.Thread = None
+        self._reloading = False
+        self._num_reloads = 0
+        # Dict id of a ModelsWrapper -> number of users that have acquired it and haven't released it yet
+        self._num_users: Dict[int, int] = {}
+        self._closed = False
+
+    def start(self):
+        """
+        Starts loading the ModelsWrapper in a background thread. If it has already been started, does nothing.
+        """
+        with self._lock:
+            if self._state != self.NOT_STARTED:
+                return
+            self._state = self.LOADING
+            self._start_time = time.time()
+
+            self._thread = threading.Thread(target=self._load, name='ModelsWrapperLoader', daemon=True)
+        self._thread.start()
+
+    def reload(self) -> bool:
+        """
+        Starts loading a new ModelsWrapper in a background thread. Until it's loaded, get() returns the current one
+        (if any). If the new one fails to load, the current one is kept.
+
+        :return: False if a load or a reload is already in progress (and a new one isn't started), else True.
+        """
+        with self._lock:
+            if self._state == self.LOADING or self._reloading:
+                return False
+            if self._state == self.READY:
+                self._reloading = True
+            else:
+                self._state = self.LOADING
+            self._completed_stages = []
+            self._current_stage = None
+            self._error = None
+            self._start_time = time.time()
+            self._end_time = None
+
+            self._thread = threading.Thread(target=self._load, name='ModelsWrapperLoader', daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until the current load (or reload) finishes, or until timeout seconds have elapsed.
+
+        :return: True if the ModelsWrapper is ready and no reload is in progress.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            return self._state == self.READY and not self._reloading
+
+    def _load(self):
+        """
+        Creates the ModelsWrapper. It's executed in the background thread.
+        """
+        try:
+            models_wrapper = self._models_wrapper_factory(progress_callback=self._on_progress)
+        except Exception as err:
+            with self._lock:
+                # If it was a reload, the current ModelsWrapper is kept
+                if not self._reloading:
+                    self._state = self.FAILED
+                self._reloading = False
+                self._error = repr(err)
+                self._end_time = time.time()
+            # The exception is raised, so it's traceback is printed in the logs
+            raise
+
+        with self._lock:
+            if self._reloading:
+                self._num_reloads += 1
+            self._reloading = False
+            replaced_models_wrapper = self._models_wrapper
+            self._models_wrapper = models_wrapper
+            self._state = self.READY
+            if self._current_stage is not None:
+                self._completed_stages.append(self._current_stage)
+            self._current_stage = None
+            self._end_time = time.time()
+
+            # The replaced ModelsWrapper is closed now if no request is using it, or when the last one releases it.
+            # If the loader has been closed while loading, the new ModelsWrapper isn't going to be used.
+            models_wrappers_to_close = []
+            if replaced_models_wrapper is not None and id(replaced_models_wrapper) not in self._num_users:
+                models_wrappers_to_close.append(replaced_models_wrapper)
+            if self._closed:
+                models_wrappers_to_close.append(models_wrapper)
+        for models_wrapper_to_close in models_wrappers_to_close:
+            models_wrapper_to_close.close()
+
+    def _on_progress(self, stage: str):
+        """
+        Called by the ModelsWrapper each time it starts a new loading stage.
+        """
+        with self._lock:
+            if self._current_stage is not None:
+                self._completed_stages.append(self._current_stage)
+            self._current_stage = stage
+
+    def is_ready(self) -> bool:
+        """
+        Returns True if the ModelsWrapper has been loaded.
+        """
+        return self._state == self.READY
+
+    def has_failed(self, min_seconds: float = 0) -> bool:
+        """
+        Returns True if the load of the ModelsWrapper has failed at least min_seconds seconds ago.
+        """
+        with self._lock:
+            return self._state == self.FAILED and time.time() - self._end_time >= min_seconds
+
+    def get(self) -> 'ModelsWrapper':
+        """
+        Returns the ModelsWrapper. If it hasn't been loaded yet, raises a ModelsWrapperNotReadyError.
+        The ModelsWrapper may be closed while it's used. Use acquire() to prevent it.
+        """
+        if self._state == self.READY:
+            return self._models_wrapper
+
+        if self._state == self.FAILED:
+            raise ModelsWrapperNotReadyError('The models couldn\'t be loaded.', self.retry_after)
+        raise ModelsWrapperNotReadyError('The models are being loaded. Try again later.', self.retry_after)
+
+    def acquire(self) -> 'ModelsWrapper':
+        """
+        Returns the ModelsWrapper, like get(), and prevents it from being closed until release() is called with it.
+
+        :raises ModelsWrapperNotReadyError: If the ModelsWrapper hasn't been loaded yet.
+        """
+        with self._lock:
+            models_wrapper = self.get()
+            self._num_users[id(models_wrapper)] = self._num_users.get(id(models_wrapper), 0) + 1
+            return models_wrapper
+
+    def release(self, models_wrapper: 'ModelsWrapper'):
+        """
+        Returns a ModelsWrapper obtained with acquire(). If it's the last user of a ModelsWrapper that has been
+        replaced by reload(), or the loader has been closed, the ModelsWrapper is closed.
+        """
+        with self._lock:
+            self._num_users[id(models_wrapper)] -= 1
+            if self._num_users[id(models_wrapper)] > 0:
+                return
+            del self._num_users[id(models_wrapper)]
+            if models_wrapper is self._models_wrapper and not self._closed:
+                return
+        models_wrapper.close()
+
+    def close(self):
+        """
+        Closes the current ModelsWrapper (see ModelsWrapper.close()) when the requests that use it release it,
+        or now if it isn't used. If a load is in progress, the loaded ModelsWrapper is closed when it finishes.
+        It's called when the loader isn't going to be used anymore.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            models_wrapper = self._models_wrapper
+            if models_wrapper is None or id(models_wrapper) in self._num_users:
+                return
+        models_wrapper.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Returns a dict with the state of the loader and the loading progress.
+        """
+        with self._lock:
+            if self._start_time is None:
+                elapsed_seconds = 0
+            else:
+                elapsed_seconds = (self._end_time or time.time()) - self._start_time
+
+            return {
+                'state': self._state,
+                'ready': self._state == self.READY,
+                'completed_stages': list(self._completed_stages),
+                'current_stage': self._current_stage,
+                'elapsed_seconds': round(elapsed_seconds, 3),
+                'error': self._error,
+                'reloading': self._reloading,
+                'num_reloads': self._num_reloads
+            }
@@ -0,0 +1,295 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from web_backend.utils import ReplacingFilesWriter, join_paths
+
+
+def get_sentence_digest(sentence: str) -> bytes:
+    """
+    Returns a 16 bytes digest of the given sentence. It's used as the key of the sentence in the caches.
+    """
+    return hashlib.blake2b(sentence.encode('utf-8'), digest_size=16).digest()
+
+
+def _get_digests_array(digests: List[bytes]) -> np.ndarray:
+    """
+    Returns an array of shape (len(digests), 16) with the bytes of the given digests.
+    """
+    return np.frombuffer(b''.join(digests), dtype=np.uint8).reshape(-1, 16)
+
+
+class SentenceVectorsStore:
+    """
+    Compact on-disk store with the vectors of all the sentences of the documents of a dataset, generated in batch.
+
+    The store is a folder with the following files:
+
+    * **digests.npy**: Array with the digest of each sentence (16 bytes, viewed as a void type), sorted, \
+      so a sentence is found with a binary search.
+    * **vectors.npy**: float32 array of shape (num_sentences, vectors_size), where the row i contains \
+      the vector of the sentence i.
+
+    Both files are memory-mapped read-only when the store is loaded, so the vectors aren't loaded into memory,
+    and all the processes that load the same store share the same pages through the OS page cache.
+
+    The vectors depend on the word embeddings, so the store must be generated again if they change.
+    """
+
+    _DIGESTS_FILE_NAME = 'digests.npy'
+    _VECTORS_FILE_NAME = 'vectors.npy'
+    _DIGEST_DTYPE = np.dtype('V16')
+
+    def __init__(self, dir_path: str):
+        """
+        Loads (memory-maps) the store stored in the given folder.
+
+        :param dir_path: Path to the folder of the store.
+        """
+        self.dir_path = dir_path
+
+        self.digests = np.load(join_paths(dir_path, self._DIGESTS_FILE_NAME), mmap_mode='r')
+        self.vectors = np.load(join_paths(dir_path, self._VECTORS_FILE_NAME), mmap_mode='r')
+        self.num_sentences, self.vectors_size = self.vectors.shape
+
+    @classmethod
+    def load(cls, dir_path: str) -> Optional['SentenceVectorsStore']:
+        """
+        Loads the store stored in the given folder. If the folder doesn't exist, returns None.
+        """
+        if not os.path.exists(join_paths(dir_path, cls._DIGESTS_FILE_NAME)):
+            return None
+        return cls(dir_path)
+
+    @classmethod
+    def build(cls, dir_path: str, texts_sentences: Iterable[List[str]],
+              get_sentences_vectors_func: Callable[[List[str]], np.ndarray],
+              vectors_size: int) -> 'SentenceVectorsStore':
+        """
+        Obtains the vectors of all the different sentences of the given texts and stores them in the given folder.
+
+        The vectors are written to a temporary file while they are obtained, so they are never fully
+        loaded into memory.
+
+        :param dir_path: Path to the folder where the store will be saved. It's created if it doesn't exist.
+        :param texts_sentences: Iterable with the sentences of each text.
+        :param get_sentences_vectors_func: Function that given a list of sentences returns a float32 array \
+        of shape (num_sentences, vectors_size) with their vectors.
+        :param vectors_size: Size of the vectors.
+        :return: The store loaded from the given folder.
+        """
+        os.makedirs(dir_path, exist_ok=True)
+        tmp_vectors_file_path = join_paths(dir_path, '.vectors.tmp')
+
+        digests: List[bytes] = []
+        stored_digests = set()
+        with open(tmp_vectors_file_path, 'wb') as tmp_vectors_file:
+            progress_bar = tqdm(texts_sentences)
+            progress_bar.set_description('Obtaining the sentences vectors')
+            for text_sentences in progress_bar:
+                new_sentences = []
+                for sentence in text_sentences:
+                    digest = get_sentence_digest(sentence)
+                    if digest not in stored_digests:
+                        stored_digests.add(digest)
+                        digests.append(digest)
+                        new_sentences.append(sentence)
+                if new_sentences:
+                    tmp_vectors_file.write(np.asarray(get_sentences_vectors_func(new_sentences),
+                                                      dtype=np.float32).tobytes())
+
+        # Sort the digests, and the vectors in the same order
+        digests_array = _get_digests_array(digests).view(cls._DIGEST_DTYPE).ravel()
+        order = np.argsort(digests_array, kind='stable')
+
+        if len(digests) > 0:
+            tmp_vectors = np.memmap(tmp_vectors_file_path, dtype=np.float32, mode='r',
+                                    shape=(len(digests), vectors_size))
+        else:
+            # np.memmap can't map empty files
+            tmp_vectors = np.empty((0, vectors_size), dtype=np.float32)
+        # The files are written with temporary names and then renamed, so the files of a previous store in the
+        # same folder aren't overwritten while they are memory-mapped (by this or other processes)
+        with ReplacingFilesWriter(dir_path) as files_writer:
+            vectors = np.lib.format.open_memmap(files_writer.get_tmp_file_path(cls._VECTORS_FILE_NAME), mode='w+',
+                                                dtype=np.float32, shape=(len(digests), vectors_size))
+            vectors[:] = tmp_vectors[order]
+            vectors.flush()
+            del vectors, tmp_vectors
+            os.remove(tmp_vectors_file_path)
+
+            # The digests file is replaced the last, because it's existence marks the store as complete
+            with files_writer.open(cls._DIGESTS_FILE_NAME) as digests_file:
+                np.save(digests_file, digests_array[order])
+
+        return cls(dir_path)
+
+    def get_vectors(self, digests: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a tuple (vectors, found). vectors is a float32 array of shape (len(digests), vectors_size)
+        with the vectors of the sentences with the given digests, and found is a bool array that is False
+        for the sentences that aren't in the store (their vectors are zeros).
+        """
+        vectors = np.zeros((len(digests), self.vectors_size), dtype=np.float32)
+        found = np.zeros(len(digests), dtype=bool)
+        if len(digests) == 0 or self.num_sentences == 0:
+            return vectors, found
+
+        digests_array = _get_digests_array(digests).view(self._DIGEST_DTYPE).ravel()
+        positions = np.minimum(np.searchsorted(self.digests, digests_array), self.num_sentences - 1)
+        found = self.digests[positions] == digests_array
+
+        vectors[found] = self.vectors[positions[found]]
+        return vectors, found
+
+
+class SentenceVectorsCache:
+    """
+    Bounded in-memory cache of the sentences of the texts and the vectors of the sentences, used by the
+    TextRankSummarizer, so the texts summarized several times (like the documents of the dataset) aren't split
+    into sentences again, and the vectors of the repeated sentences (quoted in several documents) aren't
+    obtained again from their words.
+
+    * The sentences of each text are cached by the digest of the text, up to max_num_texts texts.
+    * The vectors are cached by the digest of the sentence, up to max_num_sentences sentences. They are stored \
+      in a preallocated float32 array, and the cache only keeps the position of each sentence inside it.
+
+    Both caches evict the least recently used elements. Optionally, the vectors are searched first in a
+    SentenceVectorsStore, with the vectors of all the sentences of the dataset generated in batch.
+    The cache is thread-safe.
+    """
+
+    def __init__(self, vectors_size: int, max_num_sentences: int = 100000, max_num_texts: int = 10000,
+                 sentence_vectors_store: SentenceVectorsStore = None):
+        """
+        :param vectors_size: Size of the vectors of the sentences.
+        :param max_num_sentences: Max number of sentences vectors stored in memory. If is 0, the vectors \
+        are only obtained from the sentence_vectors_store.
+        :param max_num_texts: Max number of texts whose sentences are stored. If is 0, they aren't stored.
+        :param sentence_vectors_store: Store with the vectors generated in batch, or None.
+        """
+        self.vectors_size = vectors_size
+        self.max_num_sentences = max_num_sentences
+        self.max_num_texts = max_num_texts
+        self.sentence_vectors_store = sentence_vectors_store
+
+        self._lock = threading.Lock()
+        # The pages of the array are only allocated by the OS when they are written
+        self._vectors = np.zeros((max_num_sentences, vectors_size), dtype=np.float32)
+        # Dicts that map each digest to the position of it's vector in the array, and to the sentences of a text
+        self._vector_position_by_digest: 'OrderedDict[bytes, int]' = OrderedDict()
+        self._sentences_by_digest: 'OrderedDict[bytes, Tuple[str, ...]]' = OrderedDict()
+        self._stats = {'num_texts': 0, 'num_cached_texts': 0, 'num_sentences': 0, 'num_cached_sentences': 0,
+                       'num_stored_sentences': 0}
+
+    def get_texts_sentences(self, texts: List[str], tokenize_func: Callable[[str], List[str]]) -> List[List[str]]:
+        """
+        Returns the sentences of each of the given texts. The texts that aren't cached are split into sentences
+        with tokenize_func (for example, the nltk sent_tokenize() function).
+        """
+        digests = [get_sentence_digest(text) for text in texts]
+        texts_sentences: List[Optional[List[str]]] = [None] * len(texts)
+        with self._lock:
+            for i, digest in enumerate(digests):
+                sentences = self._sentences_by_digest.get(digest)
+                if sentences is not None:
+                    self._sentences_by_digest.move_to_end(digest)
+                    texts_sentences[i] = list(sentences)
+            self._stats['num_texts'] += len(texts)
+            self._stats['num_cached_texts'] += sum(sentences is not None for sentences in texts_sentences)
+
+        for i, text in enumerate(texts):
+            if texts_sentences[i] is None:
+                texts_sentences[i] = tokenize_func(text)
+                if self.max_num_texts > 0:
+                    with self._lock:
+                        self._sentences_by_digest[digests[i]] = tuple(texts_sentences[i])
+                        self._sentences_by_digest.move_to_end(digests[i])
+                        if len(self._sentences_by_digest) > self.max_num_texts:
+                            self._sentences_by_digest.popitem(last=False)
+
+        return texts_sentences
+
+    def get_sentences_vectors(self, sentences: List[str],
+                              get_sentences_vectors_func: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Returns a float32 array of shape (len(sentences), vectors_size) with the vectors of the given sentences.
+        The vectors that aren't in the store or in the cache are obtained with get_sentences_vectors_func, all
+        of them at once, and are added to the cache.
+        """
+        digests = [get_sentence_digest(sentence) for sentence in sentences]
+        if self.sentence_vectors_store is not None:
+            vectors, found = self.sentence_vectors_store.get_vectors(digests)
+        else:
+            vectors = np.zeros((len(sentences), self.vectors_size), dtype=np.float32)
+            found = np.zeros(len(sentences), dtype=bool)
+        num_stored = int(np.sum(found))
+
+        with self._lock:
+            for i in np.flatnonzero(~found):
+                position = self._vector_position_by_digest.get(digests[i])
+                if position is not None:
+                    self._vector_position_by_digest.move_to_end(digests[i])
+                    vectors[i] = self._vectors[position]
+                    found[i] = True
+            self._stats['num_sentences'] += len(sentences)
+            self._stats['num_stored_sentences'] += num_stored
+            self._stats['num_cached_sentences'] += int(np.sum(found)) - num_stored
+
+        # The repeated sentences are only computed once
+        missing_positions_by_digest: Dict[bytes, List[int]] = OrderedDict()
+        for i in np.flatnonzero(~found):
+            missing_positions_by_digest.setdefault(digests[i], []).append(i)
+        if not missing_positions_by_digest:
+            return vectors
+
+        missing_sentences = [sentences[positions[0]] for positions in missing_positions_by_digest.values()]
+        missing_vectors = get_sentences_vectors_func(missing_sentences)
+        for missing_vector, positions in zip(missing_vectors, missing_positions_by_digest.values()):
+            vectors[positions] = missing_vector
+
+        if self.max_num_sentences > 0:
+            with self._lock:
+                for digest, missing_vector in zip(missing_positions_by_digest, missing_vectors):
+                    self._put_vector(digest, missing_vector)
+
+        return vectors
+
+    def _put_vector(self, digest: bytes, vector: np.ndarray):
+        """
+        Adds the vector of a sentence to the cache. If it's full, the position of the least recently used
+        vector is reused. Must be called with the lock acquired.
+        """
+        position = self._vector_position_by_digest.get(digest)
+        if position is None:
+            if len(self._vector_position_by_digest) < self.max_num_sentences:
+                position = len(self._vector_position_by_digest)
+            else:
+                _, position = self._vector_position_by_digest.popitem(last=False)
+            self._vector_position_by_digest[digest] = position
+        self._vector_position_by_digest.move_to_end(digest)
+        self._vectors[position] = vector
+
+    def clear(self):
+        """
+        Removes all the cached sentences and vectors. The statistics are kept.
+        """
+        with self._lock:
+            self._vector_position_by_digest.clear()
+            self._sentences_by_digest.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns a dict with the number of requested texts and sentences, the number of them found in the cache,
+        the number of sentences found in the store, and the current number of cached texts and sentences.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cache_num_texts'] = len(self._sentences_by_digest)
+            stats['cache_num_sentences'] = len(self._vector_position_by_digest)
+        return stats
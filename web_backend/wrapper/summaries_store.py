@@ -0,0 +1,156 @@
+import hashlib
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from web_backend.utils import ReplacingFilesWriter, join_paths
+
+
+def get_doc_digest(doc_content: str) -> bytes:
+    """
+    Returns a 16 bytes digest of the given document content. It's used to identify a document by it's content.
+    """
+    return hashlib.blake2b(doc_content.encode('utf-8'), digest_size=16).digest()
+
+
+class SummariesStore:
+    """
+    Compact on-disk store with the summaries of all the documents of a dataset, generated in batch.
+
+    Summaries are stored by document id (position of the document in the topics model corpus) and by
+    num_summary_sentences. The store is a folder with the following files:
+
+    * **docs-digests.npy**: Digest of the content of each document. Used to obtain the id of a document \
+      given it's content.
+    * **<n>sentences-summaries.bin**: Summaries with n sentences of all the documents, encoded in UTF-8, \
+      one after other.
+    * **<n>sentences-offsets.npy**: Array with num_docs + 1 offsets. The summary of the document with id i \
+      is stored in the bytes [offsets[i], offsets[i+1]) of the .bin file.
+    * **<n>sentences-generated-with-model.npy**: For each document, 1 if the summary was generated with \
+      the SummarizationModel, 0 if it contains the first n sentences of the document and -1 if there is no summary.
+
+    All the files are memory-mapped when the store is loaded, so the summaries aren't loaded into memory.
+    """
+
+    _DOCS_DIGESTS_FILE_NAME = 'docs-digests.npy'
+    _MISSING_SUMMARY = -1
+
+    def __init__(self, dir_path: str):
+        """
+        Loads (memory-maps) the store stored in the given folder.
+
+        :param dir_path: Path to the folder of the store.
+        """
+        self.dir_path = dir_path
+
+        docs_digests = np.load(join_paths(dir_path, self._DOCS_DIGESTS_FILE_NAME))
+        # Dict that maps the digest of each document content to the document id
+        self._doc_id_by_digest = {digest.tobytes(): doc_id for doc_id, digest in enumerate(docs_digests)}
+        self.num_docs = len(docs_digests)
+
+        # For each num_summary_sentences value, store a tuple (summaries, offsets, generated_with_model)
+        self._summaries_by_num_sentences: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for file_name in os.listdir(dir_path):
+            if not file_name.endswith('sentences-offsets.npy'):
+                continue
+
+            num_summary_sentences = int(file_name.split('sentences')[0])
+            files_prefix = join_paths(dir_path, '{}sentences-'.format(num_summary_sentences))
+
+            summaries_file_path = files_prefix + 'summaries.bin'
+            if os.path.getsize(summaries_file_path) > 0:
+                summaries = np.memmap(summaries_file_path, dtype=np.uint8, mode='r')
+            else:
+                # np.memmap can't map empty files
+                summaries = np.empty(0, dtype=np.uint8)
+
+            self._summaries_by_num_sentences[num_summary_sentences] = (
+                summaries,
+                np.load(files_prefix + 'offsets.npy', mmap_mode='r'),
+                np.load(files_prefix + 'generated-with-model.npy', mmap_mode='r')
+            )
+
+    @classmethod
+    def load(cls, dir_path: str) -> Optional['SummariesStore']:
+        """
+        Loads the store stored in the given folder. If the folder doesn't exist, returns None.
+        """
+        if not os.path.exists(join_paths(dir_path, cls._DOCS_DIGESTS_FILE_NAME)):
+            return None
+        return cls(dir_path)
+
+    @classmethod
+    def build(cls, dir_path: str, docs_contents: List[str], num_summary_sentences_values: Iterable[int],
+              summarize_func: Callable[[str, int], Tuple[str, bool]]) -> 'SummariesStore':
+        """
+        Summarizes all the given documents and stores the summaries in the given folder.
+
+        :param dir_path: Path to the folder where the store will be saved. It's created if it doesn't exist.
+        :param docs_contents: Original content of all the documents of the dataset, ordered by document id.
+        :param num_summary_sentences_values: For each of this values, a summary with that number of sentences \
+        is generated for each document.
+        :param summarize_func: Function that given a text and a number of sentences returns a tuple \
+        (summary, summary_generated_with_the_model).
+        :return: The store loaded from the given folder.
+        """
+        docs_digests = np.array([np.frombuffer(get_doc_digest(doc_content), dtype=np.uint8)
+                                 for doc_content in docs_contents], dtype=np.uint8).reshape(-1, 16)
+
+        # The files are written with temporary names and then renamed, so the files of a previous store in the
+        # same folder aren't truncated while they are memory-mapped (by this or other processes)
+        with ReplacingFilesWriter(dir_path) as files_writer:
+            for num_summary_sentences in num_summary_sentences_values:
+                files_prefix = '{}sentences-'.format(num_summary_sentences)
+
+                offsets = np.zeros(len(docs_contents) + 1, dtype=np.int64)
+                generated_with_model = np.full(len(docs_contents), cls._MISSING_SUMMARY, dtype=np.int8)
+
+                with files_writer.open(files_prefix + 'summaries.bin') as summaries_file:
+                    progress_bar = tqdm(docs_contents)
+                    progress_bar.set_description(
+                        'Generating summaries with {} sentences'.format(num_summary_sentences)
+                    )
+                    for doc_id, doc_content in enumerate(progress_bar):
+                        summary, summary_generated_with_the_model = summarize_func(doc_content,
+                                                                                   num_summary_sentences)
+                        encoded_summary = summary.encode('utf-8')
+                        summaries_file.write(encoded_summary)
+
+                        offsets[doc_id + 1] = offsets[doc_id] + len(encoded_summary)
+                        generated_with_model[doc_id] = int(summary_generated_with_the_model)
+
+                with files_writer.open(files_prefix + 'generated-with-model.npy') as generated_with_model_file:
+                    np.save(generated_with_model_file, generated_with_model)
+                with files_writer.open(files_prefix + 'offsets.npy') as offsets_file:
+                    np.save(offsets_file, offsets)
+
+            # The digests file is replaced the last, because it's existence marks the store as complete
+            with files_writer.open(cls._DOCS_DIGESTS_FILE_NAME) as docs_digests_file:
+                np.save(docs_digests_file, docs_digests)
+
+        return cls(dir_path)
+
+    def get_doc_id(self, doc_content: str) -> Optional[int]:
+        """
+        Returns the id of the document with the given content, or None if the document isn't in the store.
+        """
+        return self._doc_id_by_digest.get(get_doc_digest(doc_content))
+
+    def get_summary(self, doc_id: int, num_summary_sentences: int) -> Optional[Tuple[str, bool]]:
+        """
+        Returns a tuple (summary, summary_generated_with_the_model) of the document with the given id,
+        or None if the store doesn't contain that summary.
+        """
+        try:
+            summaries, offsets, generated_with_model = self._summaries_by_num_sentences[num_summary_sentences]
+        except KeyError:
+            return None
+
+        if doc_id is None or doc_id < 0 or doc_id >= self.num_docs or \
+                generated_with_model[doc_id] == self._MISSING_SUMMARY:
+            return None
+
+        summary = summaries[offsets[doc_id]:offsets[doc_id + 1]].tobytes().decode('utf-8')
+        return summary, bool(generated_with_model[doc_id])
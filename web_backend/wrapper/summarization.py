@@ -0,0 +1,366 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from nltk import sent_tokenize
+from nltk.corpus import stopwords
+
+from web_backend.wrapper.embeddings_store import EmbeddingsStore
+from web_backend.wrapper.sentence_vectors_cache import SentenceVectorsCache, SentenceVectorsStore
+
+
+def batch_pagerank(adjacency_matrices: np.ndarray, num_nodes: np.ndarray, alpha=0.85, max_iter=100,
+                   tol=1e-06) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes the PageRank of several weighted graphs at the same time, with a vectorized power iteration.
+
+    It obtains the same results as the networkx.pagerank() function (with the default params) applied to the graph
+    created from each adjacency matrix with networkx.from_numpy_array(): each row is normalized by it's sum,
+    the nodes without outgoing weight distribute their score uniformly, and the iteration of a graph stops
+    when the sum of the absolute changes of the scores is lower than num_nodes * tol.
+
+    :param adjacency_matrices: Array of shape (num_graphs, max_num_nodes, max_num_nodes). The graph i \
+    only uses the first num_nodes[i] rows and columns of it's matrix. The rest must be 0.
+    :param num_nodes: Array of shape (num_graphs,) with the number of nodes of each graph.
+    :param alpha: Damping parameter.
+    :param max_iter: Max number of iterations.
+    :param tol: Error tolerance used to check convergence.
+    :return: A tuple (scores, converged, num_iterations). scores is an array of shape (num_graphs, max_num_nodes) \
+    with the score of each node (0 in the padding positions) after the last iteration of each graph. \
+    converged is a bool array of shape (num_graphs,) that is False for the graphs that didn't converge \
+    in max_iter iterations. num_iterations is an int array of shape (num_graphs,) with the number of iterations \
+    of each graph.
+    """
+    num_graphs, max_num_nodes, _ = adjacency_matrices.shape
+    num_nodes = np.asarray(num_nodes, dtype=np.float64)
+
+    # Mask of the nodes of each graph, and uniform distribution over them
+    valid_nodes = np.arange(max_num_nodes)[np.newaxis, :] < num_nodes[:, np.newaxis]
+    uniform = np.divide(valid_nodes, num_nodes[:, np.newaxis], out=np.zeros(valid_nodes.shape),
+                        where=num_nodes[:, np.newaxis] > 0)
+
+    # Right stochastic matrices. Dangling nodes (nodes without outgoing weight) keep a row of zeros.
+    out_weights = adjacency_matrices.sum(axis=2)
+    dangling_nodes = valid_nodes & (out_weights == 0)
+    transition_matrices = np.divide(adjacency_matrices, out_weights[:, :, np.newaxis],
+                                    out=np.zeros(adjacency_matrices.shape), where=out_weights[:, :, np.newaxis] != 0)
+
+    scores = uniform.copy()
+    converged = num_nodes == 0
+    num_iterations = np.zeros(num_graphs, dtype=np.int64)
+    # The scores of the graphs that don't converge can grow until they overflow
+    with np.errstate(over='ignore', invalid='ignore'):
+        for _ in range(max_iter):
+            # Only the graphs that haven't converged yet are updated
+            active = np.flatnonzero(~converged)
+            if len(active) == 0:
+                break
+
+            last_scores = scores[active]
+            dangling_sum = alpha * (last_scores * dangling_nodes[active]).sum(axis=1, keepdims=True)
+            new_scores = alpha * np.einsum('gi,gij->gj', last_scores, transition_matrices[active]) + \
+                (dangling_sum + (1.0 - alpha)) * uniform[active]
+
+            scores[active] = new_scores
+            converged[active] = np.abs(new_scores - last_scores).sum(axis=1) < num_nodes[active] * tol
+            num_iterations[active] += 1
+
+    return scores, converged, num_iterations
+
+
+class PageRankConvergenceError(Exception):
+    """
+    Exception raised when the PageRank algorithm doesn't converge in the max number of iterations.
+    """
+
+
+class TextRankSummarizer:
+    """
+    TextRank summarization model that obtains the word embeddings from an EmbeddingsStore, instead of loading
+    the original embeddings files into memory.
+
+    It implements the same algorithm as the TextRank class of the topics_and_summary library, so it can be used
+    in it's place:
+
+    1. The text is split into sentences.
+    2. Each sentence is cleaned (only letters are kept, converted to lowercase and without stopwords) and \
+       represented by the mean of the vectors of it's words.
+    3. A graph is created, where the nodes are the sentences and the weight of each edge is the cosine similarity \
+       between the vectors of both sentences.
+    4. The sentences with the highest PageRank score are returned.
+
+    The PageRank is computed with the batch_pagerank() function, directly on the similarity matrices.
+    By default, the texts where it doesn't converge in max_iter iterations aren't summarized (the same as the
+    library), but with partial_ranking=True, the sentences are ranked with the scores of the last iteration,
+    if they are finite. The summarizer counts the number of iterations and the texts that don't converge,
+    returned by get_stats().
+
+    The sentences of the texts and the vectors of the sentences are cached in a SentenceVectorsCache, optionally
+    backed by a SentenceVectorsStore with the vectors of all the sentences of the dataset generated in batch,
+    so the texts summarized several times only need the similarity and ranking steps.
+    """
+
+    _MAX_BATCH_MATRICES_SIZE = 2 ** 22
+    """ Max number of elements of the similarity matrices (with padding) of the texts summarized together. """
+
+    def __init__(self, embeddings_store: EmbeddingsStore, alpha=0.85, max_iter=100, tol=1e-06,
+                 partial_ranking=False, sentence_cache_max_num_sentences=0, sentence_cache_max_num_texts=0,
+                 sentence_vectors_store_dir_path: str = None):
+        """
+        :param embeddings_store: Store with the word embeddings.
+        :param alpha: Damping parameter of the PageRank algorithm.
+        :param max_iter: Max number of iterations of the PageRank algorithm.
+        :param tol: Error tolerance used to check the convergence of the PageRank algorithm.
+        :param partial_ranking: If is True, the texts where the PageRank algorithm doesn't converge are \
+        summarized with the scores of the last iteration (best-effort ranking), if they are finite.
+        :param sentence_cache_max_num_sentences: Max number of sentences vectors kept in the SentenceVectorsCache.
+        :param sentence_cache_max_num_texts: Max number of texts whose sentences are kept in the SentenceVectorsCache.
+        :param sentence_vectors_store_dir_path: Path to the folder of a SentenceVectorsStore. If is None or \
+        the store doesn't exist, the vectors are only cached in memory.
+        """
+        self.embeddings_store = embeddings_store
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.tol = tol
+        self.partial_ranking = partial_ranking
+        self._stopwords = set(stopwords.words('english'))
+
+        sentence_vectors_store = None
+        if sentence_vectors_store_dir_path is not None:
+            sentence_vectors_store = SentenceVectorsStore.load(sentence_vectors_store_dir_path)
+            # The store is ignored if it was generated with other word embeddings
+            if sentence_vectors_store is not None and \
+                    sentence_vectors_store.vectors_size != embeddings_store.vectors_size:
+                sentence_vectors_store = None
+        if sentence_cache_max_num_sentences > 0 or sentence_cache_max_num_texts > 0 or \
+                sentence_vectors_store is not None:
+            self.sentence_vectors_cache = SentenceVectorsCache(embeddings_store.vectors_size,
+                                                               max_num_sentences=sentence_cache_max_num_sentences,
+                                                               max_num_texts=sentence_cache_max_num_texts,
+                                                               sentence_vectors_store=sentence_vectors_store)
+        else:
+            self.sentence_vectors_cache = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = self._get_empty_stats()
+
+    @staticmethod
+    def get_words_of_text(text: str) -> List[str]:
+        """
+        Returns the words of the given text, keeping only letters and in lowercase. Only this words
+        can be searched in the EmbeddingsStore, so it can be pruned to the words returned by this method.
+        """
+        return re.sub('[^a-zA-Z]', ' ', text).lower().split()
+
+    def _clean_sentence(self, sentence: str) -> List[str]:
+        """
+        Returns the words of the given sentence, keeping only letters, in lowercase and without stopwords.
+        """
+        return [word for word in self.get_words_of_text(sentence) if word not in self._stopwords]
+
+    def get_sentences_vectors(self, sentences: List[str]) -> np.ndarray:
+        """
+        Returns a float32 array of shape (len(sentences), vectors_size) with the vector of each sentence,
+        without using the SentenceVectorsCache. The vectors of all the words of all the sentences are obtained
+        from the EmbeddingsStore at once.
+        """
+        sentences_words = [self._clean_sentence(sentence) for sentence in sentences]
+        sentences_num_words = np.array([len(words) for words in sentences_words], dtype=np.int64)
+
+        words_vectors = self.embeddings_store.get_words_vectors(
+            [word for words in sentences_words for word in words]
+        )
+
+        # Sum the vectors of the words of each sentence. Sentences without words have a vector of zeros.
+        sentences_vectors = np.zeros((len(sentences), self.embeddings_store.vectors_size), dtype=np.float32)
+        non_empty_sentences = sentences_num_words > 0
+        if np.any(non_empty_sentences):
+            first_word_positions = np.concatenate([[0], np.cumsum(sentences_num_words)[:-1]])
+            sentences_vectors[non_empty_sentences] = np.add.reduceat(
+                words_vectors, first_word_positions[non_empty_sentences], axis=0
+            )
+        # The same smoothing than the topics_and_summary library is used
+        sentences_vectors /= (sentences_num_words + 0.001)[:, np.newaxis]
+        return sentences_vectors
+
+    def get_texts_sentences(self, texts: List[str]) -> List[List[str]]:
+        """
+        Returns the sentences of each of the given texts, obtained with the nltk sent_tokenize() function,
+        or from the SentenceVectorsCache.
+        """
+        if self.sentence_vectors_cache is None:
+            return [sent_tokenize(text) for text in texts]
+        return self.sentence_vectors_cache.get_texts_sentences(texts, sent_tokenize)
+
+    def _get_sentences_vectors_of_texts(self, texts_sentences: List[List[str]]) -> List[np.ndarray]:
+        """
+        Returns, for each text, an array of shape (num_sentences, vectors_size) with the vector of each sentence.
+        The vectors that aren't in the SentenceVectorsCache are obtained with get_sentences_vectors() at once.
+        """
+        sentences = [sentence for text_sentences in texts_sentences for sentence in text_sentences]
+        if self.sentence_vectors_cache is None:
+            sentences_vectors = self.get_sentences_vectors(sentences)
+            num_computed_sentences = len(sentences)
+        else:
+            computed_sentences = []
+
+            def get_sentences_vectors_func(missing_sentences: List[str]) -> np.ndarray:
+                computed_sentences.extend(missing_sentences)
+                return self.get_sentences_vectors(missing_sentences)
+
+            sentences_vectors = self.sentence_vectors_cache.get_sentences_vectors(sentences,
+                                                                                  get_sentences_vectors_func)
+            num_computed_sentences = len(computed_sentences)
+
+        with self._stats_lock:
+            self._stats['num_sentences'] += len(sentences)
+            self._stats['num_computed_sentences'] += num_computed_sentences
+
+        texts_first_sentence_positions = np.cumsum([0] + [len(text_sentences) for text_sentences in texts_sentences])
+        return [sentences_vectors[start:end]
+                for start, end in zip(texts_first_sentence_positions[:-1], texts_first_sentence_positions[1:])]
+
+    @staticmethod
+    def _get_similarity_matrices(sentences_vectors: np.ndarray) -> np.ndarray:
+        """
+        Returns the matrices with the cosine similarity between each pair of sentences vectors.
+
+        :param sentences_vectors: Array of shape (..., num_sentences, vectors_size).
+        :return: Array of shape (..., num_sentences, num_sentences). The diagonals, and the similarities \
+        of vectors of zeros, are 0.
+        """
+        sentences_vectors = sentences_vectors.astype(np.float64)
+        norms = np.linalg.norm(sentences_vectors, axis=-1, keepdims=True)
+        normalized_vectors = np.divide(sentences_vectors, norms, out=np.zeros_like(sentences_vectors),
+                                       where=norms > 0)
+        similarity_matrices = normalized_vectors @ np.swapaxes(normalized_vectors, -1, -2)
+        diagonal = np.arange(similarity_matrices.shape[-1])
+        similarity_matrices[..., diagonal, diagonal] = 0
+        return similarity_matrices
+
+    def get_k_best_sentences_of_text(self, text: str, num_best_sentences=5) -> List[str]:
+        """
+        Returns the num_best_sentences most relevant sentences of the given text, sorted by relevance.
+
+        :raises PageRankConvergenceError: If the PageRank algorithm doesn't converge \
+        (and partial_ranking is False or the last scores aren't finite).
+        """
+        best_sentences = self.get_k_best_sentences_of_texts([text], num_best_sentences)[0]
+        if best_sentences is None:
+            raise PageRankConvergenceError('PageRank failed to converge in {} iterations.'.format(self.max_iter))
+        return best_sentences
+
+    @staticmethod
+    def _get_empty_stats() -> Dict[str, int]:
+        return {'num_texts': 0, 'num_converged': 0, 'num_partial_rankings': 0, 'num_not_converged': 0,
+                'num_iterations': 0, 'num_sentences': 0, 'num_computed_sentences': 0}
+
+    def _update_stats(self, converged: np.ndarray, partial_rankings: np.ndarray, num_iterations: np.ndarray):
+        with self._stats_lock:
+            self._stats['num_texts'] += len(converged)
+            self._stats['num_converged'] += int(np.sum(converged))
+            self._stats['num_partial_rankings'] += int(np.sum(partial_rankings))
+            self._stats['num_not_converged'] += int(np.sum(~converged & ~partial_rankings))
+            self._stats['num_iterations'] += int(np.sum(num_iterations))
+
+    def add_stats(self, stats: Dict[str, int]):
+        """
+        Adds the counters of the given stats (obtained with pop_stats() from other TextRankSummarizer)
+        to the stats of this summarizer.
+        """
+        with self._stats_lock:
+            for stat in self._stats:
+                self._stats[stat] += stats.get(stat, 0)
+
+    def pop_stats(self) -> Dict[str, int]:
+        """
+        Returns the counters of the stats and resets them.
+        """
+        with self._stats_lock:
+            stats = self._stats
+            self._stats = self._get_empty_stats()
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with the number of summarized texts, the number of texts where the PageRank algorithm
+        converged, was ranked partially or didn't converge, the total and the mean number of iterations,
+        and the fallback rate (ratio of texts that weren't summarized with the model). It also contains the number
+        of sentences, the number of them whose vector was obtained from their words (instead of the
+        SentenceVectorsCache) and the hit rate of the cache.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        num_texts = stats['num_texts']
+        stats['mean_num_iterations'] = stats['num_iterations'] / num_texts if num_texts > 0 else 0
+        stats['fallback_rate'] = stats['num_not_converged'] / num_texts if num_texts > 0 else 0
+        num_sentences = stats['num_sentences']
+        stats['sentence_cache_hit_rate'] = 1 - stats['num_computed_sentences'] / num_sentences \
+            if num_sentences > 0 else 0
+        return stats
+
+    def _get_batches(self, texts_num_sentences: List[int]) -> List[np.ndarray]:
+        """
+        Splits the texts in batches of texts with a similar number of sentences, so the padding of the
+        similarity matrices is small, and the size of the matrices of each batch is bounded.
+
+        :return: List with the positions of the texts of each batch.
+        """
+        batches = []
+        batch = []
+        # Texts are sorted by number of sentences, so the last text of a batch is the one with more sentences
+        for text_position in np.argsort(texts_num_sentences, kind='stable'):
+            max_num_sentences = texts_num_sentences[text_position]
+            if batch and (len(batch) + 1) * max_num_sentences ** 2 > self._MAX_BATCH_MATRICES_SIZE:
+                batches.append(np.array(batch))
+                batch = []
+            batch.append(text_position)
+        if batch:
+            batches.append(np.array(batch))
+        return batches
+
+    def get_k_best_sentences_of_texts(self, texts: List[str], num_best_sentences=5) -> List[Optional[List[str]]]:
+        """
+        Returns the num_best_sentences most relevant sentences of each of the given texts, sorted by relevance.
+
+        It obtains the same sentences as calling get_k_best_sentences_of_text() with each text, but the sentences
+        vectors of all the texts are obtained at once, and the PageRank of the texts with a similar number of
+        sentences is computed at the same time with the batch_pagerank() function.
+
+        :return: A list with the best sentences of each text, or None for the texts where the PageRank algorithm \
+        doesn't converge (and partial_ranking is False or the last scores aren't finite).
+        """
+        texts_sentences = self.get_texts_sentences(texts)
+        texts_sentences_vectors = self._get_sentences_vectors_of_texts(texts_sentences)
+        texts_num_sentences = [len(text_sentences) for text_sentences in texts_sentences]
+
+        texts_best_sentences: List[Optional[List[str]]] = [None] * len(texts)
+        for batch in self._get_batches(texts_num_sentences):
+            max_num_sentences = texts_num_sentences[batch[-1]]
+
+            # Sentences vectors of the texts of the batch, padded with vectors of zeros, that have similarity 0
+            batch_sentences_vectors = np.zeros((len(batch), max_num_sentences, self.embeddings_store.vectors_size),
+                                               dtype=np.float32)
+            for i, text_position in enumerate(batch):
+                batch_sentences_vectors[i, :texts_num_sentences[text_position]] = \
+                    texts_sentences_vectors[text_position]
+
+            scores, converged, num_iterations = batch_pagerank(
+                self._get_similarity_matrices(batch_sentences_vectors),
+                [texts_num_sentences[text_position] for text_position in batch],
+                alpha=self.alpha, max_iter=self.max_iter, tol=self.tol
+            )
+            partial_rankings = ~converged & np.all(np.isfinite(scores), axis=1) if self.partial_ranking \
+                else np.zeros(len(batch), dtype=bool)
+            self._update_stats(converged, partial_rankings, num_iterations)
+
+            for i, text_position in enumerate(batch):
+                if not converged[i] and not partial_rankings[i]:
+                    continue
+                text_sentences = texts_sentences[text_position]
+                ranked_sentences = sorted(zip(scores[i, :len(text_sentences)].tolist(), text_sentences), reverse=True)
+                texts_best_sentences[text_position] = [sentence for _, sentence in
+                                                       ranked_sentences[:num_best_sentences]]
+
+        return texts_best_sentences
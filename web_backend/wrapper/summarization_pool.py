@@ -0,0 +1,204 @@
+import functools
+import math
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from web_backend.wrapper.embeddings_store import EmbeddingsStore
+from web_backend.wrapper.summarization import TextRankSummarizer
+
+# TextRankSummarizer of each worker process. It's created once, when the worker process starts.
+_worker_summarizer: TextRankSummarizer = None
+
+
+def _init_worker(embeddings_store_dir_path: str, summarizer_kwargs: Dict[str, Any]):
+    """
+    Creates the TextRankSummarizer of a worker process. The EmbeddingsStore is memory-mapped, so all the
+    worker processes share the word embeddings with the main process through the OS page cache.
+    """
+    global _worker_summarizer
+    _worker_summarizer = TextRankSummarizer(EmbeddingsStore(embeddings_store_dir_path), **summarizer_kwargs)
+
+
+def _summarize_in_worker(texts: List[str], num_best_sentences: int) -> Tuple[List[Optional[List[str]]],
+                                                                             Dict[str, int]]:
+    """
+    Summarizes the given texts with the TextRankSummarizer of the worker process.
+    Returns the best sentences of each text and the stats of the summarizer.
+    """
+    texts_best_sentences = _worker_summarizer.get_k_best_sentences_of_texts(texts, num_best_sentences)
+    return texts_best_sentences, _worker_summarizer.pop_stats()
+
+
+class SummarizationPool:
+    """
+    Pool of worker processes that summarize texts with a TextRankSummarizer, so the summaries of the documents
+    of a response are generated in parallel, using several cores, instead of in the thread of the request.
+
+    The texts are split in num_workers chunks, and each chunk is summarized by a worker with the vectorized
+    get_k_best_sentences_of_texts() method. The results are returned in the same order as the texts.
+
+    The texts of the chunks that don't finish in timeout seconds (or fail) have None as result, the same as
+    the texts where the PageRank algorithm doesn't converge, so the caller can select their first sentences
+    as a summary. A chunk that times out can't be stopped, so it keeps running in it's worker until it finishes.
+    To avoid accumulating chunks without limit when the workers can't keep up, while there are
+    max_num_pending_tasks chunks pending, the texts aren't sent to the workers, and all of them have None as result.
+    Workers that die are replaced automatically by the pool.
+
+    The worker processes belong to the process that starts them. If the pool is used in a process forked from it,
+    (for example, by the PreforkServer), new worker processes are started for the forked process.
+    """
+
+    def __init__(self, embeddings_store_dir_path: str, num_workers: int = 2, timeout: float = 10,
+                 summarizer_kwargs: Dict[str, Any] = None, stats_callback: Callable[[Dict[str, int]], None] = None,
+                 max_num_pending_tasks: int = None):
+        """
+        Creates the pool and starts the worker processes.
+
+        :param embeddings_store_dir_path: Path to the folder of the EmbeddingsStore used by the workers.
+        :param num_workers: Number of worker processes.
+        :param timeout: Max number of seconds that get_k_best_sentences_of_texts() waits for the summaries.
+        :param summarizer_kwargs: Keyword arguments of the TextRankSummarizer of the workers (PageRank params).
+        :param stats_callback: Function called with the stats of the TextRankSummarizer of a worker each time \
+        it summarizes a chunk. For example: the add_stats() method of the TextRankSummarizer of the main process.
+        :param max_num_pending_tasks: Max number of chunks sent to the workers that haven't finished (including \
+        the ones that have timed out). If is None, it's 4 * num_workers.
+        """
+        self.embeddings_store_dir_path = embeddings_store_dir_path
+        self.num_workers = num_workers
+        self.timeout = timeout
+        self._summarizer_kwargs = summarizer_kwargs or {}
+        self._stats_callback = stats_callback
+        self.max_num_pending_tasks = 4 * num_workers if max_num_pending_tasks is None else max_num_pending_tasks
+
+        self._pool_lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        # Number of chunks sent to the current pool that haven't finished. Protected by _pool_lock
+        self._num_pending_tasks = 0
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'num_texts': 0, 'num_tasks': 0, 'num_timeouts': 0, 'num_errors': 0, 'num_rejected': 0}
+
+        self.start()
+
+    def start(self):
+        """
+        Starts the worker processes, if they haven't been started by the current process.
+        """
+        with self._pool_lock:
+            self._start_pool()
+
+    def _start_pool(self) -> multiprocessing.pool.Pool:
+        """
+        Starts the worker processes if they haven't been started by the current process, and returns their
+        multiprocessing Pool. Must be called with the _pool_lock acquired.
+        """
+        if self._pool is not None and self._pool_pid == os.getpid():
+            return self._pool
+        # The spawn start method is used because the main process has running threads,
+        # and forking a process with threads can leave locks acquired in the child process
+        self._pool = multiprocessing.get_context('spawn').Pool(self.num_workers, initializer=_init_worker,
+                                                               initargs=(self.embeddings_store_dir_path,
+                                                                         self._summarizer_kwargs))
+        self._pool_pid = os.getpid()
+        self._num_pending_tasks = 0
+        return self._pool
+
+    def _finish_task(self, pool: multiprocessing.pool.Pool, *_):
+        """
+        Called (by a thread of the given multiprocessing Pool) when a chunk sent to it finishes or fails.
+        """
+        with self._pool_lock:
+            # The chunks of a pool that has been replaced aren't counted
+            if pool is self._pool:
+                self._num_pending_tasks -= 1
+
+    def _increment_stat(self, stat: str, value: int = 1):
+        with self._stats_lock:
+            self._stats[stat] += value
+
+    def get_k_best_sentences_of_texts(self, texts: List[str], num_best_sentences=5) -> List[Optional[List[str]]]:
+        """
+        Returns the num_best_sentences most relevant sentences of each of the given texts, sorted by relevance,
+        or None for the texts that couldn't be summarized in time (or weren't sent to the workers, because there
+        were too many chunks pending) or where the PageRank algorithm doesn't converge.
+        """
+        if len(texts) == 0:
+            return []
+
+        chunk_size = math.ceil(len(texts) / self.num_workers)
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+
+        # The chunks are sent while the lock is held, so a concurrent restart() or shutdown() doesn't replace
+        # the pool in the meantime (apply_async() doesn't wait for the workers)
+        with self._pool_lock:
+            pool = self._start_pool()
+            if self._num_pending_tasks + len(chunks) > self.max_num_pending_tasks:
+                self._increment_stat('num_rejected')
+                return [None] * len(texts)
+            self._num_pending_tasks += len(chunks)
+            finish_task = functools.partial(self._finish_task, pool)
+            async_results = [pool.apply_async(_summarize_in_worker, (chunk, num_best_sentences),
+                                              callback=finish_task, error_callback=finish_task)
+                             for chunk in chunks]
+
+        self._increment_stat('num_texts', len(texts))
+        self._increment_stat('num_tasks', len(chunks))
+
+        # All the chunks are summarized at the same time, so the timeout is for all of them
+        deadline = time.time() + self.timeout
+        texts_best_sentences = []
+        for chunk, async_result in zip(chunks, async_results):
+            try:
+                chunk_best_sentences, chunk_stats = async_result.get(timeout=max(deadline - time.time(), 0))
+                texts_best_sentences.extend(chunk_best_sentences)
+                if self._stats_callback is not None:
+                    self._stats_callback(chunk_stats)
+            except multiprocessing.TimeoutError:
+                self._increment_stat('num_timeouts')
+                texts_best_sentences.extend([None] * len(chunk))
+            except Exception:
+                self._increment_stat('num_errors')
+                texts_best_sentences.extend([None] * len(chunk))
+
+        return texts_best_sentences
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with statistics about the pool.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['num_workers'] = self.num_workers
+        with self._pool_lock:
+            stats['num_pending_tasks'] = self._num_pending_tasks
+        return stats
+
+    def restart(self):
+        """
+        Replaces the worker processes started by the current process with new ones, so the caches of their
+        TextRankSummarizers are emptied. The old workers finish the texts in progress before exiting.
+        If the workers haven't been started by the current process, does nothing.
+        """
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                return
+            self._pool.close()
+            self._pool = None
+            self._start_pool()
+
+    def shutdown(self):
+        """
+        Stops the worker processes. They are started again by start(), or the next time the pool is used.
+        """
+        with self._pool_lock:
+            pool = self._pool if self._pool_pid == os.getpid() else None
+            self._pool = None
+        # The pool is terminated without holding the lock, because terminate() waits for the thread of the pool
+        # that calls _finish_task()
+        if pool is not None:
+            pool.terminate()
@@ -0,0 +1,200 @@
+from typing import List, Tuple
+
+import numpy as np
+
+
+class TopicsInferencer:
+    """
+    In-process inferencer of the topics distribution of new documents, implemented with NumPy.
+
+    It uses the topic-word counts of a trained LDA model (for example, the ones of a LdaMalletModel) as fixed values,
+    and estimates the document-topic counts of each new document iterating the expected topic assignment of each word,
+    until convergence. This is the deterministic equivalent of the Gibbs sampling done by the mallet
+    TopicInferencer, so the topics distributions are comparable, but it doesn't need to launch a Java process.
+    """
+
+    def __init__(self, topic_word_counts: np.ndarray, alpha, beta: float = 0.01, max_num_iterations: int = 100,
+                 tolerance: float = 1e-4):
+        """
+        :param topic_word_counts: Array of shape (num_topics, num_words) with the number of times that each word \
+        was assigned to each topic while training the model.
+        :param alpha: Dirichlet prior of the document-topic distributions. Can be an array with a value for each \
+        topic, or a number with the sum of alpha over all the topics (as specified in mallet).
+        :param beta: Dirichlet prior of the topic-word distributions.
+        :param max_num_iterations: Max number of iterations done to infer the topics of each document.
+        :param tolerance: The inference of a document finishes when the max change in the document-topic counts, \
+        divided by the number of words of the document, is lower than this value.
+        """
+        topic_word_counts = np.asarray(topic_word_counts, dtype=np.float64)
+        self.num_topics, self.num_words = topic_word_counts.shape
+
+        alpha = np.asarray(alpha, dtype=np.float64)
+        if alpha.ndim == 0:
+            # Mallet specifies alpha as the sum over all the topics
+            alpha = np.full(self.num_topics, alpha / self.num_topics)
+        self.alpha = alpha
+
+        self.max_num_iterations = max_num_iterations
+        self.tolerance = tolerance
+
+        # Smoothed word-topic probabilities p(word|topic), stored with shape (num_words, num_topics),
+        # so the rows of the words of a document can be selected efficiently
+        topic_word_probs = (topic_word_counts + beta) / \
+                           (topic_word_counts.sum(axis=1, keepdims=True) + self.num_words * beta)
+        self._word_topic_probs = np.ascontiguousarray(topic_word_probs.T)
+
+    @classmethod
+    def from_lda_mallet(cls, lda_mallet, **kwargs) -> 'TopicsInferencer':
+        """
+        Creates a TopicsInferencer with the topic-word counts and the alpha of a gensim LdaMallet model.
+
+        :param lda_mallet: gensim LdaMallet model (the model attribute of a LdaMalletModel).
+        :param kwargs: Other params of the TopicsInferencer constructor.
+        """
+        return cls(lda_mallet.word_topics, lda_mallet.alpha, **kwargs)
+
+    def infer(self, bow: List[Tuple[int, int]]) -> np.ndarray:
+        """
+        Returns the topics distribution of a document.
+
+        :param bow: Document in bag of words format: a list of tuples (word_id, word_count). \
+        Words with ids not present in the model are ignored.
+        :return: Array of shape (num_topics,) with the probability of each topic in the document.
+        """
+        bow = [(word_id, word_count) for word_id, word_count in bow if 0 <= word_id < self.num_words]
+        if len(bow) == 0:
+            return self.alpha / self.alpha.sum()
+
+        word_ids, word_counts = (np.array(values) for values in zip(*bow))
+        word_counts = word_counts.astype(np.float64)
+        num_doc_words = word_counts.sum()
+
+        doc_word_topic_probs = self._word_topic_probs[word_ids]
+
+        # Start with the words uniformly distributed over the topics
+        doc_topic_counts = np.full(self.num_topics, num_doc_words / self.num_topics)
+        for _ in range(self.max_num_iterations):
+            # Probability of each word of the document being assigned to each topic
+            word_topic_assignments = doc_word_topic_probs * (doc_topic_counts + self.alpha)
+            word_topic_assignments /= word_topic_assignments.sum(axis=1, keepdims=True)
+
+            new_doc_topic_counts = word_counts @ word_topic_assignments
+            converged = np.abs(new_doc_topic_counts - doc_topic_counts).max() < self.tolerance * num_doc_words
+            doc_topic_counts = new_doc_topic_counts
+            if converged:
+                break
+
+        return (doc_topic_counts + self.alpha) / (num_doc_words + self.alpha.sum())
+
+    _MAX_CHUNK_NUM_WORDS = 4096
+    """ Max number of (distinct) words of the documents inferred together by infer_batch(). """
+
+    def infer_batch(self, bows: List[List[Tuple[int, int]]]) -> np.ndarray:
+        """
+        Returns the topics distribution of several documents, obtaining the same values as infer() with each one.
+
+        The documents are split in chunks of at most _MAX_CHUNK_NUM_WORDS words, so the arrays of a chunk
+        fit in the CPU cache. The words of the documents of a chunk are concatenated, so each iteration updates
+        the document-topic counts of all the documents of the chunk that haven't converged yet with a few
+        NumPy operations, instead of a few NumPy operations for each document.
+
+        :param bows: List of documents in bag of words format.
+        :return: Array of shape (num_docs, num_topics) with the probability of each topic in each document.
+        """
+        bows = [[(word_id, word_count) for word_id, word_count in bow if 0 <= word_id < self.num_words]
+                for bow in bows]
+
+        chunks = []
+        chunk_start = chunk_num_words = 0
+        for i, bow in enumerate(bows):
+            if chunk_num_words > 0 and chunk_num_words + len(bow) > self._MAX_CHUNK_NUM_WORDS:
+                chunks.append(self._infer_chunk(bows[chunk_start:i]))
+                chunk_start = i
+                chunk_num_words = 0
+            chunk_num_words += len(bow)
+        chunks.append(self._infer_chunk(bows[chunk_start:]))
+
+        return np.concatenate(chunks)
+
+    def _infer_chunk(self, bows: List[List[Tuple[int, int]]]) -> np.ndarray:
+        """
+        Returns the topics distribution of several documents, iterating all of them at the same time.
+        The documents must only contain words present in the model.
+        """
+        docs_num_bow_words = np.array([len(bow) for bow in bows], dtype=np.int64)
+
+        # Documents without known words have the prior distribution
+        docs_topics = np.tile(self.alpha / self.alpha.sum(), (len(bows), 1))
+        non_empty_docs = np.flatnonzero(docs_num_bow_words > 0)
+        if len(non_empty_docs) == 0:
+            return docs_topics
+
+        # Words of all the non empty documents, one after other, and the position of the document of each word
+        word_ids = np.array([word_id for doc in non_empty_docs for word_id, _ in bows[doc]], dtype=np.int64)
+        word_counts = np.array([word_count for doc in non_empty_docs for _, word_count in bows[doc]],
+                               dtype=np.float64)
+        word_docs = np.repeat(np.arange(len(non_empty_docs)), docs_num_bow_words[non_empty_docs])
+        num_docs_words = np.bincount(word_docs, weights=word_counts)
+
+        doc_word_topic_probs = self._word_topic_probs[word_ids]
+
+        # Start with the words uniformly distributed over the topics
+        doc_topic_counts = np.tile((num_docs_words / self.num_topics)[:, np.newaxis], (1, self.num_topics))
+
+        # Documents that haven't converged yet. Only their words are kept in the word arrays.
+        active_docs = np.arange(len(non_empty_docs))
+        docs_first_word_positions = np.concatenate([[0], np.cumsum(docs_num_bow_words[non_empty_docs])[:-1]])
+        for _ in range(self.max_num_iterations):
+            # Probability of each word of the documents being assigned to each topic
+            word_topic_assignments = doc_word_topic_probs * (doc_topic_counts[word_docs] + self.alpha)
+            word_topic_assignments /= word_topic_assignments.sum(axis=1, keepdims=True)
+
+            # Sum the assignments of the words of each document. The words of a document are contiguous.
+            word_topic_assignments *= word_counts[:, np.newaxis]
+            new_doc_topic_counts = np.add.reduceat(word_topic_assignments, docs_first_word_positions, axis=0)
+
+            converged = np.abs(new_doc_topic_counts - doc_topic_counts[active_docs]).max(axis=1) < \
+                self.tolerance * num_docs_words[active_docs]
+            doc_topic_counts[active_docs] = new_doc_topic_counts
+            if np.all(converged):
+                break
+
+            if np.any(converged):
+                # Remove the words of the documents that have converged
+                active_words = ~converged[np.searchsorted(active_docs, word_docs)]
+                active_docs = active_docs[~converged]
+                doc_word_topic_probs = doc_word_topic_probs[active_words]
+                word_counts = word_counts[active_words]
+                word_docs = word_docs[active_words]
+                docs_first_word_positions = np.flatnonzero(np.r_[True, word_docs[1:] != word_docs[:-1]])
+
+        docs_topics[non_empty_docs] = (doc_topic_counts + self.alpha) / \
+            (num_docs_words[:, np.newaxis] + self.alpha.sum())
+        return docs_topics
+
+    def predict_topic_prob(self, bow: List[Tuple[int, int]], num_best_topics: int = None) -> List[Tuple[int, float]]:
+        """
+        Returns the probability of each topic in a document, sorted by probability in descending order.
+
+        :param bow: Document in bag of words format: a list of tuples (word_id, word_count).
+        :param num_best_topics: Number of topics to be returned. If is None, all the topics are returned.
+        :return: List of tuples (topic, probability).
+        """
+        topics_probs = self.infer(bow)
+        best_topics = np.argsort(-topics_probs, kind='stable')[:num_best_topics]
+        return [(int(topic), float(topics_probs[topic])) for topic in best_topics]
+
+    def predict_topic_prob_batch(self, bows: List[List[Tuple[int, int]]],
+                                 num_best_topics: int = None) -> List[List[Tuple[int, float]]]:
+        """
+        Returns the probability of each topic in each document, in the same format as predict_topic_prob(),
+        inferring the topics of all the documents at once with infer_batch().
+
+        :param bows: List of documents in bag of words format.
+        :param num_best_topics: Number of topics to be returned for each document. If is None, all are returned.
+        :return: A list of tuples (topic, probability) for each document.
+        """
+        docs_topics_probs = self.infer_batch(bows)
+        docs_best_topics = np.argsort(-docs_topics_probs, axis=1, kind='stable')[:, :num_best_topics]
+        return [[(int(topic), float(topics_probs[topic])) for topic in best_topics]
+                for topics_probs, best_topics in zip(docs_topics_probs, docs_best_topics)]
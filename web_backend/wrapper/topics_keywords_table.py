@@ -0,0 +1,70 @@
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+class TopicsKeywordsTable:
+    """
+    Dense table with the most important keywords of each topic, and their probabilities, built once from the
+    topics model. The topics with any number of keywords (up to max_num_keywords) are slices of the table,
+    so they don't need to be obtained from the topics model in each request.
+
+    The topics in JSON format are also cached by number of keywords, so each JSON is serialized only once.
+    """
+
+    def __init__(self, topics_keywords: List[List[Tuple[str, float]]]):
+        """
+        :param topics_keywords: For each topic (ordered by topic id), a list of tuples (keyword, probability), \
+        sorted by probability in descending order. All the topics must have the same number of keywords.
+        """
+        self.num_topics = len(topics_keywords)
+        self.max_num_keywords = min([len(keywords) for keywords in topics_keywords], default=0)
+
+        # Arrays of shape (num_topics, max_num_keywords)
+        self.keywords = np.array([[keyword for keyword, _ in keywords[:self.max_num_keywords]]
+                                  for keywords in topics_keywords], dtype=str).reshape(self.num_topics, -1)
+        self.probabilities = np.array([[probability for _, probability in keywords[:self.max_num_keywords]]
+                                       for keywords in topics_keywords], dtype=np.float64)\
+            .reshape(self.num_topics, -1)
+
+        self._lock = threading.Lock()
+        self._json_by_num_keywords: Dict[int, bytes] = {}
+
+    @classmethod
+    def from_topics(cls, topics: List[Any]) -> 'TopicsKeywordsTable':
+        """
+        Builds the table from the topics returned by the get_topics() method of a TopicsModel.
+        """
+        topics = sorted(topics, key=lambda topic: topic.id)
+        return cls([[(keyword.name, keyword.probability) for keyword in topic.keywords] for topic in topics])
+
+    def get_topics(self, num_keywords: int) -> List[Dict[str, Any]]:
+        """
+        Returns the topics with their num_keywords most important keywords in the following format:
+        [{"topic": 0, "keywords": [{"name": "god", "probability": 0.87}, ...]}, ...]
+
+        num_keywords must be in the range [1, max_num_keywords].
+        """
+        keywords = self.keywords[:, :num_keywords].tolist()
+        probabilities = self.probabilities[:, :num_keywords].tolist()
+
+        return [{'topic': topic,
+                 'keywords': [{'name': name, 'probability': probability}
+                              for name, probability in zip(keywords[topic], probabilities[topic])]}
+                for topic in range(self.num_topics)]
+
+    def get_topics_json(self, num_keywords: int) -> bytes:
+        """
+        Returns the topics returned by get_topics() in JSON format, encoded in UTF-8. The keys are sorted,
+        like in the responses of the flask jsonify() function. The JSON is serialized only the first time.
+        """
+        with self._lock:
+            topics_json = self._json_by_num_keywords.get(num_keywords)
+        if topics_json is None:
+            topics_json = (json.dumps(self.get_topics(num_keywords), separators=(',', ':'), sort_keys=True) + '\n')\
+                .encode('utf-8')
+            with self._lock:
+                self._json_by_num_keywords[num_keywords] = topics_json
+        return topics_json
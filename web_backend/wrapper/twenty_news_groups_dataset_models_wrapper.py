@@ -1,6 +1,8 @@
+from typing import Callable
+
 from topics_and_summary.models.topics import LdaMalletModel
 
-from web_backend.utils import get_param_value_from_conf_file
+from web_backend.utils import get_config
 from web_backend.wrapper.models_wrapper import ModelsWrapper
 
 
@@ -20,7 +22,8 @@ class TwentyNewsGroupsDatasetModelsWrapper(ModelsWrapper):
     """ Class of the best topics model. """
 
     def __init__(self, topics_model_name=None, dataset_path: str = None,
-                 model_class=BEST_TOPICS_MODEL_CLASS, summarization_model_word_embeddings='glove'):
+                 model_class=BEST_TOPICS_MODEL_CLASS, summarization_model_word_embeddings='glove',
+                 progress_callback: Callable[[str], None] = None):
         """
         Specifies default values that are passed to ModelsWrapper() to easily use the 20Newsgroups dataset.
 
@@ -36,13 +39,16 @@ class TwentyNewsGroupsDatasetModelsWrapper(ModelsWrapper):
 
         :param summarization_model_word_embeddings: Word embeddings to be used by the summarization model. \
         Possible values are: 'glove' or 'word2vec'.
+        :param progress_callback: Function called with a description of each loading stage, when the stage starts. \
+        Used to report the loading progress.
         """
 
         if topics_model_name is None:
             # Load topics_model_name from the *-conf.ini file
-            topics_model_name = get_param_value_from_conf_file('MODELS', 'BEST_TOPICS_MODEL_NAME')
+            topics_model_name = get_config().best_topics_model_name
         if dataset_path is None:
             # Load twenty_newsgroups_dataset_path from the *-conf.ini file
-            dataset_path = get_param_value_from_conf_file('DATASETS', 'TWENTY_NEWS_GROUPS_DIR_PATH')
+            dataset_path = get_config().twenty_news_groups_dir_path
 
-        super().__init__(topics_model_name, dataset_path, model_class, summarization_model_word_embeddings)
+        super().__init__(topics_model_name, dataset_path, model_class, summarization_model_word_embeddings,
+                         progress_callback)
@@ -0,0 +1,269 @@
+import os
+import queue
+import shutil
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from web_backend.utils import join_paths
+from web_backend.wrapper.images_manifest import ImagesManifest
+
+
+class WordCloudJob:
+    """
+    Job that renders the wordcloud images of all the topics with a number of keywords.
+
+    The job has the following states:
+
+    * **pending**: The job is waiting in the queue.
+    * **rendering**: The images are being rendered.
+    * **done**: The images have been rendered and published in their final folder.
+    * **failed**: An error happened while rendering the images. The error attribute contains it.
+    """
+
+    PENDING = 'pending'
+    RENDERING = 'rendering'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, num_keywords: int, state: str = PENDING):
+        self.num_keywords = num_keywords
+        self.state = state
+        self.error: str = None
+        self._finished = threading.Event()
+        if state in (self.DONE, self.FAILED):
+            self._finished.set()
+
+    def finish(self, error: str = None):
+        """
+        Marks the job as done, or as failed if an error is given, and wakes up the threads waiting for it.
+        """
+        self.error = error
+        self.state = self.FAILED if error is not None else self.DONE
+        self._finished.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until the job is finished (done or failed), at most timeout seconds.
+        Returns True if the job is finished.
+        """
+        return self._finished.wait(timeout)
+
+    def is_done(self) -> bool:
+        return self.state == self.DONE
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns a dict with the state of the job.
+        """
+        return {'num_keywords': self.num_keywords, 'state': self.state, 'error': self.error}
+
+
+class WordCloudJobNotDoneError(Exception):
+    """
+    Exception raised when the wordcloud images are requested but the job that renders them hasn't finished in time
+    (or has failed).
+
+    The exception contains a message attribute and a job attribute, with the WordCloudJob that renders the images.
+    """
+
+    def __init__(self, message: str, job: WordCloudJob):
+        """
+        :param message: Message of the Error.
+        :param job: WordCloudJob that renders the images.
+        """
+        self.message = message
+        self.job = job
+
+
+class WordCloudJobQueue:
+    """
+    Queue of jobs that render the wordcloud images of the topics in a background thread, so the requests
+    don't render them and the concurrent requests with the same number of keywords don't render them twice.
+
+    The jobs are deduplicated by num_keywords: while a job is pending or rendering, submitting the same num_keywords
+    returns the same job. The images of a job are rendered inside a temporary folder, which is renamed to it's final
+    folder (<images_dir_path>/<num_keywords>keywords-<version>) when all the images and their ImagesManifest have
+    been rendered. The rename is atomic, so the final folder, if exists, always contains all the images and the
+    manifest, even if several processes render them at once.
+    """
+
+    def __init__(self, images_dir_path: str, render_func: Callable[[int, str], None], version: str = ''):
+        """
+        Creates the queue and starts it's worker thread.
+
+        :param images_dir_path: Path to the folder that contains a folder with the images of each num_keywords.
+        :param render_func: Function that given a num_keywords and a folder path, renders the wordcloud images \
+        of all the topics with that num_keywords inside that folder.
+        :param version: Version of the rendered images (like the fingerprint of the topics model), added to the \
+        names of their folders, so the images rendered by other version aren't used. If is '', it isn't added.
+        """
+        self.images_dir_path = images_dir_path
+        self.version = version
+        self._render_func = render_func
+
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, WordCloudJob] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._stats = {'num_jobs': 0, 'num_deduplicated': 0, 'num_failed': 0}
+        self._closed = False
+
+        # The jobs are rendered one after other (each job renders it's images in parallel), so there's one worker thread
+        self._thread: threading.Thread = None
+        with self._lock:
+            self._start_worker()
+
+    def _start_worker(self):
+        """
+        Starts the worker thread if it isn't running. In a process forked from the one that created the queue,
+        only the thread that forked it exists, so the worker is started again. Must be called with the lock acquired.
+        """
+        if not self._closed and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._worker_loop, name='WordCloudJobQueue', daemon=True)
+            self._thread.start()
+
+    def get_images_dir_path(self, num_keywords: int) -> str:
+        """
+        Returns the path to the final folder of the images with the given num_keywords.
+        """
+        dir_name = '{}keywords'.format(num_keywords)
+        if self.version != '':
+            dir_name += '-' + self.version
+        return join_paths(self.images_dir_path, dir_name)
+
+    def submit(self, num_keywords: int) -> WordCloudJob:
+        """
+        Returns the job that renders the images with the given num_keywords. If the images have already been
+        rendered, the returned job is done. If there is a job pending or rendering them, that job is returned.
+        Else, a new job is added to the queue.
+        """
+        with self._lock:
+            job = self._jobs.get(num_keywords)
+            if job is not None and job.state != WordCloudJob.FAILED:
+                if not job.is_done():
+                    self._stats['num_deduplicated'] += 1
+                return job
+
+            # The images may have been rendered by other process, or before the server started
+            if os.path.exists(self.get_images_dir_path(num_keywords)):
+                job = WordCloudJob(num_keywords, state=WordCloudJob.DONE)
+            elif self._closed:
+                job = WordCloudJob(num_keywords)
+                job.finish(error='The wordcloud jobs queue has been closed')
+            else:
+                job = WordCloudJob(num_keywords)
+                self._start_worker()
+                self._queue.put(job)
+                self._stats['num_jobs'] += 1
+            self._jobs[num_keywords] = job
+            return job
+
+    def get_job(self, num_keywords: int) -> Optional[WordCloudJob]:
+        """
+        Returns the last job submitted with the given num_keywords, or a done job if the images have been rendered
+        without a job of this queue. If there isn't any job and the images haven't been rendered, returns None.
+        """
+        with self._lock:
+            job = self._jobs.get(num_keywords)
+        if job is None and os.path.exists(self.get_images_dir_path(num_keywords)):
+            job = WordCloudJob(num_keywords, state=WordCloudJob.DONE)
+        return job
+
+    def clear(self):
+        """
+        Removes the rendered images and the finished jobs, so the images are rendered again the next time
+        they are requested. The pending and rendering jobs are kept. The images rendered by other processes
+        are also removed, so when several processes share the folder, only one of them must call this method,
+        and the rest must call clear_finished_jobs().
+        """
+        with self._lock:
+            self._clear_finished_jobs()
+            self.remove_images(self.images_dir_path)
+
+    def clear_finished_jobs(self):
+        """
+        Removes the finished jobs, without removing the images, so the images are looked for on disk the next time
+        they are requested, and rendered again if they have been removed by other process (see clear()).
+        """
+        with self._lock:
+            self._clear_finished_jobs()
+
+    def _clear_finished_jobs(self):
+        """
+        Removes the finished jobs. Must be called with the lock acquired.
+        """
+        self._jobs = {num_keywords: job for num_keywords, job in self._jobs.items()
+                      if job.state in (WordCloudJob.PENDING, WordCloudJob.RENDERING)}
+
+    @staticmethod
+    def remove_images(images_dir_path: str):
+        """
+        Removes the folders with the rendered images inside the given folder (the images_dir_path of a queue),
+        without using the queue, so the images of a model that isn't loaded can also be removed.
+        """
+        if os.path.isdir(images_dir_path):
+            # The temporary folders (that start with '.') are used by the jobs in progress
+            for entry in os.scandir(images_dir_path):
+                if entry.is_dir() and not entry.name.startswith('.'):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+
+    def close(self):
+        """
+        Stops the worker thread after the job that is being rendered (if any). The pending jobs fail, and the jobs
+        submitted after this also fail. The rendered images aren't removed.
+        """
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.finish(error='The wordcloud jobs queue has been closed')
+            # Wakes up the worker thread, so it exits
+            self._queue.put(None)
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.state = WordCloudJob.RENDERING
+            try:
+                self._render(job.num_keywords)
+                job.finish()
+            except Exception as err:
+                with self._lock:
+                    self._stats['num_failed'] += 1
+                job.finish(error=repr(err))
+
+    def _render(self, num_keywords: int):
+        """
+        Renders the images with the given num_keywords inside a temporary folder, and renames it to it's final folder.
+        """
+        final_dir_path = self.get_images_dir_path(num_keywords)
+        tmp_dir_path = join_paths(self.images_dir_path, '.{}keywords-{}.tmp'.format(num_keywords, uuid.uuid4().hex))
+
+        os.makedirs(tmp_dir_path)
+        try:
+            self._render_func(num_keywords, tmp_dir_path)
+            ImagesManifest.build(tmp_dir_path)
+            os.rename(tmp_dir_path, final_dir_path)
+        except OSError:
+            # If other process has published the images first, the rename fails and it's images are used
+            shutil.rmtree(tmp_dir_path, ignore_errors=True)
+            if not os.path.exists(final_dir_path):
+                raise
+        except Exception:
+            shutil.rmtree(tmp_dir_path, ignore_errors=True)
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Returns a dict with statistics about the queue.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_size'] = self._queue.qsize()
+        return stats
@@ -0,0 +1,99 @@
+import multiprocessing
+from typing import Dict, List, Tuple
+
+from PIL import Image
+from wordcloud import WordCloud
+
+from web_backend.utils import join_paths
+
+
+def _render_topic_images(renderer: 'WordCloudRenderer', topic: int, frequencies: Dict[str, float], dir_path: str):
+    """
+    Renders the wordcloud image of a topic, and it's smaller variants, inside the given folder.
+    It's executed in the worker processes of the WordCloudRenderer.
+    """
+    word_cloud = WordCloud(width=renderer.width, height=renderer.height, background_color='white',
+                           max_words=len(frequencies), random_state=topic)
+    image = word_cloud.generate_from_frequencies(frequencies).to_image()
+
+    for width, file_name in renderer.get_images_file_names(topic):
+        if width != renderer.width:
+            image_variant = image.resize((width, round(renderer.height * width / renderer.width)), Image.LANCZOS)
+        else:
+            image_variant = image
+        renderer.save_image(image_variant, join_paths(dir_path, file_name))
+
+
+class WordCloudRenderer:
+    """
+    Renders the wordcloud images of the topics directly with the wordcloud library, without matplotlib figures,
+    in parallel in several worker processes (one topic per task).
+
+    Of each topic, an image of width x height pixels is rendered, called topic<topic>.<image_format>,
+    and a smaller variant for each of the variant_widths, called topic<topic>-<width>w.<image_format>,
+    so the frontend can download the smallest image that fits (with the srcset attribute of the img HTML tag).
+    """
+
+    IMAGE_FORMATS = ('png', 'webp')
+    """ Valid values of the image_format param. PNG images are optimized, and WebP images are lossy. """
+
+    def __init__(self, width: int = 800, height: int = 400, image_format: str = 'png',
+                 variant_widths: List[int] = None, num_workers: int = 4):
+        """
+        :param width: Width in pixels of the main image of each topic.
+        :param height: Height in pixels of the main image of each topic.
+        :param image_format: Format of the images: 'png' or 'webp'.
+        :param variant_widths: Widths in pixels of the smaller variants of the image of each topic. \
+        The height of each variant keeps the aspect ratio. Widths greater or equal than width are ignored.
+        :param num_workers: Number of processes that render the images in parallel. If is 0, the images are \
+        rendered in the current process.
+        """
+        if image_format not in self.IMAGE_FORMATS:
+            raise Exception('Wrong value for parameter image_format.\n'
+                            'Given value: {0}\n'
+                            'Possible values: "png" or "webp"'.format(image_format))
+
+        self.width = width
+        self.height = height
+        self.image_format = image_format
+        self.variant_widths = sorted({variant_width for variant_width in variant_widths or [] if variant_width < width})
+        self.num_workers = num_workers
+
+    def get_images_file_names(self, topic: int) -> List[Tuple[int, str]]:
+        """
+        Returns a list of tuples (width, file_name) with the images of the given topic, sorted by width.
+        The last tuple is the main image.
+        """
+        file_names = [(variant_width, 'topic{0}-{1}w.{2}'.format(topic, variant_width, self.image_format))
+                      for variant_width in self.variant_widths]
+        file_names.append((self.width, 'topic{0}.{1}'.format(topic, self.image_format)))
+        return file_names
+
+    def save_image(self, image: Image.Image, file_path: str):
+        """
+        Saves the given image in the given path, with the image_format of the renderer.
+        """
+        if self.image_format == 'webp':
+            image.save(file_path, format='WEBP', quality=80, method=6)
+        else:
+            image.save(file_path, format='PNG', optimize=True)
+
+    def render(self, topics_frequencies: List[Dict[str, float]], dir_path: str):
+        """
+        Renders the images of the given topics inside the given folder.
+
+        :param topics_frequencies: For each topic, a dict with the probability of each keyword of the topic.
+        :param dir_path: Path to the folder where the images are stored. It must exist.
+        """
+        tasks = [(self, topic, frequencies, dir_path) for topic, frequencies in enumerate(topics_frequencies)]
+
+        num_workers = min(self.num_workers, len(tasks))
+        if num_workers <= 1:
+            for task in tasks:
+                _render_topic_images(*task)
+            return
+
+        # The spawn start method is used because the main process has running threads,
+        # and forking a process with threads can leave locks acquired in the child process
+        with multiprocessing.get_context('spawn').Pool(num_workers) as pool:
+            pool.starmap(_render_topic_images, tasks)